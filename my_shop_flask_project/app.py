@@ -1,53 +1,160 @@
-from blueprints.admin import admin_bp
-from blueprints.auth import auth_bp
-from blueprints.products import products_bp
-from blueprints.cart import cart_bp
-from blueprints.orders import orders_bp
-from blueprints.main import main_bp  # Blueprint for home and general routes
+import click
+import importlib
+import os
+from commands import register_commands
 from config import Config
-from extensions import db, login_manager, csrf, migrate, mail
+from extensions import db, login_manager, csrf, mail, init_migrate
 from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+from threading import Lock
+from utils.money import format_money
+from utils.streaming import flush
 
+# Blueprint name -> (module, URL prefix). Modules are imported only when their blueprint is
+# registered, so a worker serving a subset of the site doesn't load the rest.
+BLUEPRINTS = {
+    "admin": ("blueprints.admin", "/admin"),
+    "auth": ("blueprints.auth", "/auth"),
+    "products": ("blueprints.products", "/products"),
+    "cart": ("blueprints.cart", "/cart"),
+    "orders": ("blueprints.orders", "/orders"),
+    "main": ("blueprints.main", None)       # Home route without prefix
+}
 
-def create_app():
+
+def create_app(config_class=Config, overrides=None, blueprints=None):
     """
     Application factory function.
 
     - Creates and configures the Flask app instance.
     - Initializes all Flask extensions with the app.
-    - Registers all Blueprints with appropriate URL prefixes.
+    - Sets up the on-disk Jinja bytecode cache.
+    - Registers the selected Blueprints (all by default) with their URL prefixes.
+    - Registers the custom `flask` CLI commands.
+    - Starts the in-process background job worker on the first request (if enabled).
     - Sets up the user loader callback for Flask-Login.
 
+    :param config_class: (type) Configuration class to load (defaults to Config).
+    :param overrides: (dict, optional) Extra settings applied on top of the config class,
+                      e.g. a different database URI for benchmarks.
+    :param blueprints: (list[str] | str, optional) Names from BLUEPRINTS to register, e.g.
+                       ["admin", "auth"] or "admin,auth" for an admin-only worker
+                       (defaults to the BLUEPRINTS setting, then to all of them).
     :return: Configured Flask app instance.
     """
 
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+
+    if overrides:
+        app.config.update(overrides)
 
     # Initialize Flask extensions with the app instance
     db.init_app(app)
     login_manager.init_app(app)
     csrf.init_app(app)
-    migrate.init_app(app, db)
     mail.init_app(app)
 
+    # Only the `flask db` commands need Flask-Migrate: set it up when the app is loaded by the
+    # flask CLI (inside a click command), so web and job workers skip importing Alembic
+    if click.get_current_context(silent=True) is not None:
+        init_migrate(app)
+
+    # `{{ cents|money }}` renders integer cents as "$12.34"
+    app.add_template_filter(format_money, "money")
+    # `{{ flush() }}` sends what a streamed page has rendered so far (see utils/streaming.stream_page)
+    app.add_template_global(flush, "flush")
+    configure_template_cache(app)
+
     # User loader callback for Flask-Login to reload user from session
     @login_manager.user_loader
     def load_user(user_id):
         from models import User   # Import here to avoid circular imports
         return User.query.get(int(user_id))
 
-    # Register blueprints with their URL prefixes
-    app.register_blueprint(admin_bp)
-    app.register_blueprint(auth_bp, url_prefix="/auth")
-    app.register_blueprint(products_bp, url_prefix="/products")
-    app.register_blueprint(cart_bp, url_prefix="/cart")
-    app.register_blueprint(orders_bp, url_prefix="/orders")
-    app.register_blueprint(main_bp)    # Home route without prefix
+    register_blueprints(app, blueprints or app.config.get("BLUEPRINTS"))
+
+    # Custom CLI commands (e.g. `flask seed all`)
+    register_commands(app)
+
+    # In-process job worker (emails, periodic hold sweeps), started lazily so CLI commands don't spawn it
+    if app.config.get("JOBS_EMBEDDED_THREADS"):
+        worker_lock = Lock()
+
+        @app.before_request
+        def start_job_worker():
+            if "job_worker" in app.extensions:
+                return
+
+            with worker_lock:
+                if "job_worker" not in app.extensions:
+                    from utils.jobs import Worker
+                    worker = Worker(app, app.config["JOBS_EMBEDDED_THREADS"], app.config["JOBS_POLL_INTERVAL_SECONDS"])
+                    worker.start()
+                    app.extensions["job_worker"] = worker
 
     return app
 
 
+def configure_template_cache(app):
+    """
+    Stores compiled templates on disk (TEMPLATE_BYTECODE_CACHE_DIR), so a new
+    worker process loads their bytecode instead of parsing and compiling every
+    template on its first requests. `flask templates compile` fills the cache
+    at deploy time; entries of edited templates are ignored and recompiled.
+
+    :param app: (Flask) The application instance.
+    """
+
+    directory = app.config["TEMPLATE_BYTECODE_CACHE_DIR"]
+
+    if directory is False:
+        return
+
+    directory = directory or os.path.join(app.instance_path, "jinja_cache")
+    os.makedirs(directory, exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory)
+
+
+def register_blueprints(app, names=None):
+    """
+    Imports and registers the selected blueprints.
+
+    Shared templates link to every section of the site, so when only some
+    blueprints are registered, links to the others resolve to that section's
+    URL prefix (served by whichever workers run it) instead of failing.
+
+    :param app: (Flask) The application instance.
+    :param names: (list[str] | str, optional) Blueprint names (or a comma-separated string); None for all.
+    """
+
+    if isinstance(names, str):
+        names = [name.strip() for name in names.split(",") if name.strip()]
+
+    names = names or list(BLUEPRINTS)
+    unknown = set(names) - set(BLUEPRINTS)
+
+    if unknown:
+        raise ValueError(f"Unknown blueprints: {', '.join(sorted(unknown))}")
+
+    for name in names:
+        module, url_prefix = BLUEPRINTS[name]
+        app.register_blueprint(getattr(importlib.import_module(module), f"{name}_bp"), url_prefix=url_prefix)
+
+    skipped = set(BLUEPRINTS) - set(names)
+
+    if skipped:
+        def link_to_other_worker(error, endpoint, values):
+            blueprint = endpoint.partition(".")[0]
+
+            if blueprint not in skipped:
+                raise error
+
+            return BLUEPRINTS[blueprint][1] or "/"
+
+        app.url_build_error_handlers.append(link_to_other_worker)
+
+
 if __name__ == '__main__':
     app = create_app()
 
@@ -0,0 +1,196 @@
+# asgi.py
+
+"""
+ASGI deployment mode:
+
+    uvicorn asgi:application --workers 2
+
+The route that waits on outbound network I/O is served by a native
+coroutine: creating a checkout awaits Stripe through the payment
+gateway's async (httpx) client. While it waits, the event loop keeps
+serving other requests instead of pinning a thread. (Confirmation emails
+are sent by the background job worker, see utils/jobs.py.)
+
+Its database work, and every other route, still runs as the regular
+synchronous Flask code on a thread pool, in a normal request context.
+"""
+
+import io
+from app import create_app
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from blueprints.cart import begin_checkout, finish_checkout
+from flask_login import current_user
+from utils.payments import get_gateway
+
+
+class _PooledWsgiInstance(WsgiToAsgiInstance):
+    """
+    asgiref's WSGI bridge runs every request on one shared thread
+    (thread_sensitive=True); Flask is thread-safe, so use the pool instead.
+    """
+
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False)
+
+
+async def _read_body(receive):
+    body = b""
+
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_response(response, send):
+    await send({
+        "type": "http.response.start",
+        "status": response.status_code,
+        "headers": [(key.lower().encode("latin1"), value.encode("latin1")) for key, value in response.headers.items()]
+    })
+    await send({"type": "http.response.body", "body": response.get_data()})
+    response.close()
+
+
+class AsyncCheckoutApp:
+    """
+    ASGI application routing the outbound-I/O route to an async handler and
+    everything else to the Flask WSGI app.
+
+    Attributes:
+        app (Flask): The wrapped application.
+        routes (dict): (method, path) -> async handler.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.routes = {
+            ("POST", "/cart/create-checkout-session"): self.create_checkout_session
+        }
+
+    async def __call__(self, scope, receive, send):
+        handler = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+
+        if handler is None:
+            if scope["type"] == "lifespan":
+                return await self._lifespan(receive, send)
+
+            return await _PooledWsgiInstance(self.app)(scope, receive, send)
+
+        body = await _read_body(receive)
+        bridge = WsgiToAsgiInstance(self.app)
+        bridge.scope = scope
+        environ = bridge.build_environ(scope, io.BytesIO(body))
+
+        await handler(environ, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _run_phase(self, environ, phase, session=None):
+        """
+        Runs one synchronous phase of a route in its own request context, the
+        way Flask dispatches a @login_required view: before_request hooks
+        (CSRF included) and the login check first, errors through the app's
+        error handlers, and after_request hooks (which save the session
+        cookie) on the response.
+
+        :param environ: (dict) WSGI environ of the request.
+        :param phase: (callable) Returns (response or None, value); None means the route continues.
+        :param session: (SessionMixin, optional) Session carried over from the previous phase.
+        :return: (tuple) (finalized Response or None, value, session).
+        """
+
+        ctx = self.app.request_context(environ)
+
+        if session is not None:
+            ctx.session = session
+
+        ctx.push()
+        value = None
+
+        try:
+            try:
+                rv = None
+
+                # Only the first phase is a new request; later ones continue it
+                if session is None:
+                    rv = self.app.preprocess_request()
+
+                    if rv is None and not current_user.is_authenticated:
+                        rv = self.app.login_manager.unauthorized()
+
+                if rv is None:
+                    rv, value = phase()
+
+            except Exception as e:
+                rv = self.app.handle_user_exception(e)
+
+            response = self.app.finalize_request(rv) if rv is not None else None
+
+        except Exception as e:
+            response = self.app.handle_exception(e)
+
+        finally:
+            session = ctx.session
+            ctx.pop()
+
+        return response, value, session
+
+    async def _phase(self, environ, phase, session=None):
+        return await sync_to_async(self._run_phase, thread_sensitive=False)(environ, phase, session)
+
+    async def create_checkout_session(self, environ, send):
+        """
+        Async counterpart of cart.create_checkout_session: begin_checkout() on
+        the thread pool, the Stripe call on the event loop, finish_checkout()
+        back on the pool.
+        """
+
+        def begin():
+            error, checkout_id, params = begin_checkout()
+            return error, (checkout_id, params)
+
+        response, value, session = await self._phase(environ, begin)
+
+        if response is None:
+            checkout_id, params = value
+
+            try:
+                checkout_session = await get_gateway(self.app).create_checkout_session_async(
+                    params, idempotency_key=params["client_reference_id"]
+                )
+                error = None
+
+            except Exception as e:
+                checkout_session, error = None, e
+
+            response, _, _ = await self._phase(
+                environ, lambda: (finish_checkout(checkout_id, checkout_session, error), None), session
+            )
+
+        await _send_response(response, send)
+
+
+def create_asgi_app(app=None):
+    """
+    Wraps a Flask app for ASGI servers.
+
+    :param app: (Flask, optional) Application to serve (defaults to create_app()).
+    :return: (AsyncCheckoutApp) The ASGI application.
+    """
+
+    return AsyncCheckoutApp(app or create_app())
+
+
+application = create_asgi_app()
@@ -0,0 +1,4 @@
+# benchmarks/__init__.py
+#
+# Load-test and benchmark harness for the storefront hot paths.
+# Run it from the project folder with:  python -m benchmarks --help
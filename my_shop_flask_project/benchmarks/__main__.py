@@ -0,0 +1,134 @@
+# benchmarks/__main__.py
+
+import argparse
+import os
+import sys
+import tempfile
+from app import create_app
+from config import TestingConfig
+from .report import compare, format_table, load_baseline, save_baseline, summarize
+from .runner import AsgiLiveServer, ClientSession, HttpSession, LiveServer, SCENARIOS, instrument, run_scenario
+from .seed import seed_dataset
+from .startup import startup_results
+from .stubs import StubStripe
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Seed a synthetic dataset and benchmark the storefront hot paths."
+    )
+    parser.add_argument("--products", type=int, default=200, help="Number of products (N)")
+    parser.add_argument("--users", type=int, default=100, help="Number of users (M)")
+    parser.add_argument("--orders", type=int, default=500, help="Number of orders (K)")
+    parser.add_argument("--reviews", type=int, default=1000, help="Number of reviews (R)")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent workers per scenario")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario before timing")
+    parser.add_argument("--mode", choices=["client", "server", "asgi", "both", "all"], default="both",
+                        help="Drive the Flask test client, a local WSGI server, a local ASGI (uvicorn) server, "
+                             "client and WSGI server (both) or all three")
+    parser.add_argument("--stub-latency", type=float, default=0.05,
+                        help="Seconds the stub Stripe server takes to answer")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Run only the given scenario (repeatable); default runs all")
+    parser.add_argument("--startup-runs", type=int, default=5,
+                        help="Fresh interpreters timed starting the app (0 skips the startup/* rows)")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and traffic")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="Allowed relative slowdown before a scenario counts as regressed")
+    parser.add_argument("--output", help="Also write the raw results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Entry point: seeds the dataset, runs the selected scenarios and reports.
+
+    :return: (int) Exit status, 1 when a regression against the baseline was found.
+    """
+
+    args = parse_args(argv)
+    scenarios = args.scenario or list(SCENARIOS)
+    modes = {"both": ["client", "server"], "all": ["client", "server", "asgi"]}.get(args.mode, [args.mode])
+
+    db_dir = tempfile.mkdtemp(prefix="myshop-bench-")
+
+    # Checkouts go to a local stub with a fixed latency instead of Stripe
+    stub_stripe = StubStripe(args.stub_latency).__enter__()
+
+    # A file database so the threaded server and test-client workers share the same data
+    app = create_app(TestingConfig, {
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{os.path.join(db_dir, 'bench.db')}",
+        "SQLALCHEMY_ENGINE_OPTIONS": {"connect_args": {"timeout": 30}},
+        "PAYMENT_GATEWAY": "stripe",
+        "STRIPE_API_BASE": stub_stripe.base_url,
+        "STRIPE_SECRET_KEY": "sk_test_benchmark"
+    })
+
+    with app.app_context():
+        dataset = seed_dataset(args.products, args.users, args.orders, args.reviews, seed=args.seed)
+
+    print(f"Seeded dataset: {dataset}")
+    instrument(app)
+
+    # Cold start of the app factory, each run in a fresh interpreter
+    results = startup_results([None], args.startup_runs) if args.startup_runs else {}
+
+    for mode in modes:
+        if mode in ("server", "asgi"):
+            server = (LiveServer if mode == "server" else AsgiLiveServer)(app).__enter__()
+            session_factory = lambda: HttpSession(server.base_url)
+        else:
+            server = None
+            session_factory = lambda: ClientSession(app)
+
+        try:
+            for scenario in scenarios:
+                if args.warmup:
+                    run_scenario(session_factory, scenario, dataset, args.warmup, 1, seed=args.seed)
+
+                samples, elapsed = run_scenario(session_factory, scenario, dataset, args.requests,
+                                                args.concurrency, seed=args.seed)
+                results[f"{mode}/{scenario}"] = summarize(samples, elapsed)
+        finally:
+            if server:
+                server.__exit__(None, None, None)
+
+    stub_stripe.__exit__(None, None, None)
+
+    print(format_table(results))
+
+    params = {key: getattr(args, key) for key in
+              ("products", "users", "orders", "reviews", "requests", "concurrency", "stub_latency", "startup_runs", "seed")}
+
+    if args.output:
+        save_baseline(args.output, results, params)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, params)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# benchmarks/hashing.py
+
+"""
+Password verification throughput per hashing method and thread count:
+
+    python -m benchmarks.hashing
+    python -m benchmarks.hashing --method scrypt:32768:8:1 --method pbkdf2:sha256:600000 --threads 1 2 4
+
+Use it to pick PASSWORD_HASH_METHOD (cost per verification) and
+PASSWORD_HASH_WORKERS (verifications/s stop growing past the usable cores).
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import Config
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_METHODS = [Config.PASSWORD_HASH_METHOD, "pbkdf2:sha256:600000", "pbkdf2:sha256:1000000"]
+
+
+def measure(method, threads, seconds):
+    """
+    Verifies one password in a loop on `threads` threads for about `seconds`.
+
+    :return: (tuple[int, float]) Verifications done and elapsed seconds.
+    """
+
+    stored = generate_password_hash("benchmark-password", method)
+    deadline = time.perf_counter() + seconds
+
+    def worker(_):
+        done = 0
+
+        while time.perf_counter() < deadline:
+            check_password_hash(stored, "benchmark-password")
+            done += 1
+
+        return done
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        total = sum(pool.map(worker, range(threads)))
+
+    return total, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.hashing",
+                                     description="Measure password verification throughput.")
+    parser.add_argument("--method", action="append", help="Werkzeug hashing method (repeatable)")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1],
+                        help="Thread counts to try")
+    parser.add_argument("--seconds", type=float, default=2.0, help="Duration of each measurement")
+    args = parser.parse_args(argv)
+
+    print(f"{'method':<28}{'threads':>8}{'verify/s':>11}{'per thread':>12}{'ms each':>10}")
+
+    for method in args.method or DEFAULT_METHODS:
+        for threads in sorted(set(args.threads)):
+            total, elapsed = measure(method, threads, args.seconds)
+            rate = total / elapsed
+            print(f"{method:<28}{threads:>8}{rate:>11.1f}{rate / threads:>12.1f}{1000 * threads / rate if rate else 0:>10.1f}")
+
+    print(f"\n{os.cpu_count()} CPUs available.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# benchmarks/report.py
+
+import json
+import math
+
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    :param sorted_values: (list[float]) Values sorted ascending.
+    :param pct: (float) Percentile between 0 and 100.
+    :return: (float) The percentile value, or 0.0 for an empty list.
+    """
+
+    if not sorted_values:
+        return 0.0
+
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """
+    Reduces the samples of one scenario run to the reported metrics.
+
+    :param samples: (list[Sample]) Measured requests.
+    :param elapsed: (float) Wall-clock seconds the run took (setup requests included).
+
+    :return: (dict) requests, errors, throughput (iterations/s), p50/p95/p99 latency (ms)
+             and average queries per request.
+    """
+
+    latencies = sorted(sample.latency * 1000 for sample in samples)
+    count = len(samples)
+
+    return {
+        "requests": count,
+        "errors": sum(1 for sample in samples if sample.status >= 400),
+        "throughput": round(count / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "queries_per_request": round(sum(sample.queries for sample in samples) / count, 2) if count else 0.0
+    }
+
+
+def format_table(results):
+    """
+    Renders results as a fixed-width text table.
+
+    :param results: (dict) {"<mode>/<scenario>": summary dict}
+    :return: (str) The table.
+    """
+
+    header = f"{'scenario':<28}{'reqs':>7}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}"
+    lines = [header, "-" * len(header)]
+
+    for name, r in results.items():
+        lines.append(
+            f"{name:<28}{r['requests']:>7}{r['errors']:>8}{r['throughput']:>10.1f}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['queries_per_request']:>9.1f}"
+        )
+
+    return "\n".join(lines)
+
+
+def load_baseline(path):
+    """
+    Loads a baseline previously written with save_baseline().
+
+    :param path: (str) Path to the JSON file.
+    :return: (dict) The stored results.
+    """
+
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def save_baseline(path, results, params):
+    """
+    Stores results together with the parameters that produced them.
+
+    :param path: (str) Destination JSON file.
+    :param results: (dict) Results keyed by "<mode>/<scenario>".
+    :param params: (dict) Dataset scale and run settings.
+    """
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"params": params, "results": results}, f, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, tolerance=0.15):
+    """
+    Compares results against a baseline and lists the regressions.
+
+    A scenario regresses when its p95 latency grows, or its throughput drops,
+    by more than `tolerance`, when it executes more queries per request than
+    before, or when it starts returning errors.
+
+    :param results: (dict) Current results keyed by "<mode>/<scenario>".
+    :param baseline: (dict) Baseline results with the same keys.
+    :param tolerance: (float) Allowed relative change for timing metrics (0.15 = 15%).
+
+    :return: (list[str]) Human-readable regression descriptions (empty if none).
+    """
+
+    regressions = []
+
+    for name, current in results.items():
+        base = baseline.get(name)
+
+        if not base:
+            continue
+
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.2f} ms -> {current['p95_ms']:.2f} ms")
+
+        if base["throughput"] and current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {base['throughput']:.1f} -> {current['throughput']:.1f} req/s")
+
+        if current["queries_per_request"] > base["queries_per_request"]:
+            regressions.append(
+                f"{name}: queries/request {base['queries_per_request']} -> {current['queries_per_request']}"
+            )
+
+        if current["errors"] > base["errors"]:
+            regressions.append(f"{name}: errors {base['errors']} -> {current['errors']}")
+
+    return regressions
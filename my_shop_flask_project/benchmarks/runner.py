@@ -0,0 +1,350 @@
+# benchmarks/runner.py
+
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import TestingConfig
+from dataclasses import dataclass
+from extensions import db
+from flask import g, has_request_context
+from http.cookiejar import CookieJar
+from random import Random
+from sqlalchemy import event
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import build_opener, HTTPCookieProcessor, HTTPRedirectHandler, Request
+from utils.webhooks import build_event, sign_payload
+from werkzeug.serving import make_server, WSGIRequestHandler
+from .seed import BENCHMARK_EMAIL_DOMAIN, BENCHMARK_PASSWORD
+
+# Response header used to report how many SQL statements a request executed
+QUERY_COUNT_HEADER = "X-Bench-Query-Count"
+
+# Statements of the last request finished by each thread, including those a streamed
+# response ran after its headers (and QUERY_COUNT_HEADER) were sent
+finished_queries = threading.local()
+
+# Signing secret of TestingConfig, used to sign the webhook payloads
+WEBHOOK_SECRET = TestingConfig.STRIPE_WEBHOOK_SECRET
+
+
+@dataclass
+class Sample:
+    """
+    A single measured request.
+
+    Attributes:
+        latency (float): Wall-clock duration in seconds.
+        status (int): HTTP status code returned.
+        queries (int): SQL statements executed while serving the request.
+    """
+
+    latency: float
+    status: int
+    queries: int
+
+
+def instrument(app):
+    """
+    Installs query counting on the app so every response carries the number
+    of SQL statements it executed in the QUERY_COUNT_HEADER header.
+
+    :param app: (Flask) Application under test.
+    """
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_query(*args):
+        if has_request_context():
+            g.bench_queries = g.get("bench_queries", 0) + 1
+
+    @app.after_request
+    def add_query_count(response):
+        response.headers[QUERY_COUNT_HEADER] = str(g.get("bench_queries", 0))
+        return response
+
+    @app.teardown_request
+    def record_query_count(error=None):
+        finished_queries.count = g.get("bench_queries", 0)
+
+
+class ClientSession:
+    """
+    Drives the app in-process through the Flask test client.
+    Each instance keeps its own cookie jar (and therefore its own cart).
+    """
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None, headers=None):
+        finished_queries.count = None
+        response = self.client.open(path, method=method, data=data, headers=headers)
+        response.get_data()     # Streamed pages render (and query) while their body is read
+        response.close()
+
+        if finished_queries.count is None:
+            return response.status_code, int(response.headers.get(QUERY_COUNT_HEADER, 0))
+
+        return response.status_code, finished_queries.count
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    """Returns redirects to the caller instead of following them."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    """
+    Drives a live WSGI server over real HTTP connections.
+    Each instance keeps its own cookie jar (and therefore its own cart).
+    Query counts come from QUERY_COUNT_HEADER, so for streamed pages they
+    only cover the statements run before the body started.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = build_opener(HTTPCookieProcessor(CookieJar()), _NoRedirect())
+
+    def request(self, method, path, data=None, headers=None):
+        # urllib picks the method from the body: bytes (even empty) means POST, None means GET
+        if isinstance(data, (bytes, str)):
+            body = data.encode() if isinstance(data, str) else data
+        else:
+            body = urlencode(data or {}).encode() if method == "POST" else None
+
+        try:
+            with self.opener.open(Request(self.base_url + path, data=body, headers=headers or {})) as response:
+                response.read()
+                return response.status, int(response.headers.get(QUERY_COUNT_HEADER, 0))
+
+        except HTTPError as e:
+            # 3xx and 4xx/5xx responses all land here because redirects are not followed
+            e.read()
+            return e.code, int(e.headers.get(QUERY_COUNT_HEADER, 0))
+
+
+def _measure(session, method, path, data=None, headers=None):
+    """
+    Times one request and wraps the result in a Sample.
+    """
+
+    start = time.perf_counter()
+    status, queries = session.request(method, path, data, headers)
+    return Sample(time.perf_counter() - start, status, queries)
+
+
+def _random_product(rng, dataset):
+    return rng.randint(1, dataset["products"])
+
+
+# Each scenario receives (session, rng, dataset), performs any unmeasured setup
+# and returns the Sample of the one request that is being benchmarked.
+def scenario_home(session, rng, dataset):
+    return _measure(session, "GET", "/")
+
+
+def scenario_products(session, rng, dataset):
+    return _measure(session, "GET", "/products/products")
+
+
+def scenario_product_reviews(session, rng, dataset):
+    return _measure(session, "GET", f"/products/product/{_random_product(rng, dataset)}/reviews")
+
+
+def scenario_review_feed(session, rng, dataset):
+    # A page from a random depth of the feed, as fetched by "load more"
+    after = rng.randint(1, dataset["reviews"] + 1)
+    return _measure(session, "GET", f"/products/product/{_random_product(rng, dataset)}/reviews.json?after={after}")
+
+
+def scenario_cart_add(session, rng, dataset):
+    return _measure(session, "POST", f"/cart/add_to_cart/{_random_product(rng, dataset)}", {"redirect_to_cart": "1"})
+
+
+def scenario_cart_update(session, rng, dataset):
+    product_id = _random_product(rng, dataset)
+    session.request("POST", f"/cart/add_to_cart/{product_id}", {})
+    return _measure(session, "POST", f"/cart/update_quantity/{product_id}", {"quantity": str(rng.randint(1, 5))})
+
+
+def scenario_cart_remove(session, rng, dataset):
+    product_id = _random_product(rng, dataset)
+    session.request("POST", f"/cart/add_to_cart/{product_id}", {})
+    return _measure(session, "POST", f"/cart/remove_from_cart/{product_id}")
+
+
+def scenario_cart_view(session, rng, dataset):
+    session.request("POST", f"/cart/add_to_cart/{_random_product(rng, dataset)}", {})
+    return _measure(session, "GET", "/cart/cart")
+
+
+def scenario_cart_success(session, rng, dataset):
+    # The stub reports every session paid, so the page confirms the payment and creates the order
+    session.request("POST", f"/cart/add_to_cart/{_random_product(rng, dataset)}", {})
+    session.request("POST", "/cart/create-checkout-session", b"", {"Content-Type": "application/json"})
+    return _measure(session, "GET", "/cart/success")
+
+
+def scenario_checkout(session, rng, dataset):
+    session.request("POST", f"/cart/add_to_cart/{_random_product(rng, dataset)}", {})
+    return _measure(session, "POST", "/cart/create-checkout-session", b"", {"Content-Type": "application/json"})
+
+
+def scenario_login(session, rng, dataset):
+    user_id = rng.randint(1, dataset["users"])
+    session.request("GET", "/auth/logout")
+    return _measure(session, "POST", "/auth/login", {
+        "email": f"user{user_id}@{BENCHMARK_EMAIL_DOMAIN}",
+        "password": BENCHMARK_PASSWORD
+    })
+
+
+def scenario_webhook_retry(session, rng, dataset):
+    # Few distinct event ids, so most deliveries are Stripe-style retries of an event already stored
+    payload = build_event("checkout.session.completed", {
+        "id": "cs_bench",
+        "client_reference_id": "bench-unknown-checkout",
+        "payment_status": "paid"
+    }, event_id=f"evt_bench_{rng.randint(1, 10)}")
+    headers = {"Stripe-Signature": sign_payload(payload, WEBHOOK_SECRET), "Content-Type": "application/json"}
+    return _measure(session, "POST", "/cart/webhook", payload, headers)
+
+
+SCENARIOS = {
+    "home": scenario_home,
+    "products": scenario_products,
+    "product_reviews": scenario_product_reviews,
+    "review_feed": scenario_review_feed,
+    "cart_add": scenario_cart_add,
+    "cart_update": scenario_cart_update,
+    "cart_remove": scenario_cart_remove,
+    "cart_view": scenario_cart_view,
+    "cart_success": scenario_cart_success,
+    "checkout": scenario_checkout,
+    "login": scenario_login,
+    "webhook_retry": scenario_webhook_retry,
+}
+
+
+def _login(session, user_id):
+    """
+    Logs a session in as one of the seeded users.
+    """
+
+    status, _ = session.request("POST", "/auth/login", {
+        "email": f"user{user_id}@{BENCHMARK_EMAIL_DOMAIN}",
+        "password": BENCHMARK_PASSWORD
+    })
+
+    if status != 302:
+        raise RuntimeError(f"Benchmark login failed for user {user_id} (HTTP {status}).")
+
+
+def run_scenario(session_factory, scenario, dataset, requests, concurrency, seed=42):
+    """
+    Runs one scenario with a pool of concurrent workers.
+
+    Every worker gets its own logged-in session and issues its share of the
+    requests sequentially, so `concurrency` requests are in flight at once.
+
+    :param session_factory: (callable) Returns a new ClientSession or HttpSession.
+    :param scenario: (str) Key in SCENARIOS.
+    :param dataset: (dict) Row counts returned by seed_dataset().
+    :param requests: (int) Total measured requests across all workers.
+    :param concurrency: (int) Number of concurrent workers.
+    :param seed: (int) Seed for the per-worker random generators.
+
+    :return: (tuple[list[Sample], float]) Samples and total elapsed wall-clock seconds.
+    """
+
+    func = SCENARIOS[scenario]
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    started = []
+
+    # Login happens before the barrier, so the clock starts once every worker is ready
+    barrier = threading.Barrier(concurrency, action=lambda: started.append(time.perf_counter()))
+
+    def worker(index):
+        rng = Random(seed + index)
+        session = session_factory()
+        _login(session, (index % dataset["users"]) + 1)
+        barrier.wait()
+        return [func(session, rng, dataset) for _ in range(shares[index])]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency)))
+
+    elapsed = time.perf_counter() - started[0]
+
+    return [sample for samples in results for sample in samples], elapsed
+
+
+class _QuietHandler(WSGIRequestHandler):
+    """Request handler that skips per-request access logging during runs."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class LiveServer:
+    """
+    Context manager serving the app on a random local port with a threaded
+    Werkzeug WSGI server.
+    """
+
+    def __init__(self, app):
+        self.server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=_QuietHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
+
+class AsgiLiveServer:
+    """
+    Context manager serving the app on a random local port with uvicorn
+    through the ASGI entry point (asgi.py), in a background thread.
+    """
+
+    def __init__(self, app):
+        import uvicorn
+        from asgi import AsyncCheckoutApp
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.bind(("127.0.0.1", 0))
+
+        config = uvicorn.Config(AsyncCheckoutApp(app), lifespan="off", log_level="warning", access_log=False)
+        self.server = uvicorn.Server(config)
+        self.thread = threading.Thread(target=self.server.run, kwargs={"sockets": [self.socket]}, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.socket.getsockname()[1]}"
+
+    def __enter__(self):
+        self.thread.start()
+
+        while not self.server.started:
+            time.sleep(0.01)
+
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+        self.socket.close()
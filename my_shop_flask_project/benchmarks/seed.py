@@ -0,0 +1,45 @@
+# benchmarks/seed.py
+
+from extensions import db
+from utils.analytics import rebuild_rollups
+from utils.synthetic_data import SyntheticDataLoader
+
+# Every synthetic user shares this password so the harness can log in as any of them
+BENCHMARK_PASSWORD = "benchmark-password"
+BENCHMARK_EMAIL_DOMAIN = "bench.example.com"
+
+
+def seed_dataset(products=100, users=50, orders=200, reviews=300, seed=42):
+    """
+    Recreates all tables and fills them with a reproducible synthetic dataset.
+
+    The same arguments always produce the same rows, so benchmark runs are
+    comparable with each other. Must be called inside an application context.
+
+    :param products: (int) Number of products (N).
+    :param users: (int) Number of users (M). User #1 is the admin.
+    :param orders: (int) Number of orders (K), each with 1 to 4 items.
+    :param reviews: (int) Number of reviews (R), capped by the distinct purchased user/product pairs.
+
+    :return: (dict) Counts of the rows actually created, keyed by table.
+    """
+
+    db.drop_all()
+    db.create_all()
+
+    # Hashed with the app's policy, which TestingConfig keeps cheap so logins don't dominate the measurements
+    loader = SyntheticDataLoader(seed=seed, password=BENCHMARK_PASSWORD, email_domain=BENCHMARK_EMAIL_DOMAIN)
+
+    loader.load_products(products)
+    loader.load_users(users)
+    order_count, item_count = loader.load_orders(orders)
+    review_count = loader.load_reviews(reviews)
+    rebuild_rollups()
+
+    return {
+        "products": products,
+        "users": users,
+        "orders": order_count,
+        "order_items": item_count,
+        "reviews": review_count
+    }
@@ -0,0 +1,114 @@
+# benchmarks/startup.py
+
+"""
+Cold start time of the app factory, and which imports it is spent on:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --blueprints admin --blueprints main,products --runs 10 --top 20
+
+Every run starts a fresh interpreter, so nothing is cached in sys.modules.
+`python -m benchmarks` tracks the same measurement as its startup/* rows.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from .report import summarize
+from .runner import Sample
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "from app import create_app\n"
+    "create_app(blueprints={blueprints!r})\n"
+    "print(time.perf_counter() - start)\n"
+)
+
+
+def _python(code, *flags):
+    return subprocess.run([sys.executable, *flags, "-c", code], cwd=PROJECT_DIR,
+                          capture_output=True, text=True, check=True)
+
+
+def measure_startup(blueprints=None, runs=5):
+    """
+    Times `import app` plus create_app() in `runs` fresh interpreters.
+
+    :param blueprints: (str, optional) Blueprints to register, e.g. "admin,auth" (default: all).
+    :param runs: (int) Interpreters to start.
+    :return: (list[float]) Seconds per start.
+    """
+
+    return [float(_python(PROBE.format(blueprints=blueprints)).stdout) for _ in range(runs)]
+
+
+def import_profile(blueprints=None):
+    """
+    Import time spent per top-level package while starting the app, from
+    Python's `-X importtime` output.
+
+    :param blueprints: (str, optional) Blueprints to register (default: all).
+    :return: (list[tuple[str, float]]) Package and milliseconds, slowest first.
+    """
+
+    totals = {}
+
+    for line in _python(PROBE.format(blueprints=blueprints), "-X", "importtime").stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        own, _, module = line[len("import time:"):].split("|")
+        package = module.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(own) / 1000
+
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def startup_results(selections, runs=5):
+    """
+    Startup measurements in the benchmark report format, keyed
+    "startup/<blueprints>" (throughput is starts per second).
+
+    :param selections: (list[str | None]) Blueprint selections to measure (None = all).
+    :param runs: (int) Interpreters to start per selection.
+    :return: (dict) Summaries keyed by result name.
+    """
+
+    results = {}
+
+    for blueprints in selections:
+        times = measure_startup(blueprints, runs)
+        results[f"startup/{blueprints or 'all'}"] = summarize([Sample(t, 200, 0) for t in times], sum(times))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup",
+                                     description="Measure app cold start and break it down by import.")
+    parser.add_argument("--blueprints", action="append",
+                        help="Comma-separated blueprints to register (repeatable); default measures all of them")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list in the import breakdown")
+    args = parser.parse_args(argv)
+
+    for blueprints in args.blueprints or [None]:
+        times = sorted(measure_startup(blueprints, args.runs))
+        print(f"\nblueprints={blueprints or 'all'}: median {1000 * times[len(times) // 2]:.0f} ms, "
+              f"min {1000 * times[0]:.0f} ms over {args.runs} runs")
+
+        profile = import_profile(blueprints)
+        total = sum(ms for _, ms in profile)
+        print(f"{'package':<24}{'import ms':>11}{'share':>8}")
+
+        for package, ms in profile[:args.top]:
+            print(f"{package:<24}{ms:>11.1f}{ms / total:>8.0%}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# benchmarks/stubs.py
+
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class StubStripe:
+    """
+    Context manager serving a minimal fake of the Stripe API on a random local
+    port: POST /v1/checkout/sessions answers with a new session after
+    `latency` seconds, like a slow upstream would, and GET
+    /v1/checkout/sessions/<id> returns it already paid.
+
+    Point the payment gateway at it with `STRIPE_API_BASE = stub.base_url`.
+    """
+
+    def __init__(self, latency=0.1):
+        counter = itertools.count(1)
+        sessions = {}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # Keep-alive, so client connection pooling is exercised
+
+            def do_POST(self):
+                params = parse_qs(self.rfile.read(int(self.headers.get("Content-Length", 0))).decode())
+                time.sleep(latency)
+
+                session_id = f"cs_stub_{next(counter)}"
+                sessions[session_id] = {
+                    "id": session_id,
+                    "object": "checkout.session",
+                    "url": f"https://checkout.stripe.com/pay/{session_id}",
+                    "client_reference_id": params.get("client_reference_id", [None])[0],
+                    "payment_status": "paid"
+                }
+
+                self._reply(200 if self.path == "/v1/checkout/sessions" else 404, sessions[session_id])
+
+            def do_GET(self):
+                time.sleep(latency)
+
+                checkout_session = sessions.get(self.path.rpartition("/")[2])
+
+                if checkout_session is None:
+                    self._reply(404, {"error": {"type": "invalid_request_error", "message": "No such checkout.session"}})
+                else:
+                    self._reply(200, checkout_session)
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.server.handle_error = lambda *args: None   # Clients hanging up after a timeout
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.thread.join()
+
@@ -1,9 +1,19 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+import io
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, stream_with_context, abort, jsonify
 from forms.add_product_form import AddProductForm
 from forms.edit_product_form import EditProductForm
+from forms.import_products_form import ImportProductsForm
 from models.order import Order
 from models.product import Products
 from extensions import db
+from utils import order_export, product_io
+from utils.analytics import sales_dashboard
+from utils.archive import find_order
+from utils.catalog_cache import catalog_cache
+from utils.money import format_cents, to_cents
+from utils.payments import get_gateway
+from utils.storefront import invalidate_product
+from utils.streaming import FORMATS, encode_records
 from utils.validators import admin_required
 
 
@@ -30,6 +40,10 @@ def admin_orders():
         order_id = request.form.get("order_id")
         new_status = request.form.get("status")
 
+        if not (new_status or "").strip():
+            flash("Please choose a status.", "danger")
+            return redirect(url_for("admin.admin_orders"))
+
         # Find the order by ID
         order = Order.query.get(order_id)
 
@@ -37,7 +51,7 @@ def admin_orders():
             # Update order status and save to DB
             order.status = new_status
             db.session.commit()
-            flash(f"Order #{order.id} status updated to {new_status}.", "success")
+            flash(f"Order #{order.id} status updated to {order.status}.", "success")
         else:
             flash("Order not found.", "danger")
 
@@ -65,13 +79,16 @@ def admin_orders():
 @admin_required
 def order_detail(order_id):
     """
-    Displays detailed information about a specific order.
+    Displays detailed information about a specific order, live or archived.
     The order and its related user are passed to the template.
 
     :param order_id: (int) the order id
     """
-    # Retrieve the order by ID or return 404 if not found
-    order = db.get_or_404(Order, order_id)
+    # Retrieve the order by ID (falling back to the archive) or return 404 if not found
+    order = find_order(order_id)
+
+    if order is None:
+        abort(404)
 
     # Get the user who placed the order
     user = order.user
@@ -94,15 +111,17 @@ def add_product():
         # Create a new product instance with data from the form
         new_product = Products(
             name=form.name.data,
-            price=form.price.data,
+            price_cents=to_cents(form.price.data),
             description=form.description.data,
             img_url=form.img_url.data,
-            quantity=form.quantity.data
+            quantity=form.quantity.data,
+            weight_grams=form.weight_grams.data
         )
 
         # Add and commit the new product to the DB
         db.session.add(new_product)
         db.session.commit()
+        invalidate_product(new_product.id)
 
         flash(f"Product '{new_product.name}' added successfully!", "success")
 
@@ -126,19 +145,25 @@ def edit_product(product_id):
     # Get product or 404 if not found
     product = Products.query.get_or_404(product_id)
 
-    # Populate form with product data
+    # Populate form with product data; the price is stored in cents but edited as a decimal
     form = EditProductForm(obj=product)
 
+    if request.method == "GET":
+        form.price.data = format_cents(product.price_cents)
+
     if form.validate_on_submit():
         # Update product fields with form data
         product.name = form.name.data
-        product.price = form.price.data
+        product.price_cents = to_cents(form.price.data)
         product.quantity = form.quantity.data
+        product.weight_grams = form.weight_grams.data
         product.img_url = form.img_url.data
         product.description = form.description.data
 
         # Commit changes to the database
         db.session.commit()
+        catalog_cache.invalidate(product.id)
+        invalidate_product(product.id)
 
         flash(f"Product '{product.name}' updated successfully!", "success")
 
@@ -160,29 +185,236 @@ def edit_product(product_id):
 def manage_products():
     """
     View to display and manage all products.
-    Lists all products for the admin with options to edit or delete.
+    Lists active products, then archived ones, with options to edit and archive or restore.
     """
 
-    products = Products.query.all()
+    products = Products.query.order_by(Products.active.desc(), Products.id).all()
     return render_template("manage_products.html", products=products)
 
 
-@admin_bp.route("/delete_product/<int:product_id>", methods=["POST"])
-@admin_required
-def delete_product(product_id):
+def set_product_active(product_id, active):
     """
-    Deletes a product by its ID.
-    Only accessible via POST to prevent accidental deletions.
+    Archives (soft-deletes) or restores a product and drops its cached storefront data.
+    The row is kept either way, so orders and reviews of an archived product still resolve it.
 
     :param product_id: (int) product id
+    :param active: (bool) False to archive, True to restore
+    :return: (Products) The product
     """
 
     # Get product or 404 if not found
     product = Products.query.get_or_404(product_id)
-    db.session.delete(product)
+    product.active = active
     db.session.commit()
+    catalog_cache.invalidate(product_id)
+    invalidate_product(product_id)
+
+    return product
+
+
+@admin_bp.route("/archive_product/<int:product_id>", methods=["POST"])
+@admin_required
+def archive_product(product_id):
+    """
+    Archives a product by its ID: it leaves the storefront and carts, but
+    stays in order history. Only accessible via POST to prevent accidental archiving.
+
+    :param product_id: (int) product id
+    """
 
-    flash(f"Product '{product.name}' deleted.", "danger")
+    product = set_product_active(product_id, False)
+
+    flash(f"Product '{product.name}' archived.", "danger")
 
     # Redirect back to the manage products page
     return redirect(url_for("admin.manage_products"))
+
+
+@admin_bp.route("/restore_product/<int:product_id>", methods=["POST"])
+@admin_required
+def restore_product(product_id):
+    """
+    Puts an archived product back on the storefront.
+
+    :param product_id: (int) product id
+    """
+
+    product = set_product_active(product_id, True)
+
+    flash(f"Product '{product.name}' restored.", "success")
+
+    return redirect(url_for("admin.manage_products"))
+
+
+@admin_bp.route("/products/export.<fmt>")
+@admin_required
+def export_products(fmt):
+    """
+    Streams the whole catalog as a CSV or JSON Lines download.
+    Rows are read over a server-side cursor and sent in chunks, so memory stays
+    constant no matter how many products exist.
+
+    :param fmt: (str) "csv" or "jsonl"
+    """
+
+    if fmt not in FORMATS:
+        abort(404)
+
+    return Response(
+        stream_with_context(product_io.export_products(fmt)),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=products.{fmt}"}
+    )
+
+
+@admin_bp.route("/products/import", methods=["GET", "POST"])
+@admin_required
+def import_products():
+    """
+    Bulk product import from an uploaded CSV or JSON Lines file.
+    GET: Displays the upload form and export links.
+    POST: Upserts every valid row (by id, or by name) in chunks and shows a per-row error report.
+    """
+
+    form = ImportProductsForm()
+    report = None
+
+    if form.validate_on_submit():
+        upload = form.file.data
+        fmt = upload.filename.rsplit(".", 1)[-1].lower()
+
+        # Decode the upload lazily instead of reading the whole file into memory
+        text_stream = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+        report = product_io.import_products(product_io.read_rows(text_stream, fmt))
+
+        flash(
+            f"Import finished: {report.inserted} inserted, {report.updated} updated, {len(report.errors)} rejected.",
+            "success" if not report.errors else "warning"
+        )
+
+    return render_template("import_products.html", form=form, report=report, max_errors=200)
+
+
+def _report_filters():
+    """
+    Reads the start/end/status filters shared by the order export and the sales report
+    from the query string.
+
+    :return: (tuple) start datetime, exclusive end datetime and status (each may be None).
+    :raises ValueError: If a date is malformed.
+    """
+
+    start, end = order_export.parse_date_range(request.args.get("start"), request.args.get("end"))
+
+    return start, end, request.args.get("status") or None
+
+
+@admin_bp.route("/orders/export.<fmt>")
+@admin_required
+def export_orders(fmt):
+    """
+    Streams order items joined with orders, users and products as CSV or JSON Lines.
+    Accepts optional `start`/`end` (YYYY-MM-DD, inclusive) and `status` query filters.
+
+    :param fmt: (str) "csv" or "jsonl"
+    """
+
+    if fmt not in FORMATS:
+        abort(404)
+
+    try:
+        start, end, status = _report_filters()
+
+    except ValueError:
+        flash("Dates must use the YYYY-MM-DD format.", "error")
+        return redirect(url_for("admin.admin_orders"))
+
+    return Response(
+        stream_with_context(order_export.export_orders(fmt, start, end, status)),
+        mimetype=FORMATS[fmt],
+        headers={"Content-Disposition": f"attachment; filename=orders.{fmt}"}
+    )
+
+
+@admin_bp.route("/reports/daily")
+@admin_required
+def sales_report():
+    """
+    Daily revenue and units sold per product, aggregated in SQL.
+    Accepts the same `start`/`end`/`status` filters as the order export.
+    """
+
+    try:
+        start, end, status = _report_filters()
+
+    except ValueError:
+        flash("Dates must use the YYYY-MM-DD format.", "error")
+        return redirect(url_for("admin.sales_report"))
+
+    rows = order_export.daily_sales_report(start, end, status)
+
+    return render_template(
+        "sales_report.html",
+        rows=rows,
+        filters=request.args,
+        statuses=['Processing', 'Shipped', 'Delivered'],
+        total_revenue_cents=sum(row["revenue_cents"] for row in rows),
+        total_units=sum(row["units"] for row in rows)
+    )
+
+
+@admin_bp.route("/reports/daily.csv")
+@admin_required
+def sales_report_csv():
+    """
+    Downloads the daily sales report as CSV, honoring the same filters.
+    """
+
+    try:
+        start, end, status = _report_filters()
+
+    except ValueError:
+        flash("Dates must use the YYYY-MM-DD format.", "error")
+        return redirect(url_for("admin.sales_report"))
+
+    rows = order_export.daily_sales_report(start, end, status)
+
+    return Response(
+        encode_records(rows, order_export.REPORT_FIELDS, "csv"),
+        mimetype="text/csv",
+        headers={"Content-Disposition": "attachment; filename=daily_sales.csv"}
+    )
+
+
+@admin_bp.route("/analytics")
+@admin_required
+def analytics():
+    """
+    Sales analytics dashboard: revenue, orders, units and average order value per day,
+    top products and top customers.
+
+    Reads only the pre-aggregated rollup tables, so it loads in the same time
+    no matter how long the order history is. Accepts `days` (1-365, default 30).
+    """
+
+    days = min(max(request.args.get("days", 30, type=int), 1), 365)
+
+    return render_template("admin_analytics.html", days=days, **sales_dashboard(days))
+
+
+@admin_bp.route("/payments/metrics")
+@admin_required
+def payment_metrics():
+    """
+    Payment gateway health of this worker process as JSON: circuit breaker
+    state and, per operation, calls, errors, retries, rejected calls and
+    p50/p95/max latency.
+    """
+
+    gateway = get_gateway()
+
+    return jsonify({
+        "gateway": type(gateway).__name__,
+        "circuit": gateway.breaker.state,
+        "operations": gateway.metrics.snapshot()
+    })
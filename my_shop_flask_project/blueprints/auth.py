@@ -6,8 +6,12 @@ from forms.login_form import LoginForm
 from forms.register_form import RegisterForm
 from forms.user_data import UserData
 from models import User
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from utils.addresses import ADDRESS_FIELDS, save_default_address
+from utils.identifiers import identifier_taken, is_valid_cpf, normalize_cpf, remember_identifiers
+from utils.passwords import HashingBusy, hash_password, needs_rehash, verify_password
+from utils.rate_limit import rate_limit
 
 
 current_year = date.today().year
@@ -17,15 +21,18 @@ auth_bp = Blueprint('auth', __name__)
 
 
 @auth_bp.route("/register", methods=["GET", "POST"])
+@rate_limit("5/minute", per="ip", methods=["POST"])
 def register():
     """
     User registration route.
 
     - Redirects to home if user already logged in.
     - On POST:
-        * Checks if email is already registered, flashes message if so.
-        * Creates a new User with hashed password.
-        * Commits new user to the database.
+        * Checks if email is already registered (the identifier filter skips the query
+          for new emails), flashes message if so.
+        * Creates a new User with the password hashed per the configured policy.
+        * Commits new user to the database (a concurrent sign-up with the same email
+          is caught by the unique constraint).
         * Redirects to home after registration.
     - On GET:
         * Renders registration template.
@@ -37,18 +44,33 @@ def register():
     form = RegisterForm()
 
     if form.validate_on_submit():
-        existing_user = db.session.query(User).filter_by(email=form.email.data).first()
-        if existing_user:
+        if identifier_taken("email", form.email.data):
             flash("You've already signed up with that email, log in instead!")
             return redirect(url_for("auth.register"))
 
+        try:
+            password_hash = hash_password(form.password.data)
+
+        except HashingBusy:
+            flash("We're handling a lot of sign-ups right now. Please try again in a moment.")
+            return render_template("register.html", current_year=current_year, form=form), 503
+
         new_user = User(
             name=form.name.data,
             email=form.email.data,
-            password=generate_password_hash(form.password.data, method="pbkdf2:sha256", salt_length=8)
+            password=password_hash
         )
         db.session.add(new_user)
-        db.session.commit()
+
+        try:
+            db.session.commit()
+
+        except IntegrityError:
+            db.session.rollback()
+            flash("You've already signed up with that email, log in instead!")
+            return redirect(url_for("auth.register"))
+
+        remember_identifiers(email=form.email.data)
 
         flash("Registration successful! Please log in.")
 
@@ -58,16 +80,19 @@ def register():
 
 
 @auth_bp.route("/login", methods=["GET", "POST"])
+@rate_limit("20/minute", per="ip", methods=["POST"])
+@rate_limit("5/minute", per="account", methods=["POST"])
 def login():
     """
     User login route.
 
     - Redirects to home if already logged in.
+    - Throttles attempts per IP and per email and IP before any password is hashed.
     - On POST:
         * Uses LoginForm for validation.
         * Retrieves user by email.
-        * Checks hashed password.
-        * Logs in user if valid.
+        * Checks hashed password on the bounded hashing pool.
+        * Logs in user if valid, upgrading an outdated hash to the current policy.
         * Shows flash message for errors.
     - On GET:
         * Renders login template with form.
@@ -85,7 +110,19 @@ def login():
             flash("That email does not exist, please try again.")
             return render_template("login.html", form=form)
 
-        if check_password_hash(user.password, form.password.data):
+        try:
+            valid = verify_password(user.password, form.password.data)
+
+            # The password is known right now, so an outdated hash can be upgraded transparently
+            if valid and needs_rehash(user.password):
+                user.password = hash_password(form.password.data)
+                db.session.commit()
+
+        except HashingBusy:
+            flash("We're handling a lot of sign-ins right now. Please try again in a moment.")
+            return render_template("login.html", form=form), 503
+
+        if valid:
             login_user(user)
             return redirect(url_for("main.home"))
         else:
@@ -116,9 +153,12 @@ def edit_profile():
 
     POST:
         - Validates form data.
-        - Checks if CPF and RG (manually input) are unique across users except current user.
-        - Saves CPF and RG only if not already set.
-        - Updates user_data JSON column with address and phone.
+        - Validates a new CPF's check digits before any lookup.
+        - Checks that a new CPF and RG are unique across users except current user
+          (through the identifier filter, which skips the query for unseen values).
+        - Saves CPF and RG only if not already set (a concurrent duplicate is caught
+          by the unique constraints).
+        - Updates the default address (created on first save) and the profile_complete flag.
         - Commits to DB and flashes success message.
 
     GET:
@@ -131,55 +171,52 @@ def edit_profile():
     form = UserData()
 
     if form.validate_on_submit():
-        cpf_input = request.form.get("cpf") or current_user.cpf
-        rg_input = request.form.get("rg") or current_user.rg
+        # Only values the user doesn't have yet are saved, so only those are checked
+        cpf_input = None if current_user.cpf else normalize_cpf(request.form.get("cpf"))
+        rg_input = None if current_user.rg else (request.form.get("rg") or "").strip()
+
+        if cpf_input and not is_valid_cpf(cpf_input):
+            flash("Invalid CPF.", "error")
+            return render_template("edit_profile.html", form=form)
 
         # Check if CPF is already registered to a different user
-        if cpf_input:
-            cpf_exists = db.session.query(User).filter(User.cpf == cpf_input, User.id != current_user.id).first()
-            if cpf_exists:
-                flash("CPF already registered to another user.", "error")
-                return render_template("edit_profile.html", form=form)
+        if identifier_taken("cpf", cpf_input, exclude_user_id=current_user.id):
+            flash("CPF already registered to another user.", "error")
+            return render_template("edit_profile.html", form=form)
 
         # Check if RG is already registered to a different user
-        if rg_input:
-            rg_exists = db.session.query(User).filter(User.rg == rg_input, User.id != current_user.id).first()
-            if rg_exists:
-                flash("RG already registered to another user.", "error")
-                return render_template("edit_profile.html", form=form)
+        if identifier_taken("rg", rg_input, exclude_user_id=current_user.id):
+            flash("RG already registered to another user.", "error")
+            return render_template("edit_profile.html", form=form)
 
         # Save CPF and RG only if not already present on current user
-        if not current_user.cpf and cpf_input:
+        if cpf_input:
             current_user.cpf = cpf_input
 
-        if not current_user.rg and rg_input:
+        if rg_input:
             current_user.rg = rg_input
 
-        # Update user_data JSON with other form fields
-        current_user.user_data = {
-            "phone": form.phone.data,
-            "street": form.street.data,
-            "number": form.number.data,
-            "city": form.city.data,
-            "state": form.state.data,
-            "zip_code": form.zip_code.data,
-            "country": form.country.data
-        }
-
-        db.session.commit()
+        # Update the default address with the other form fields
+        save_default_address(current_user, {field: getattr(form, field).data for field in ADDRESS_FIELDS})
+
+        try:
+            db.session.commit()
+
+        except IntegrityError:
+            db.session.rollback()
+            flash("CPF or RG already registered to another user.", "error")
+            return render_template("edit_profile.html", form=form)
+
+        remember_identifiers(cpf=cpf_input, rg=rg_input)
         flash("Profile updated successfully.", "success")
         return redirect(url_for("orders.account"))
 
-    # GET request: pre-fill the form with existing user data if available
+    # GET request: pre-fill the form with the default address if available
     if request.method == "GET":
-       if current_user.user_data:
-            user_data = current_user.user_data
-            form.phone.data = user_data.get("phone", "")
-            form.street.data = user_data.get("street", "")
-            form.number.data = user_data.get("number", "")
-            form.city.data = user_data.get("city", "")
-            form.state.data = user_data.get("state", "")
-            form.zip_code.data = user_data.get("zip_code", "")
-            form.country.data = user_data.get("country", "")
+        address = current_user.default_address
+
+        if address is not None:
+            for field in ADDRESS_FIELDS:
+                getattr(form, field).data = getattr(address, field)
 
     return render_template("edit_profile.html", form=form)
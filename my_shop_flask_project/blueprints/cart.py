@@ -1,20 +1,28 @@
+import time
 from config import Config
-from datetime import datetime
-from extensions import db
-from flask import Blueprint, session, redirect, url_for, flash, request, render_template, jsonify
+from extensions import db, csrf
+from flask import Blueprint, session, redirect, url_for, flash, request, render_template, jsonify, current_app
 from flask_login import current_user, login_required
 from models.product import Products
-from models.order import Order, OrderItem
-import stripe
+from models.checkout import CheckoutSession
+from utils.checkout import cart_quantities, fulfill_checkout, open_checkout, revalidate_cart
 from utils.helpers import is_profile_complete
-from utils.email import send_order_confirmation_email
-
-# Set the Stripe secret key for API calls
-stripe.api_key = Config.STRIPE_SECRET_KEY
+from utils.inventory import InsufficientStock, available_to_sell, release_holds, reserve
+from utils.payments import PAID_STATUSES, GatewayUnavailable, get_gateway
+from utils.rate_limit import rate_limit
+from utils.recommendations import recommended_products
+from utils.shipping import quote_cart
+from utils.tasks import send_order_confirmation
+from utils.webhooks import HANDLERS, dispatch, store_event
 
 # Create a Flask Blueprint for cart-related routes
 cart_bp = Blueprint("cart", __name__)
 
+# Stripe rejects Checkout sessions expiring less than 30 minutes after they are created;
+# the margin covers the time until Stripe receives the call and the rounding to whole seconds
+STRIPE_MIN_SESSION_SECONDS = 1800
+STRIPE_EXPIRY_MARGIN_SECONDS = 60
+
 
 def initialize_cart():
     """
@@ -30,42 +38,43 @@ def initialize_cart():
 def cart():
     """
     Display cart contents:
-    - Lists products with name, price, quantity
-    - Shows total price
+    - Revalidates every line against the live catalog (one query, or the short-TTL cache)
+    - Lists products with name, current price, quantity, flagging changed prices and missing stock
+    - Drops lines whose product was deleted or archived
+    - Shows total price and, for a complete profile, the shipping quote to the default address
+    - Suggests products often bought with the cart's items (precomputed lists)
     - Passes Stripe public key for frontend payment integration
     - Checks if profile is complete if user logged in
     """
 
     initialize_cart()
-    cart = session["cart"]
 
-    cart_items = []
-    total = 0
-
-    # Iterate through items in the cart to build list and calculate total
-    for product_id, item in cart.items():
-        price = float(item["price"])
-        quantity = int(item["quantity"])
-        subtotal = price * quantity
-        total += subtotal
-        cart_items.append({
-            "id": product_id,
-            "name": item["name"],
-            "price": price,
-            "quantity": quantity
-        })
+    review = revalidate_cart(session["cart"], exclude_ref=session.get("checkout_ref"))
+
+    if review.cart != session["cart"]:
+        session["cart"] = review.cart
+
+    for name in review.removed:
+        flash(f"{name} is no longer available and was removed from your cart.", "warning")
 
-    user_data = current_user.user_data if current_user.is_authenticated else None
     logged_in = current_user.is_authenticated
 
     profile_complete = False
+    shipping = None
     if logged_in:
         profile_complete = is_profile_complete(current_user)
 
+        # Quoted in memory from the default address loaded with the user
+        if profile_complete and review.lines:
+            shipping = quote_cart(current_user, review.lines, review.total_cents)
+
     return render_template(
         "cart.html",
-        cart_items=cart_items,
-        total=total,
+        cart_items=review.lines,
+        total_cents=review.total_cents,
+        shipping=shipping,
+        out_of_stock=review.out_of_stock,
+        recommendations=recommended_products([line["id"] for line in review.lines], current_app.config["RECOMMENDATIONS_SHOWN"]),
         logged_in=current_user.is_authenticated,
         profile_complete=is_profile_complete(current_user) if current_user.is_authenticated else False,
         stripe_public_key=Config.STRIPE_PUBLIC_KEY
@@ -73,10 +82,12 @@ def cart():
 
 
 @cart_bp.route("/add_to_cart/<int:product_id>", methods=["POST"])
+@rate_limit("60/minute", per="user")
 def add_to_cart(product_id):
     """
     Add a product to the cart.
     If product is already in cart, increment its quantity.
+    Refuse if it would exceed the stock available to sell.
     Update the session and flash a success message.
     Redirect either to cart page or products listing depending on form data.
 
@@ -85,18 +96,24 @@ def add_to_cart(product_id):
 
     initialize_cart()
 
-    # Retrieve product from database or raise 404 if not found
-    product = db.get_or_404(Products, product_id)
+    # Retrieve the active product or raise 404 if not found (or archived)
+    product = Products.query.filter_by(id=product_id, active=True).first_or_404()
     product_id_str = str(product_id)    # Use string keys for session dict
 
     cart = session["cart"]
+    wanted = cart[product_id_str]["quantity"] + 1 if product_id_str in cart else 1
+
+    # Holds of this customer's own checkout don't count against them
+    if available_to_sell(product_id, exclude_ref=session.get("checkout_ref")) < wanted:
+        flash(f"Sorry, not enough {product.name} in stock.", "warning")
+        return redirect(request.referrer or url_for("products.products"))
 
     if product_id_str in cart:
         cart[product_id_str]["quantity"] += 1
     else:
         cart[product_id_str] = {
             "name": product.name,
-            "price": product.price,
+            "price_cents": product.price_cents,
             "quantity": 1
         }
 
@@ -168,6 +185,7 @@ def update_quantity(product_id):
     """
     Update the quantity of a product in the cart.
     If new quantity is less than 1, remove the item.
+    Refuse quantities above the stock available to sell.
     Handle invalid input gracefully.
 
     :param product_id: (int) product id
@@ -191,6 +209,12 @@ def update_quantity(product_id):
 
     else:
         if product_id_str in cart:
+            available = available_to_sell(product_id, exclude_ref=session.get("checkout_ref"))
+
+            if available < new_quantity:
+                flash(f"Only {available} units of {cart[product_id_str]['name']} available.", "warning")
+                return redirect(url_for("cart.cart"))
+
             cart[product_id_str]["quantity"] = new_quantity
             flash("Quantity updated.", "success")
 
@@ -199,122 +223,277 @@ def update_quantity(product_id):
     return redirect(url_for("cart.cart"))
 
 
-@cart_bp.route("/create-checkout-session", methods=["POST"])
-@login_required
-def create_checkout_session():
+def begin_checkout():
     """
-    Create a Stripe Checkout session.
+    The database part of creating a checkout, everything before the Stripe call:
     - Verify user profile completeness.
     - Verify cart is not empty.
-    - Prepare line items for Stripe API.
+    - Revalidate the cart against the live catalog; ask for a review if it changed.
+    - Quote shipping to the default address (refused if there is no delivery there).
+    - Prepare line items for Stripe API, shipping included as its own line.
+    - Reserve the stock with holds that expire a grace period after the Stripe session.
 
-    :return: Return the session ID as JSON to frontend.
+    Shared by the WSGI view and the async handler of the ASGI mode (asgi.py).
+
+    :return: (tuple) (error response, None, None), or (None, checkout id, keyword
+             parameters for the gateway's create_checkout_session()).
     """
 
     if not is_profile_complete(current_user):
         # Return error JSON for frontend handling
-        return jsonify({"error": "Profile incomplete. Please complete your profile to proceed."}), 400
+        return (jsonify({"error": "Profile incomplete. Please complete your profile to proceed."}), 400), None, None
 
     cart = session.get("cart", {})
 
     if not cart:
-        return jsonify({"error": "Cart is empty"}), 400
+        return (jsonify({"error": "Cart is empty"}), 400), None, None
 
-    line_items = []
+    # Never charge stale prices or deleted or archived products: the customer re-reviews a changed cart
+    review = revalidate_cart(cart, exclude_ref=session.get("checkout_ref"), use_cache=False)
 
-    for item in cart.values():
-        try:
-            # Stripe requires amount in cents as integer
-            unit_amount = int(float(item["price"]) * 100)
-            quantity = int(item["quantity"])
-        except (ValueError, TypeError):
-            continue
+    if review.needs_attention:
+        session["cart"] = review.cart
+        return (jsonify({"error": "Your cart was updated with current prices and stock. Please review it.",
+                         "reload": True}), 409), None, None
 
-        if quantity < 1:
-            continue
+    cart = review.cart
 
+    # Stripe takes the unit amount in cents, which is exactly what the cart stores
+    line_items = [{
+        "price_data": {
+            "currency": "usd",
+            "product_data": {
+                "name": line["name"]
+            },
+            "unit_amount": line["price_cents"]
+        },
+        "quantity": line["quantity"]
+    } for line in review.lines]
+
+    if not line_items:
+        return (jsonify({"error": "No valid items in cart."}), 400), None, None
+
+    shipping = quote_cart(current_user, review.lines, review.total_cents)
+
+    if shipping is None:
+        return (jsonify({"error": "Sorry, we don't deliver to your zip code yet."}), 400), None, None
+
+    if shipping.cost_cents:
         line_items.append({
             "price_data": {
                 "currency": "usd",
                 "product_data": {
-                    "name": item["name"]
+                    "name": "Shipping"
                 },
-                "unit_amount": unit_amount
+                "unit_amount": shipping.cost_cents
             },
-            "quantity": quantity
+            "quantity": 1
         })
 
-    if not line_items:
-        return jsonify({"error": "No valid items in cart."}), 400
-    print("Creating Stripe session with line_items:", line_items)
+    # A restarted checkout replaces the previous attempt's holds
+    release_holds(session.pop("checkout_ref", None))
+
+    config = current_app.config
+    session_seconds = max(config["STOCK_HOLD_TTL_SECONDS"], STRIPE_MIN_SESSION_SECONDS) + STRIPE_EXPIRY_MARGIN_SECONDS
+
     try:
-        checkout_session = stripe.checkout.Session.create(
-            payment_method_types=["card"],
-            line_items=line_items,
-            mode="payment",
-            success_url=url_for("cart.success", _external=True) + '?session_id={CHECKOUT_SESSION_ID}',
-            cancel_url=url_for("cart.cancel", _external=True)
-        )
-        # Return the Stripe session ID for frontend to initiate checkout
-        return jsonify({"id": checkout_session.id})
+        # Holds outlive the Stripe session, so a payment completed at its last second still finds them
+        checkout_ref, _ = reserve(cart_quantities(cart), current_user.id, session_seconds + config["STOCK_HOLD_GRACE_SECONDS"])
+
+    except InsufficientStock as e:
+        names = [cart[str(product_id)]["name"] for product_id in e.product_ids if str(product_id) in cart]
+        return (jsonify({"error": f"Not enough stock for: {', '.join(names)}."}), 409), None, None
+
+    session["checkout_ref"] = checkout_ref
+
+    # Snapshot of the cart, so the webhook can create the order without this session
+    checkout = open_checkout(current_user.id, cart, checkout_ref, shipping.cost_cents)
+
+    return None, checkout.id, {
+        "payment_method_types": ["card"],
+        "line_items": line_items,
+        "mode": "payment",
+        "client_reference_id": checkout_ref,
+        # Counted from now, right before the Stripe call, not from when the holds were placed
+        "expires_at": int(time.time()) + session_seconds,
+        "success_url": url_for("cart.success", _external=True) + '?session_id={CHECKOUT_SESSION_ID}',
+        "cancel_url": url_for("cart.cancel", _external=True)
+    }
+
+
+def finish_checkout(checkout_id, checkout_session=None, error=None):
+    """
+    The database part after the Stripe call: links the Stripe session to the
+    checkout, or expires the checkout and releases its holds if Stripe failed.
+
+    :param checkout_id: (int) CheckoutSession id returned by begin_checkout().
+    :param checkout_session: (stripe.checkout.Session, optional) The created Stripe session.
+    :param error: (Exception, optional) The error raised by the payment gateway.
+    :return: JSON response for the frontend.
+    """
+
+    checkout = db.session.get(CheckoutSession, checkout_id)
+
+    if error is not None:
+        checkout.status = "expired"
+        db.session.commit()
+        release_holds(session.pop("checkout_ref", None))
+
+        # The circuit breaker is open: Stripe is failing, ask the customer to retry shortly
+        if isinstance(error, GatewayUnavailable):
+            return jsonify(error=str(error)), 503
+
+        return jsonify(error=str(error)), 403
+
+    checkout.stripe_session_id = checkout_session.id
+    db.session.commit()
+
+    # Return the Stripe session ID for frontend to initiate checkout
+    return jsonify({"id": checkout_session.id})
+
+
+@cart_bp.route("/create-checkout-session", methods=["POST"])
+@login_required
+def create_checkout_session():
+    """
+    Create a Stripe Checkout session (see begin_checkout() for the checks).
+
+    :return: Return the session ID as JSON to frontend.
+    """
+
+    error, checkout_id, params = begin_checkout()
+
+    if error is not None:
+        return error
+
+    try:
+        # Pooled connections, timeouts, retries and circuit breaking live in the gateway;
+        # the checkout reference makes the call idempotent and therefore safe to retry
+        checkout_session = get_gateway().create_checkout_session(params, idempotency_key=params["client_reference_id"])
 
     except Exception as e:
-        return jsonify(error=str(e)), 403
+        return finish_checkout(checkout_id, error=e)
+
+    return finish_checkout(checkout_id, checkout_session)
+
+
+def checkout_paid(checkout):
+    """
+    Asks Stripe whether a checkout's session was paid. The success URL is
+    only a redirect anyone can open, so it is never taken as proof of payment.
+
+    :param checkout: (CheckoutSession) The checkout.
+    :return: (bool) False as well when Stripe can't be reached (the webhook will create the order).
+    """
+
+    if not checkout.stripe_session_id:
+        return False
+
+    try:
+        stripe_session = get_gateway().retrieve_checkout_session(checkout.stripe_session_id)
+
+    except Exception:
+        current_app.logger.warning("Could not confirm payment of checkout %s", checkout.checkout_ref, exc_info=True)
+        return False
+
+    return (stripe_session.client_reference_id == checkout.checkout_ref
+            and stripe_session.payment_status in PAID_STATUSES)
+
 
 @cart_bp.route("/success")
 @login_required
 def success():
     """
     Success page after payment.
-    - Create order and order items from session cart.
-    - Send order confirmation email.
+    - Find the checkout by its Stripe session id (or the one stored in the session).
+    - Create the order from the checkout's cart snapshot once Stripe confirms the
+      payment, unless the webhook already did; otherwise leave it to the webhook.
+    - Queue the order confirmation email for the background worker.
     - Clear the cart from session.
     - Render the success template.
     """
 
-    cart = session.get('cart', {})
+    checkout = None
+    stripe_session_id = request.args.get("session_id")
 
-    if not cart:
-        flash("Your cart is empty.")
-        return redirect(url_for('products.products'))
+    if stripe_session_id:
+        checkout = CheckoutSession.query.filter_by(stripe_session_id=stripe_session_id, user_id=current_user.id).first()
 
-    # Calculate total order price
-    total = 0
-    for item in cart.values():
-        total += float(item['price']) * item['quantity']
+    if checkout is None and session.get("checkout_ref"):
+        checkout = CheckoutSession.query.filter_by(checkout_ref=session["checkout_ref"], user_id=current_user.id).first()
 
-    # Create a new order record
-    new_order = Order(user_id = current_user.id, total=total)
-    db.session.add(new_order)
-    db.session.commit()
+    if checkout is None:
+        flash("No checkout found. Please check out again.", "warning")
+        return redirect(url_for("cart.cart"))
 
-    # Add order items linked to this order
-    for product_id, item in cart.items():
-        order_item = OrderItem(
-            order_id=new_order.id,
-            product_id=int(product_id),  # agora está correto
-            quantity=item['quantity'],
-            price=float(item['price'])  # converter para float se estiver como string
-        )
-        db.session.add(order_item)
+    order, created = None, False
 
-    db.session.commit()
+    # Completed or expired checkouts just report their outcome
+    if checkout.status != "open" or checkout_paid(checkout):
+        order, created = fulfill_checkout(checkout)
 
     # Clear the cart session data
     session["cart"] = {}
+    session.pop("checkout_ref", None)
+
+    if order is None and checkout.status == "expired":
+        flash("This checkout has expired. Please try again.", "warning")
+        return redirect(url_for("cart.cart"))
+
+    # Payment not confirmed yet (e.g. delayed payment methods): the webhook creates the order
+    if order is None:
+        return render_template("success.html", order=None)
 
     flash("Order completed successfully!")
 
-    # Send confirmation email (can be async if desired)
-    send_order_confirmation_email(current_user, new_order)
+    # The webhook queues the email when it created the order first
+    if created:
+        send_order_confirmation.delay(order_id=order.id)
 
-    return render_template("success.html", order=new_order)
+    return render_template("success.html", order=order)
 
 
 @cart_bp.route("/cancel")
 def cancel():
     """
     Rendered when user cancels Stripe checkout.
+    Releases the stock held for the checkout.
     """
 
+    release_holds(session.pop("checkout_ref", None))
+
     return render_template("cancel.html")
+
+
+@cart_bp.route("/webhook", methods=["POST"])
+@csrf.exempt
+def webhook():
+    """
+    Stripe webhook endpoint.
+    - Verify the Stripe-Signature header against STRIPE_WEBHOOK_SECRET.
+    - Store the raw event in the inbox (duplicates are skipped by event id).
+    - Hand it to the worker pool and acknowledge immediately.
+
+    :return: 200 once the event is stored (or known), 400 for bad payloads or signatures.
+    """
+
+    import stripe   # Deferred: only this route needs the Stripe SDK, which is slow to import
+
+    payload = request.get_data()
+
+    try:
+        event = stripe.Webhook.construct_event(
+            payload, request.headers.get("Stripe-Signature", ""), current_app.config["STRIPE_WEBHOOK_SECRET"]
+        )
+
+    except (ValueError, stripe.error.SignatureVerificationError):
+        return jsonify(error="Invalid payload or signature."), 400
+
+    # Event types without a handler are acknowledged without touching the database
+    if event["type"] in HANDLERS:
+        row_id = store_event(event["id"], event["type"], payload.decode("utf-8"))
+
+        if row_id:
+            dispatch(current_app._get_current_object(), row_id)
+
+    return jsonify(received=True)
@@ -1,8 +1,7 @@
 from flask import Blueprint, render_template
 from flask_login import current_user
-from models import Order, OrderItem, User
-from extensions import db
 from flask_login import login_required
+from utils.archive import user_orders
 
 # Define a Blueprint for order-related routes
 orders_bp = Blueprint("orders", __name__)
@@ -16,14 +15,15 @@ def account():
 
     - Requires login to access.
     - Retrieves the current logged-in user.
-    - Queries all orders related to the current user from the database.
+    - Queries all orders related to the current user, archived ones included,
+      newest first with their items and products.
     - Passes the user object and their orders to the 'account.html' template for display.
     """
 
     # Current authenticated user
     user = current_user
 
-    # Get all orders by this user
-    orders = db.session.query(Order).filter_by(user_id = user.id).all()
+    # Get all orders by this user (live and archived)
+    orders = user_orders(user.id)
 
     return render_template("account.html", user = user, orders = orders)
@@ -1,81 +1,71 @@
 from extensions import db
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, flash, current_app
 from flask_login import current_user, login_required
 from models.product import Products
-from models.order import Review, Order
-from sqlalchemy import func
+from models.order import Review
+from sqlalchemy import select, union
 from sqlalchemy.exc import IntegrityError
+from utils.archive import ORDER_TABLES
 from utils.helpers import user_bought_product
+from utils.recommendations import recommended_products
+from utils.reviews import review_page
+from utils.rate_limit import rate_limit
+from utils.storefront import catalog_chunks, invalidate_product, product_overview
+from utils.streaming import deferred, stream_page
 from utils.validators import admin_required
 
 # Define a Blueprint for products-related routes
 products_bp = Blueprint("products", __name__)
 
 
+def bought_product_ids(user_id):
+    """
+    Ids of the products a user has ordered, archived orders included, in one query.
+
+    :param user_id: (int) User id.
+    :return: (list[int])
+    """
+
+    return list(db.session.scalars(union(*(
+        select(items.product_id).join(orders, orders.id == items.order_id).where(orders.user_id == user_id)
+        for orders, items in ORDER_TABLES
+    ))))
+
+
 @products_bp.route("/products")
 def products():
     """
-    Route to display all products with review summaries.
+    Route to display all products with review summaries, streamed.
 
-    - Fetches all products.
     - For the authenticated user:
       * Determines which products have been bought.
       * Determines which products the user has reviewed.
-    - Retrieves:
-      * All reviews for each product.
-      * The first 5 reviews for quick display.
-      * Average rating per product.
-    - Passes all data to the 'products.html' template for rendering.
+    - Streams 'products.html': the head and navigation are sent at once, then
+      the product cards in chunks of CATALOG_CHUNK_SIZE, each read from the
+      storefront cache (computed once for all visitors) as the page reaches it:
+      * The products.
+      * Their newest reviews for quick display (REVIEWS_PREVIEW_COUNT, reviewer names included).
+      * Average rating and review count per product.
+    - Older reviews are fetched on demand from the review feed.
     """
 
-    products = Products.query.all()
-
-    # Set of product IDs bought by current user
-    bought_products = set()
-    if current_user.is_authenticated:
-        orders = Order.query.filter_by(user_id=current_user.id).all()
-        for order in orders:
-            for item in order.items:
-                bought_products.add(item.product_id)
-    bought_products = list(bought_products)
-
-    # Dictionaries to hold review data for each product
-    reviews_by_product = {}
-    first_5_reviews_by_product = {}
-    avg_rating_by_product = {}
+    bought_products = []
     reviewed_products = set()
 
-    for product in products:
-        # Get all reviews for product, newest first
-        all_reviews = Review.query.filter_by(product_id=product.id).order_by(Review.id.desc()).all()
-        reviews_by_product[product.id] = all_reviews
-        first_5_reviews_by_product[product.id] = all_reviews[:5]
-
-        # Calculate average rating for product, default 0 if no reviews
-        avg = db.session.query(func.avg(Review.rating)).filter(Review.product_id == product.id).scalar()
-        avg_rating_by_product[product.id] = round(avg or 0, 2)
-
-        # Track products reviewed by the current user
-        if current_user.is_authenticated:
-            for r in all_reviews:
-                if r.user_id == current_user.id:
-                    reviewed_products.add(product.id)
-                    break
+    if current_user.is_authenticated:
+        bought_products = bought_product_ids(current_user.id)
+        reviewed_products = set(db.session.scalars(select(Review.product_id).where(Review.user_id == current_user.id)))
 
     # For controlling modal review form display (not perfect without AJAX)
     modal_product_id = None
 
-    return render_template(
+    return stream_page(
         "products.html",
-        products=products,
-        reviews_by_product=reviews_by_product,
-        first_5_reviews_by_product=first_5_reviews_by_product,
-        avg_rating_by_product=avg_rating_by_product,
+        product_chunks=catalog_chunks(current_app.config["CATALOG_CHUNK_SIZE"]),
         bought_products=bought_products,
         reviewed_products=reviewed_products,
         logged_in=current_user.is_authenticated,
         current_user=current_user,
-        anonymize_name=lambda name: name[:1].upper() + "***",   # Helper to anonymize usernames
         modal_product_id=modal_product_id
     )
 
@@ -83,21 +73,21 @@ def products():
 @products_bp.route("/product/<int:product_id>/reviews")
 def product_reviews(product_id):
     """
-    Show detailed reviews for a single product.
+    Show reviews for a single product, streamed.
 
-    - Fetch the product or 404.
-    - Retrieve all reviews for this product, ordered by newest.
-    - Calculate average rating.
+    - Fetch the product or 404 (also when it is archived).
+    - Render the first page of reviews (newest first); the page fetches
+      the next ones from the review feed on demand.
+    - Average rating and review count come with it from the storefront cache.
     - For authenticated users, determine if they have reviewed and their bought products.
-    - Pass all info to 'product_reviews.html' template.
+    - Stream 'product_reviews.html'; the products customers also bought
+      (precomputed lists) are read after the reviews have been sent.
 
     :param product_id: (int) product id
     """
 
-    product = Products.query.get_or_404(product_id)
-    reviews = Review.query.filter_by(product_id=product.id).order_by(Review.id.desc()).all()
-    avg_rating = db.session.query(func.avg(Review.rating)).filter(Review.product_id == product_id).scalar()
-    avg_rating = round(avg_rating or 0, 2)
+    product = Products.query.filter_by(id=product_id, active=True).first_or_404()
+    overview = product_overview(product.id)
 
     has_reviewed = False
     bought_products = []
@@ -106,21 +96,16 @@ def product_reviews(product_id):
         has_reviewed = Review.query.filter_by(user_id=current_user.id, product_id=product_id).first() is not None
 
         # List of product IDs bought by user
-        orders = Order.query.filter_by(user_id=current_user.id).all()
-
-        bought_products_set = set()
-
-        for order in orders:
-            for item in order.items:
-                bought_products_set.add(item.product_id)
-
-        bought_products = list(bought_products_set)
+        bought_products = bought_product_ids(current_user.id)
 
-    return render_template(
+    return stream_page(
         "product_reviews.html",
         product=product,
-        reviews=reviews,
-        avg_rating=avg_rating,
+        reviews=overview["reviews"],
+        next_cursor=overview["next_cursor"],
+        avg_rating=overview["avg_rating"],
+        review_count=overview["review_count"],
+        recommendations=deferred(recommended_products, [product.id], current_app.config["RECOMMENDATIONS_SHOWN"]),
         logged_in=current_user.is_authenticated,
         current_user=current_user,
         bought_products=bought_products,
@@ -128,22 +113,52 @@ def product_reviews(product_id):
     )
 
 
+@products_bp.route("/product/<int:product_id>/reviews.json")
+def review_feed(product_id):
+    """
+    Cursor-paginated review feed, newest first.
+
+    Query parameters:
+    - after: id of the last review already shown (omit for the first page).
+    - limit: page size (defaults to REVIEWS_PAGE_SIZE, at most 100).
+
+    :param product_id: (int) product id
+    :return: JSON {"reviews": [{id, rating, comment, date, author}], "next": cursor or null}.
+    """
+
+    if not db.session.scalar(select(Products.active).where(Products.id == product_id)):
+        return jsonify(error="Product not found."), 404
+
+    limit = min(max(request.args.get("limit", current_app.config["REVIEWS_PAGE_SIZE"], type=int), 1), 100)
+    reviews, next_cursor = review_page(product_id, request.args.get("after", type=int), limit)
+
+    return jsonify(reviews=reviews, next=next_cursor)
+
+
 @products_bp.route("/product/<int:product_id>/review", methods=["POST"])
 @login_required
 def add_review(product_id):
     """
     Handle form submission for adding a product review.
 
+    - Ensure the product exists and is not archived.
     - Ensure user has purchased the product (else flash error).
     - Ensure user has not already reviewed the product.
     - Validate rating value.
     - Create and save a new Review record.
     - Commit to database with exception handling for duplicate reviews.
+    - Drop the product's cached ratings and reviews.
     - Flash success message and redirect to products page.
 
     :param product_id: (int) product id.
     """
 
+    # Archived products take no new reviews
+    if not db.session.scalar(select(Products.active).where(Products.id == product_id)):
+        flash("Product not found.", "error")
+
+        return redirect(url_for("products.products"))
+
     # Check if user bought product
     if not user_bought_product(current_user.id, product_id):
         flash("You can only review products you've purchased.", "error")
@@ -187,17 +202,21 @@ def add_review(product_id):
 
         return redirect(url_for("products.products"))
 
+    invalidate_product(product_id)
+
     flash("Review submitted successfully.", "success")
 
     return redirect(url_for("products.products"))
 
 
 @products_bp.route("/product/<int:product_id>/review_form")
+@rate_limit("30/minute", per="user")
 def review_form(product_id):
     """
     AJAX endpoint returning the review form HTML fragment.
 
     - If user not logged in, returns HTML prompting to log in.
+    - 404 if the product does not exist or is archived.
     - Checks if user has bought the product.
     - Checks if user has already reviewed.
     - Returns rendered HTML form fragment for submitting a review.
@@ -208,7 +227,7 @@ def review_form(product_id):
     if not current_user.is_authenticated:
         return jsonify(html="<p>Please <a href='/login'>log in</a> to leave a review.</p>")
 
-    product = Products.query.get_or_404(product_id)
+    product = Products.query.filter_by(id=product_id, active=True).first_or_404()
 
     # Check if user bought product
     if not user_bought_product(current_user.id, product_id):
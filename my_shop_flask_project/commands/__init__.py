@@ -0,0 +1,32 @@
+# commands/__init__.py
+
+from .analytics import analytics_cli
+from .inventory import inventory_cli
+from .jobs import jobs_cli, worker
+from .orders import orders_cli
+from .products import products_cli
+from .recommendations import recommendations_cli
+from .schema import schema_cli
+from .seed import seed_cli
+from .templates import templates_cli
+from .webhooks import webhooks_cli
+
+
+def register_commands(app):
+    """
+    Registers all custom `flask` CLI command groups on the app.
+
+    :param app: (Flask) The application instance.
+    """
+
+    app.cli.add_command(schema_cli)
+    app.cli.add_command(seed_cli)
+    app.cli.add_command(products_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(inventory_cli)
+    app.cli.add_command(webhooks_cli)
+    app.cli.add_command(recommendations_cli)
+    app.cli.add_command(templates_cli)
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(worker)
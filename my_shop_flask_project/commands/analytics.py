@@ -0,0 +1,24 @@
+# commands/analytics.py
+
+import click
+import time
+from extensions import db
+from flask.cli import AppGroup
+from utils.analytics import rebuild_rollups
+
+# `flask analytics ...` command group for the sales rollup tables
+analytics_cli = AppGroup("analytics", help="Maintain the sales analytics rollup tables.")
+
+
+@analytics_cli.command("rebuild")
+def rebuild():
+    """Backfill or rebuild all sales rollups from the order history."""
+
+    db.create_all()
+    start = time.perf_counter()
+    counts = rebuild_rollups()
+
+    for table, count in counts.items():
+        click.echo(f"{table}: {count} rows")
+
+    click.echo(f"Rollups rebuilt in {time.perf_counter() - start:.1f}s.")
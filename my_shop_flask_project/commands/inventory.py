@@ -0,0 +1,18 @@
+# commands/inventory.py
+
+import click
+from extensions import db
+from flask.cli import AppGroup
+from utils.inventory import sweep_expired_holds
+
+# `flask inventory ...` command group for checkout stock holds
+inventory_cli = AppGroup("inventory", help="Maintain checkout stock reservations.")
+
+
+@inventory_cli.command("sweep")
+def sweep():
+    """Delete stock holds whose expiry has passed."""
+
+    db.create_all()
+    removed = sweep_expired_holds()
+    click.echo(f"Removed {removed} expired stock holds.")
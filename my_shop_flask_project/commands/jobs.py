@@ -0,0 +1,89 @@
+# commands/jobs.py
+
+import click
+import json
+import multiprocessing
+from extensions import db
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from utils.jobs import Worker, get_queue, run_worker_process
+
+# `flask jobs ...` command group to inspect the background job queue
+jobs_cli = AppGroup("jobs", help="Inspect and manage background jobs.")
+
+
+@click.command("worker")
+@click.option("--threads", type=int, default=4, show_default=True, help="Jobs run in parallel per process.")
+@click.option("--processes", type=int, default=1, show_default=True, help="Worker processes to start.")
+@click.option("--poll-interval", type=float, default=None, help="Seconds between polls of an empty queue.")
+@click.option("--burst", is_flag=True, help="Exit once the queue has no due jobs left.")
+@with_appcontext
+def worker(threads, processes, poll_interval, burst):
+    """Run queued background jobs until interrupted."""
+
+    db.create_all()
+    app = current_app._get_current_object()
+    poll_interval = poll_interval or app.config["JOBS_POLL_INTERVAL_SECONDS"]
+
+    if processes > 1:
+        # Each process builds its own app (and database connections); spawn avoids inheriting this one's
+        context = multiprocessing.get_context("spawn")
+        children = [context.Process(target=run_worker_process, args=(threads, poll_interval, burst))
+                    for _ in range(processes)]
+
+        for child in children:
+            child.start()
+
+        click.echo(f"Started {processes} worker processes with {threads} threads each.")
+
+        try:
+            for child in children:
+                child.join()
+
+        except KeyboardInterrupt:
+            for child in children:
+                child.join()
+
+        return
+
+    runner = Worker(app, threads, poll_interval)
+    click.echo(f"Worker {runner.worker_id} running with {threads} threads.")
+
+    try:
+        runner.run(burst)
+
+    except KeyboardInterrupt:
+        runner.stop()
+
+
+@jobs_cli.command("stats")
+@click.option("--window", type=float, default=1, show_default=True, help="Hours of finished jobs to time.")
+@click.option("--json", "as_json", is_flag=True, help="Print the metrics as JSON.")
+def stats(window, as_json):
+    """Show queued, running, succeeded and dead jobs per task, queue lag and run times."""
+
+    db.create_all()
+    metrics = get_queue().stats(window)
+
+    if as_json:
+        click.echo(json.dumps(metrics, indent=2))
+        return
+
+    click.echo(f"{'task':<28}{'queued':>8}{'running':>9}{'done':>7}{'dead':>6}{'lag s':>8}{'p50 ms':>9}{'p95 ms':>9}")
+
+    for name, row in sorted(metrics.items()):
+        click.echo(
+            f"{name:<28}{row['queued']:>8}{row['running']:>9}{row['succeeded']:>7}{row['dead']:>6}"
+            f"{row['lag_seconds']:>8}{row['p50_ms'] if row['p50_ms'] is not None else '-':>9}"
+            f"{row['p95_ms'] if row['p95_ms'] is not None else '-':>9}"
+        )
+
+
+@jobs_cli.command("retry-dead")
+@click.option("--name", default=None, help="Only retry jobs of this task.")
+def retry_dead(name):
+    """Requeue jobs that ran out of attempts."""
+
+    db.create_all()
+    count = get_queue().retry_dead(name)
+    click.echo(f"Requeued {count} dead jobs.")
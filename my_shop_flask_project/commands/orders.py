@@ -0,0 +1,74 @@
+# commands/orders.py
+
+import click
+from extensions import db
+from flask.cli import AppGroup
+from utils import order_export
+from utils.archive import archive_orders
+from utils.streaming import FORMATS, encode_records
+
+# `flask orders ...` command group for finance exports, reports and archiving
+orders_cli = AppGroup("orders", help="Export orders and sales reports, and archive old orders.")
+
+
+def filter_options(f):
+    """
+    Adds the --start/--end/--status options shared by the order commands.
+    """
+
+    f = click.option("--status", default=None, help="Only orders with this status.")(f)
+    f = click.option("--end", default=None, help="Last day to include (YYYY-MM-DD).")(f)
+    f = click.option("--start", default=None, help="First day to include (YYYY-MM-DD).")(f)
+
+    return f
+
+
+def parse_range(start, end):
+    try:
+        return order_export.parse_date_range(start, end)
+
+    except ValueError:
+        raise click.BadParameter("Dates must use the YYYY-MM-DD format.")
+
+
+@orders_cli.command("export")
+@filter_options
+@click.option("--output", "-o", default="-", show_default=True, help="Destination file ('-' for stdout).")
+@click.option("--format", "fmt", type=click.Choice(list(FORMATS)), default="csv", show_default=True)
+@click.option("--batch-size", default=1000, show_default=True, help="Rows per keyset page.")
+def export_orders(start, end, status, output, fmt, batch_size):
+    """Stream order items joined with orders, users and products."""
+
+    start_dt, end_dt = parse_range(start, end)
+
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        for chunk in order_export.export_orders(fmt, start_dt, end_dt, status, batch_size):
+            f.write(chunk)
+
+
+@orders_cli.command("report")
+@filter_options
+@click.option("--output", "-o", default="-", show_default=True, help="Destination CSV file ('-' for stdout).")
+def sales_report(start, end, status, output):
+    """Write daily revenue and units per product as CSV."""
+
+    start_dt, end_dt = parse_range(start, end)
+    rows = order_export.daily_sales_report(start_dt, end_dt, status)
+
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        for chunk in encode_records(rows, order_export.REPORT_FIELDS, "csv"):
+            f.write(chunk)
+
+
+@orders_cli.command("archive")
+@click.option("--older-than-days", type=int, default=None,
+              help="Archive delivered orders older than this [default: ORDERS_ARCHIVE_AFTER_DAYS].")
+@click.option("--batch-size", type=int, default=None,
+              help="Orders per transaction [default: ORDERS_ARCHIVE_BATCH_SIZE].")
+def archive(older_than_days, batch_size):
+    """Move old delivered orders to the archive tables."""
+
+    db.create_all()
+
+    moved = archive_orders(older_than_days, batch_size)
+    click.echo(f"Archived {moved['orders']} orders ({moved['items']} items) in {moved['batches']} batches.")
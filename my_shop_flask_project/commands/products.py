@@ -0,0 +1,61 @@
+# commands/products.py
+
+import click
+import sys
+from flask.cli import AppGroup
+from utils import product_io
+from utils.streaming import FORMATS
+
+# `flask products ...` command group for catalog import/export
+products_cli = AppGroup("products", help="Bulk import and export the product catalog.")
+
+
+def detect_format(path, fmt):
+    """
+    Returns the explicit format, or infers it from the file extension.
+    """
+
+    if fmt:
+        return fmt
+
+    if path and path.lower().endswith(".jsonl"):
+        return "jsonl"
+
+    return "csv"
+
+
+@products_cli.command("export")
+@click.option("--output", "-o", default="-", show_default=True, help="Destination file ('-' for stdout).")
+@click.option("--format", "fmt", type=click.Choice(list(FORMATS)), default=None,
+              help="File format (default: from the extension, else csv).")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows fetched per cursor round-trip.")
+def export_products(output, fmt, batch_size):
+    """Stream every product to a CSV or JSON Lines file."""
+
+    fmt = detect_format(None if output == "-" else output, fmt)
+
+    with click.open_file(output, "w", encoding="utf-8") as f:
+        for chunk in product_io.export_products(fmt, batch_size):
+            f.write(chunk)
+
+
+@products_cli.command("import")
+@click.argument("path")
+@click.option("--format", "fmt", type=click.Choice(list(FORMATS)), default=None,
+              help="File format (default: from the extension, else csv).")
+@click.option("--chunk-size", default=1000, show_default=True, help="Rows per transaction.")
+def import_products(path, fmt, chunk_size):
+    """Upsert products from a CSV or JSON Lines file (keyed by id, else name)."""
+
+    fmt = detect_format(None if path == "-" else path, fmt)
+
+    with click.open_file(path, "r", encoding="utf-8-sig") as f:
+        report = product_io.import_products(product_io.read_rows(f, fmt), chunk_size=chunk_size)
+
+    for row, error in report.errors:
+        click.echo(f"Row {row}: {error}", err=True)
+
+    click.echo(f"{report.inserted} inserted, {report.updated} updated, {len(report.errors)} rejected.")
+
+    if report.errors:
+        sys.exit(1)
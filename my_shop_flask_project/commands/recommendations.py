@@ -0,0 +1,35 @@
+# commands/recommendations.py
+
+import click
+import time
+from extensions import db
+from flask.cli import AppGroup
+from utils.recommendations import rebuild_recommendations, refresh_recommendations
+
+# `flask recommendations ...` command group for the "customers also bought" tables
+recommendations_cli = AppGroup("recommendations", help="Maintain the co-purchase recommendation tables.")
+
+
+@recommendations_cli.command("rebuild")
+def rebuild():
+    """Recompute all recommendations from the full order history."""
+
+    db.create_all()
+    start = time.perf_counter()
+    counts = rebuild_recommendations()
+
+    for table, count in counts.items():
+        click.echo(f"{table}: {count} rows")
+
+    click.echo(f"Recommendations rebuilt in {time.perf_counter() - start:.1f}s.")
+
+
+@recommendations_cli.command("refresh")
+def refresh():
+    """Fold orders placed since the last refresh into the recommendations."""
+
+    db.create_all()
+    start = time.perf_counter()
+    result = refresh_recommendations()
+    click.echo(f"Folded in {result['orders']} new orders, recomputed {result['products']} products "
+               f"in {time.perf_counter() - start:.1f}s.")
@@ -0,0 +1,27 @@
+# commands/schema.py
+
+import click
+from flask.cli import AppGroup
+from utils.analytics import rebuild_rollups
+from utils.schema import upgrade
+
+# `flask schema ...` command group for in-place schema upgrades
+schema_cli = AppGroup("schema", help="Upgrade the database schema in place.")
+
+
+@schema_cli.command("upgrade")
+def upgrade_schema():
+    """Apply pending schema changes and data conversions (safe to rerun)."""
+
+    applied = upgrade()
+
+    if not applied:
+        click.echo("Schema is up to date.")
+        return
+
+    for name, description in applied:
+        click.echo(f"{name}: {description}")
+
+    # Rollup tables may have been recreated empty
+    counts = rebuild_rollups()
+    click.echo("Rollups rebuilt: " + ", ".join(f"{table}={count}" for table, count in counts.items()))
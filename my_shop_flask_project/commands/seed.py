@@ -0,0 +1,102 @@
+# commands/seed.py
+
+import click
+import time
+from extensions import db
+from flask.cli import AppGroup
+from utils.analytics import rebuild_rollups
+from utils.synthetic_data import SyntheticDataLoader
+
+# `flask seed ...` command group for bulk-loading synthetic data
+seed_cli = AppGroup("seed", help="Bulk-generate and load synthetic data.")
+
+
+def common_options(f):
+    """
+    Adds the options shared by every seed command.
+    """
+
+    f = click.option("--chunk-size", default=5000, show_default=True, help="Rows per batch insert and commit.")(f)
+    f = click.option("--seed", type=int, default=None, help="Random seed for reproducible data.")(f)
+    f = click.option("--password", default="password123", show_default=True,
+                     help="Password shared by all generated users.")(f)
+
+    return f
+
+
+def make_loader(seed, chunk_size, password):
+    """
+    Creates the tables if needed and returns a loader that logs progress to the terminal.
+    """
+
+    db.create_all()
+
+    return SyntheticDataLoader(seed=seed, chunk_size=chunk_size, password=password, log=click.echo)
+
+
+@seed_cli.command("products")
+@click.option("--count", default=1000, show_default=True, help="Number of products.")
+@common_options
+def seed_products(count, seed, chunk_size, password):
+    """Generate and load products."""
+
+    inserted = make_loader(seed, chunk_size, password).load_products(count)
+    click.echo(f"Inserted {inserted} products.")
+
+
+@seed_cli.command("users")
+@click.option("--count", default=1000, show_default=True, help="Number of users.")
+@common_options
+def seed_users(count, seed, chunk_size, password):
+    """Generate and load users with CPF, RG and address data."""
+
+    inserted = make_loader(seed, chunk_size, password).load_users(count)
+    click.echo(f"Inserted {inserted} users.")
+
+
+@seed_cli.command("orders")
+@click.option("--count", default=10000, show_default=True, help="Number of orders.")
+@click.option("--max-items", default=4, show_default=True, help="Maximum items per order.")
+@click.option("--days", default=365, show_default=True, help="Spread order dates over this many past days.")
+@common_options
+def seed_orders(count, max_items, days, seed, chunk_size, password):
+    """Generate and load orders with items for existing users and products."""
+
+    orders, items = make_loader(seed, chunk_size, password).load_orders(count, max_items=max_items, days=days)
+    click.echo(f"Inserted {orders} orders with {items} items. Run `flask analytics rebuild` to refresh the sales rollups.")
+
+
+@seed_cli.command("reviews")
+@click.option("--count", default=10000, show_default=True, help="Maximum number of reviews.")
+@common_options
+def seed_reviews(count, seed, chunk_size, password):
+    """Generate and load reviews for purchased, not yet reviewed products."""
+
+    inserted = make_loader(seed, chunk_size, password).load_reviews(count)
+    click.echo(f"Inserted {inserted} reviews.")
+
+
+@seed_cli.command("all")
+@click.option("--products", default=1000, show_default=True, help="Number of products.")
+@click.option("--users", default=1000, show_default=True, help="Number of users.")
+@click.option("--orders", default=10000, show_default=True, help="Number of orders.")
+@click.option("--reviews", default=10000, show_default=True, help="Maximum number of reviews.")
+@common_options
+def seed_all(products, users, orders, reviews, seed, chunk_size, password):
+    """Generate and load products, users, orders and reviews in one go."""
+
+    loader = make_loader(seed, chunk_size, password)
+    start = time.perf_counter()
+
+    loader.load_products(products)
+    loader.load_users(users)
+    order_count, item_count = loader.load_orders(orders)
+    review_count = loader.load_reviews(reviews)
+
+    # Bulk-loaded orders bypass the incremental rollup updates
+    rebuild_rollups()
+
+    click.echo(
+        f"Inserted {products} products, {users} users, {order_count} orders "
+        f"({item_count} items) and {review_count} reviews in {time.perf_counter() - start:.1f}s."
+    )
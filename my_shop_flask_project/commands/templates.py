@@ -0,0 +1,33 @@
+# commands/templates.py
+
+import click
+import time
+from flask import current_app
+from flask.cli import AppGroup
+
+# `flask templates ...` command group for the Jinja bytecode cache
+templates_cli = AppGroup("templates", help="Precompile templates into the bytecode cache.")
+
+
+@templates_cli.command("compile")
+@click.option("--clear", is_flag=True, help="Empty the cache first (e.g. after a Jinja or Python upgrade).")
+def compile_templates(clear):
+    """Compile every template into the bytecode cache (run at deploy time)."""
+
+    env = current_app.jinja_env
+    cache = env.bytecode_cache
+
+    if cache is None:
+        raise click.ClickException("The bytecode cache is disabled (TEMPLATE_BYTECODE_CACHE_DIR = False).")
+
+    if clear:
+        cache.clear()
+
+    start = time.perf_counter()
+    names = env.list_templates()
+
+    for name in names:
+        # Loading compiles the template and stores its bytecode (or finds it up to date)
+        env.get_template(name)
+
+    click.echo(f"Compiled {len(names)} templates into {cache.directory} in {time.perf_counter() - start:.2f}s.")
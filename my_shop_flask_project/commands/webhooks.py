@@ -0,0 +1,61 @@
+# commands/webhooks.py
+
+import click
+from extensions import db
+from flask import current_app
+from flask.cli import AppGroup
+from models import CheckoutSession
+from utils.webhooks import build_event, process_pending, sign_payload
+
+# `flask webhooks ...` command group for the Stripe event inbox
+webhooks_cli = AppGroup("webhooks", help="Process and simulate Stripe webhook events.")
+
+EVENT_TYPES = {
+    "completed": "checkout.session.completed",
+    "expired": "checkout.session.expired"
+}
+
+
+@webhooks_cli.command("process")
+@click.option("--limit", default=100, show_default=True, help="Maximum number of events to process.")
+def process(limit):
+    """Process pending (and retryable failed) events from the inbox."""
+
+    db.create_all()
+    counts = process_pending(limit)
+
+    if not counts:
+        click.echo("No events to process.")
+
+    for status, count in sorted(counts.items()):
+        click.echo(f"{status}: {count}")
+
+
+@webhooks_cli.command("simulate")
+@click.argument("checkout_ref")
+@click.option("--type", "event_type", type=click.Choice(sorted(EVENT_TYPES)), default="completed", show_default=True)
+@click.option("--repeat", default=1, show_default=True, help="Deliver the same event this many times, like Stripe retries.")
+def simulate(checkout_ref, event_type, repeat):
+    """Send a locally signed Stripe event for a checkout to /cart/webhook."""
+
+    checkout = CheckoutSession.query.filter_by(checkout_ref=checkout_ref).first()
+
+    if checkout is None:
+        raise click.ClickException(f"No checkout with reference {checkout_ref}.")
+
+    payload = build_event(EVENT_TYPES[event_type], {
+        "id": checkout.stripe_session_id or f"cs_local_{checkout.checkout_ref}",
+        "object": "checkout.session",
+        "client_reference_id": checkout.checkout_ref,
+        "payment_status": "paid" if event_type == "completed" else "unpaid",
+        "amount_total": checkout.total_cents
+    })
+    headers = {
+        "Stripe-Signature": sign_payload(payload, current_app.config["STRIPE_WEBHOOK_SECRET"]),
+        "Content-Type": "application/json"
+    }
+    client = current_app.test_client()
+
+    for _ in range(repeat):
+        response = client.post("/cart/webhook", data=payload, headers=headers)
+        click.echo(f"HTTP {response.status_code} {response.get_data(as_text=True).strip()}")
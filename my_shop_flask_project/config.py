@@ -13,6 +13,12 @@ class Config:
     SECRET_KEY = "your-secret-key-supersecure"    # ⚠️ Replace with a secure key or use os.getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = "sqlite:///store.db"    # ⚠️ For production, use a proper database URI
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    BLUEPRINTS = None   # Blueprints to serve, e.g. "admin,auth" for an admin-only worker (None = all)
+
+    # Jinja templates: compiled bytecode is kept in TEMPLATE_BYTECODE_CACHE_DIR (filled at deploy time by
+    # `flask templates compile`), and template files are only checked for edits in debug mode
+    TEMPLATES_AUTO_RELOAD = None        # None = follow debug mode, so always off in production
+    TEMPLATE_BYTECODE_CACHE_DIR = None  # Defaults to instance/jinja_cache; False disables the cache
 
     # Flask-Mail settings (replace with environment variables for security)
     MAIL_SERVER = "smtp.gmail.com"
@@ -25,6 +31,133 @@ class Config:
     # Stripe API keys (use environment variables in production!)
     STRIPE_SECRET_KEY = "sk_test_yourTokenPrivateHere" # ⚠️ Use os.getenv("STRIPE_SECRET_KEY")
     STRIPE_PUBLIC_KEY = "pk_test_yourTokenPublicHere"
+    STRIPE_WEBHOOK_SECRET = "whsec_yourWebhookSecretHere"   # ⚠️ Use os.getenv("STRIPE_WEBHOOK_SECRET")
+    STRIPE_WEBHOOK_WORKERS = 2          # Threads processing webhook events (0 = only `flask webhooks process`)
+    STRIPE_WEBHOOK_MAX_ATTEMPTS = 5     # Failed events are retried by `flask webhooks process` up to this many times
+    STRIPE_WEBHOOK_PROCESSING_TIMEOUT_SECONDS = 300     # Events processing longer are assumed lost with their worker and claimed again
+    STRIPE_API_BASE = None              # Override the Stripe API URL (e.g. a local stub for benchmarks)
+
+    # Payment gateway (utils/payments.py): "stripe", or "fake" to run without Stripe
+    PAYMENT_GATEWAY = "stripe"
+    PAYMENT_POOL_SIZE = 10                  # Keep-alive connections to Stripe per worker process
+    PAYMENT_CONNECT_TIMEOUT_SECONDS = 3
+    PAYMENT_TIMEOUT_SECONDS = 10            # A slow Stripe response releases the worker after this long
+    PAYMENT_MAX_RETRIES = 2                 # Extra attempts, only for idempotent calls
+    PAYMENT_RETRY_BACKOFF_SECONDS = 0.25    # Base of the jittered exponential backoff
+    PAYMENT_BREAKER_THRESHOLD = 5           # Consecutive failures that stop calls to Stripe...
+    PAYMENT_BREAKER_RESET_SECONDS = 30      # ...for this long
+
+    # Inventory reservations: a checkout's Stripe session expires after this many seconds
+    # (never less than Stripe's 30 minutes) and its stock holds a grace period later
+    STOCK_HOLD_TTL_SECONDS = 1800
+    STOCK_HOLD_GRACE_SECONDS = 300      # So a payment completed at the session's last second still finds its holds
+    STOCK_SWEEP_INTERVAL_SECONDS = 60   # Period of the background job deleting expired holds
+
+    # Background jobs (utils/jobs.py), queued in the database and run by `flask worker`
+    # and/or by worker threads inside each web process
+    JOBS_EMBEDDED_THREADS = 1           # 0 = only dedicated `flask worker` processes run jobs
+    JOBS_POLL_INTERVAL_SECONDS = 1
+    JOBS_TIMEOUT_SECONDS = 600          # Jobs running longer are assumed lost with their worker and requeued
+    JOBS_RETENTION_HOURS = 24           # Succeeded jobs are purged after this long
+
+    # Cart pages read product names/prices/stock through a short-lived per-process cache
+    CART_CACHE_TTL_SECONDS = 10
+
+    # Home, catalog and review page aggregates (utils/storefront.py) are shared by all visitors through
+    # a per-process single-flight cache (utils/cache.py): one request recomputes an entry, the others wait for it
+    HOT_CACHE_ENABLED = True
+    HOT_CACHE_TTL_SECONDS = 60
+    HOT_CACHE_STALE_SECONDS = 30        # Expired entries are still served this long while one thread recomputes them
+    HOT_CACHE_EARLY_BETA = 1.0          # Probabilistic early refresh before expiry (0 = off, >1 = earlier)
+    HOT_CACHE_WAIT_SECONDS = 5          # Requests waiting longer on a computation run their own
+    HOT_CACHE_MAXSIZE = 1000
+
+    # Streamed pages (catalog, product reviews) are sent in pieces of about this size, and the catalog
+    # reads and renders its products this many at a time
+    STREAM_BUFFER_BYTES = 16384
+    CATALOG_CHUNK_SIZE = 48
+
+    # Reviews: shown on each catalog card, and per page of the review feed (more load on demand)
+    REVIEWS_PREVIEW_COUNT = 5
+    REVIEWS_PAGE_SIZE = 20
+
+    # "Customers also bought" (utils/recommendations.py), precomputed from co-purchases and
+    # refreshed from new orders by a background job
+    RECOMMENDATIONS_TOP_K = 10              # Neighbours stored per product
+    RECOMMENDATIONS_SHOWN = 4               # Shown on the product and cart pages
+    RECOMMENDATIONS_MIN_SUPPORT = 1         # Pairs bought together in fewer orders are ignored
+    RECOMMENDATIONS_REFRESH_SECONDS = 300
+
+    # Shipping quotes (utils/shipping.py), computed in memory from these tables. Zones are inclusive ranges of
+    # 8-digit zip codes (CEP); each zone prices the weight brackets, then every started kg above the last one
+    SHIPPING_ZONES = [
+        ("01000-000", "19999-999", "sp"),
+        ("20000-000", "39999-999", "southeast"),
+        ("40000-000", "65999-999", "northeast"),
+        ("66000-000", "69999-999", "north"),
+        ("70000-000", "79999-999", "center_west"),
+        ("80000-000", "99999-999", "south")
+    ]
+    SHIPPING_WEIGHT_BRACKETS_GRAMS = [500, 1000, 2000, 5000, 10000, 30000]
+    SHIPPING_RATES_CENTS = {
+        "sp":          [1290, 1490, 1790, 2490, 3490, 6990, 250],
+        "southeast":   [1590, 1890, 2290, 3190, 4490, 8990, 320],
+        "south":       [1790, 2090, 2590, 3590, 4990, 9990, 350],
+        "center_west": [2090, 2490, 2990, 4190, 5790, 11490, 420],
+        "northeast":   [2290, 2690, 3290, 4590, 6390, 12490, 450],
+        "north":       [2690, 3190, 3890, 5390, 7490, 14990, 550]
+    }
+    SHIPPING_FREE_THRESHOLD_CENTS = 29900   # Carts worth this much ship free (None = never)
+    SHIPPING_DEFAULT_WEIGHT_GRAMS = 500     # Weight of products without one
+    SHIPPING_DEFAULT_ZONE = None            # Zone of zip codes outside every range (None = no delivery there)
+
+    # Order archiving (utils/archive.py): delivered orders older than this move, in batches, from the live
+    # tables to orders_archive/order_items_archive, which history pages, exports and analytics also read
+    ORDERS_ARCHIVE_AFTER_DAYS = 90              # None = never archive
+    ORDERS_ARCHIVE_BATCH_SIZE = 1000            # Orders per transaction
+    ORDERS_ARCHIVE_INTERVAL_SECONDS = 3600
+
+    # In-memory Bloom filters of taken emails, CPFs and RGs (utils/identifiers.py): sign-ups and
+    # profile edits only query the users table when a value might already be registered
+    IDENTIFIER_FILTER_ENABLED = True
+    IDENTIFIER_FILTER_ERROR_RATE = 0.01         # Share of new values that still need a query
+    IDENTIFIER_FILTER_MAX_AGE_SECONDS = 600     # Rebuilt this often to pick up other processes' sign-ups
+
+    # Password hashing policy (utils/passwords.py): hashes made with another method or salt
+    # length are upgraded on the user's next successful login
+    PASSWORD_HASH_METHOD = "scrypt:32768:8:1"
+    PASSWORD_SALT_LENGTH = 16
+    PASSWORD_HASH_WORKERS = 2               # Threads (≈ cores) hashing at once; the rest stay free for browsing
+    PASSWORD_HASH_MAX_PENDING = 32          # Logins queued for a hash beyond that are answered 503 at once
+    PASSWORD_HASH_TIMEOUT_SECONDS = 10
+
+    # Rate limits of login, register, add to cart and review form (utils/rate_limit.py).
+    # "memory" counts per worker process; "sqlite" shares the counts between the workers of a host
+    RATELIMIT_ENABLED = True
+    RATELIMIT_BACKEND = "memory"
+    RATELIMIT_SQLITE_PATH = None    # Defaults to instance/ratelimit.db
+
+
+class TestingConfig(Config):
+    """
+    Configuration used by automated runs (benchmarks, local checks).
+
+    Uses an in-memory SQLite database, disables CSRF so forms can be posted
+    directly through the test client, suppresses outgoing emails, turns off
+    rate limiting, replaces Stripe with the in-memory fake payment gateway
+    and keeps compiled templates out of the instance folder.
+    """
+
+    TESTING = True
+    WTF_CSRF_ENABLED = False
+    SQLALCHEMY_DATABASE_URI = "sqlite://"
+    MAIL_SUPPRESS_SEND = True
+    JOBS_EMBEDDED_THREADS = 0
+    STRIPE_WEBHOOK_SECRET = "whsec_testing"
+    PAYMENT_GATEWAY = "fake"
+    RATELIMIT_ENABLED = False
+    PASSWORD_HASH_METHOD = "pbkdf2:sha256:1000"     # Cheap on purpose; never use in production
+    TEMPLATE_BYTECODE_CACHE_DIR = False
 
 ## -----------------------------------------------
 # Alternative: Secure environment-based config
@@ -51,3 +184,4 @@ class Config:
 #     # Stripe
 #     STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 #     STRIPE_PUBLIC_KEY = os.getenv("STRIPE_PUBLIC_KEY")
+#     STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET")
@@ -3,7 +3,6 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_wtf.csrf import CSRFProtect
-from flask_migrate import Migrate
 from flask_mail import Mail
 
 # Global instances of Flask extensions.
@@ -13,5 +12,17 @@ from flask_mail import Mail
 db = SQLAlchemy()
 login_manager = LoginManager()
 csrf = CSRFProtect()
-migrate = Migrate()
 mail = Mail()
+
+
+def init_migrate(app):
+    """
+    Sets up Flask-Migrate for the `flask db` commands. Imported here rather
+    than at module level because it pulls in Alembic (and Mako), which web
+    and job workers never use.
+
+    :param app: (Flask) The application instance.
+    """
+
+    from flask_migrate import Migrate
+    Migrate(app, db)
@@ -1,5 +1,6 @@
 from .add_product_form import AddProductForm
 from .edit_product_form import EditProductForm
+from .import_products_form import ImportProductsForm
 from .login_form import LoginForm
 from .register_form import RegisterForm
 from .user_data import UserData
\ No newline at end of file
@@ -2,7 +2,7 @@
 
 from flask_wtf import FlaskForm
 from wtforms import StringField, IntegerField, SubmitField
-from wtforms.validators import DataRequired
+from wtforms.validators import DataRequired, NumberRange, Optional, Regexp
 
 
 class AddProductForm(FlaskForm):
@@ -11,16 +11,21 @@ class AddProductForm(FlaskForm):
 
     Fields:
     - name: Product name (required)
-    - price: Product price as string (required, consider validating format separately)
+    - price: Product price as a decimal string with up to 2 places (required, stored in cents)
     - description: Product description (required)
     - img_url: URL or filename for product image (required)
     - quantity: Initial stock quantity (required integer)
+    - weight_grams: Shipping weight in grams (optional; the default weight applies when empty)
     - submit: Submit button
     """
 
     name = StringField(label="Name", validators=[DataRequired()])
-    price = StringField(label="Price", validators=[DataRequired()])
+    price = StringField(label="Price", validators=[
+        DataRequired(),
+        Regexp(r"^\d+(\.\d{1,2})?$", message="Enter a price like 19.90.")
+    ])
     description = StringField(label="Description", validators=[DataRequired()])
     img_url = StringField(label="Image URL", validators=[DataRequired()])
     quantity = IntegerField("Quantity", validators=[DataRequired()])
+    weight_grams = IntegerField("Weight (g)", validators=[Optional(), NumberRange(min=1)])
     submit = SubmitField("Add Product")
@@ -0,0 +1,18 @@
+# forms/import_products_form.py
+
+from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
+from wtforms import SubmitField
+
+
+class ImportProductsForm(FlaskForm):
+    """
+    Form used by admins to bulk import products from a file.
+
+    Fields:
+    - file: CSV or JSON Lines file (required, .csv or .jsonl)
+    - submit: Submit button
+    """
+
+    file = FileField("Products file", validators=[FileRequired(), FileAllowed(["csv", "jsonl"], "CSV or JSONL only.")])
+    submit = SubmitField("Import Products")
@@ -1,6 +1,17 @@
 # models/__init__.py
 from .user import User
+from .address import Address
 from .product import Products
 from .order import Order, OrderItem
+from .analytics import DailySales, ProductDailySales, CustomerSales
+from .inventory import StockHold
+from .checkout import CheckoutSession, StripeEvent
+from .job import Job
+from .recommendation import ProductCoPurchase, ProductRecommendation, RecommendationState
+from .archive import ArchivedOrder, ArchivedOrderItem
 
-__all__ = ["User", "Products", "Order", "OrderItem"]
\ No newline at end of file
+__all__ = [
+    "User", "Address", "Products", "Order", "OrderItem", "DailySales", "ProductDailySales", "CustomerSales", "StockHold",
+    "CheckoutSession", "StripeEvent", "Job", "ProductCoPurchase", "ProductRecommendation", "RecommendationState",
+    "ArchivedOrder", "ArchivedOrderItem"
+]
\ No newline at end of file
@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import ForeignKey, Index, TIMESTAMP, false, true
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # These imports are only used for type hints during static analysis.
+    # Prevents circular imports at runtime.
+    from .user import User
+
+
+class Address(db.Model):
+    """
+    A user's shipping address and contact phone. A user can have several;
+    the one flagged `is_default` is used for checkout and shown on orders.
+
+    Attributes:
+        id (int): Primary key.
+        user_id (int): Foreign key referencing the owner.
+        phone (str): Contact phone number.
+        street (str): Street name.
+        number (str): House/building number.
+        city (str): City name.
+        state (str): State or region.
+        zip_code (str): Postal/zip code, as entered.
+        country (str): Country name.
+        is_default (bool): Whether this is the user's default address (at most one per user).
+        created_at (datetime): When the address was added (UTC).
+        user (User): Relationship to the owner.
+    """
+
+    __tablename__ = "addresses"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False, index=True)
+    phone: Mapped[str] = mapped_column(nullable=False)
+    street: Mapped[str] = mapped_column(nullable=False)
+    number: Mapped[str] = mapped_column(nullable=False)
+    city: Mapped[str] = mapped_column(nullable=False)
+    state: Mapped[str] = mapped_column(nullable=False)
+    zip_code: Mapped[str] = mapped_column(nullable=False, index=True)
+    country: Mapped[str] = mapped_column(nullable=False)
+    is_default: Mapped[bool] = mapped_column(default=False, server_default=false(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    user: Mapped["User"] = relationship("User", back_populates="addresses")
+
+
+# At most one default address per user, enforced by the database
+Index("uq_addresses_user_default", Address.user_id, unique=True,
+      sqlite_where=Address.is_default == true(), postgresql_where=Address.is_default == true())
+
+# Region analytics group default addresses by country and state straight from this index
+# (user_id included to join the customer rollup), never touching the table
+Index("ix_addresses_region", Address.country, Address.state, Address.zip_code, Address.user_id,
+      sqlite_where=Address.is_default == true(), postgresql_where=Address.is_default == true())
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from extensions import db
+from sqlalchemy import ForeignKey, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class DailySales(db.Model):
+    """
+    Pre-aggregated store-wide sales for one day (UTC).
+
+    Maintained incrementally when orders are created and rebuilt with
+    `flask analytics rebuild`, so dashboards never scan the order history.
+
+    Attributes:
+        day (date): Primary key, the calendar day.
+        orders (int): Number of orders placed that day.
+        units (int): Number of units sold that day.
+        revenue_cents (int): Sum of order totals for that day, in cents.
+    """
+
+    __tablename__ = "sales_daily"
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    orders: Mapped[int] = mapped_column(default=0, nullable=False)
+    units: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue_cents: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class ProductDailySales(db.Model):
+    """
+    Pre-aggregated sales of one product on one day (UTC).
+
+    Attributes:
+        day (date): Part of the primary key, the calendar day.
+        product_id (int): Part of the primary key, the product sold.
+        units (int): Units of the product sold that day.
+        revenue_cents (int): Revenue from the product that day (quantity x unit price), in cents.
+    """
+
+    __tablename__ = "sales_product_daily"
+
+    day: Mapped[date] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    units: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue_cents: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class CustomerSales(db.Model):
+    """
+    Lifetime purchase totals per customer.
+
+    Attributes:
+        user_id (int): Primary key, the customer.
+        orders (int): Number of orders placed.
+        revenue_cents (int): Sum of the customer's order totals in cents (indexed for top-customer lookups).
+        last_order_at (datetime): When the most recent order was placed.
+    """
+
+    __tablename__ = "sales_customer"
+
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), primary_key=True)
+    orders: Mapped[int] = mapped_column(default=0, nullable=False)
+    revenue_cents: Mapped[int] = mapped_column(default=0, nullable=False, index=True)
+    last_order_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import ForeignKey, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from typing import List, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # These imports are only used for type hints during static analysis.
+    # Prevents circular imports at runtime.
+    from .user import User
+    from .product import Products
+
+
+class ArchivedOrder(db.Model):
+    """
+    A delivered order moved out of the live `orders` table by the archiver
+    (utils/archive.py), so day-to-day order queries only scan recent orders.
+    Keeps the original id and columns, and the same relationships as Order,
+    so pages showing order history render either kind.
+
+    Attributes:
+        id (int): Primary key, the order's original id.
+        date (datetime): Date and time the order was placed (UTC).
+        total_cents (int): Total monetary value of the order, in cents (shipping included).
+        shipping_cents (int): Shipping charged, in cents.
+        status (str): Status when archived ('Delivered').
+        user_id (int): Foreign key referencing the user who placed the order.
+        archived_at (datetime): When the order was archived (UTC).
+        user (User): Relationship to the User object.
+        items (List[ArchivedOrderItem]): The order's archived items.
+    """
+
+    __tablename__ = "orders_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, index=True)
+    total_cents: Mapped[int] = mapped_column(nullable=False)
+    shipping_cents: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    status: Mapped[str] = mapped_column(nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    archived_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    user: Mapped["User"] = relationship("User")
+    items: Mapped[List["ArchivedOrderItem"]] = relationship("ArchivedOrderItem", back_populates="order")
+
+
+class ArchivedOrderItem(db.Model):
+    """
+    An item of an archived order, with its original id.
+
+    Attributes:
+        id (int): Primary key, the item's original id.
+        order_id (int): Foreign key referencing the archived order.
+        product_id (int): Foreign key referencing the product purchased.
+        quantity (int): Quantity of the product ordered.
+        price_cents (int): Unit price of the product at the time of the order, in cents.
+        order (ArchivedOrder): Relationship to the parent archived order.
+        product (Products): Relationship to the purchased Product.
+    """
+
+    __tablename__ = "order_items_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders_archive.id"), index=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
+    quantity: Mapped[int] = mapped_column(nullable=False)
+    price_cents: Mapped[int] = mapped_column(nullable=False)
+
+    order: Mapped["ArchivedOrder"] = relationship("ArchivedOrder", back_populates="items")
+    product: Mapped["Products"] = relationship("Products")
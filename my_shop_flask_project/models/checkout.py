@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import ForeignKey, JSON, Text, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class CheckoutSession(db.Model):
+    """
+    One checkout attempt, linking the Stripe session to the cart it was paid for.
+
+    The cart is snapshotted when the checkout starts so the order can be
+    created without the customer's browser session (e.g. from the Stripe
+    webhook). `status` moves from 'open' to 'completed' exactly once, which
+    makes fulfilment idempotent between `/cart/success` and the webhook.
+
+    Attributes:
+        id (int): Primary key.
+        checkout_ref (str): Unique reference shared with the stock holds and sent to Stripe as client_reference_id.
+        stripe_session_id (str): Stripe Checkout Session id (unique, set once the session is created).
+        user_id (int): Customer checking out.
+        cart (dict): Snapshot of the session cart ({product_id: {name, price_cents, quantity}}).
+        total_cents (int): Amount charged at checkout time (cart plus shipping), in cents.
+        shipping_cents (int): Shipping part of the total, in cents.
+        status (str): 'open', 'completed' or 'expired'.
+        order_id (int): Order created for this checkout, once completed. Not a foreign key: the
+                        order may since have moved to the archive (see utils.archive.find_order).
+        created_at (datetime): When the checkout started (UTC).
+    """
+
+    __tablename__ = "checkout_sessions"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    checkout_ref: Mapped[str] = mapped_column(unique=True, nullable=False)
+    stripe_session_id: Mapped[str] = mapped_column(unique=True, nullable=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    cart: Mapped[dict] = mapped_column(JSON, nullable=False)
+    total_cents: Mapped[int] = mapped_column(nullable=False)
+    shipping_cents: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
+    status: Mapped[str] = mapped_column(default="open", nullable=False)
+    order_id: Mapped[int] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+
+class StripeEvent(db.Model):
+    """
+    Inbox of verified Stripe webhook events, stored raw before processing.
+
+    The unique `event_id` deduplicates Stripe's retries: a redelivered event
+    is acknowledged without being stored or processed again.
+
+    Attributes:
+        id (int): Primary key.
+        event_id (str): Stripe event id (evt_...), unique.
+        type (str): Event type, e.g. 'checkout.session.completed'.
+        payload (str): Raw JSON body as received.
+        status (str): 'pending', 'processing', 'processed', 'ignored' or 'failed'.
+        attempts (int): Number of processing attempts.
+        last_error (str): Error message of the last failed attempt.
+        received_at (datetime): When the event was received (UTC).
+        claimed_at (datetime): When the last processing attempt started (UTC).
+        processed_at (datetime): When processing finished (UTC).
+    """
+
+    __tablename__ = "stripe_events"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_id: Mapped[str] = mapped_column(unique=True, nullable=False)
+    type: Mapped[str] = mapped_column(nullable=False)
+    payload: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(default="pending", nullable=False, index=True)
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    claimed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    processed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import ForeignKey, Index, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class StockHold(db.Model):
+    """
+    A short-lived reservation of stock made while a customer is in checkout.
+
+    Holds only exist while they are live: they are deleted when the checkout
+    succeeds (and the stock is decremented), when it is cancelled, or by the
+    sweeper once `expires_at` has passed. Available-to-sell is the product's
+    quantity minus the sum of its unexpired holds, read through the
+    (product_id, expires_at) index.
+
+    Attributes:
+        id (int): Primary key.
+        product_id (int): Product being reserved.
+        user_id (int): Customer holding the stock.
+        checkout_ref (str): Identifier shared by all holds of one checkout attempt.
+        quantity (int): Units reserved.
+        created_at (datetime): When the hold was placed (UTC).
+        expires_at (datetime): When the hold stops counting against availability (UTC).
+    """
+
+    __tablename__ = "stock_holds"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    checkout_ref: Mapped[str] = mapped_column(nullable=False, index=True)
+    quantity: Mapped[int] = mapped_column(nullable=False)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        Index("ix_stock_holds_product_expires", "product_id", "expires_at"),
+    )
@@ -0,0 +1,53 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import Index, JSON, Text, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class Job(db.Model):
+    """
+    A unit of deferred work in the database-backed job queue (utils/jobs.py).
+
+    Workers pick queued jobs whose `run_at` has passed, highest `priority`
+    first, through the (status, run_at, priority) index, and claim each one
+    with a conditional UPDATE so it runs on one worker at a time. A failed
+    job goes back to 'queued' with a later `run_at` until `max_attempts` is
+    reached, then stays 'dead' for inspection.
+
+    Attributes:
+        id (int): Primary key.
+        name (str): Registered task name, e.g. 'orders.send_confirmation'.
+        args (dict): Keyword arguments for the task (JSON).
+        priority (int): Higher runs first.
+        status (str): 'queued', 'running', 'succeeded' or 'dead'.
+        attempts (int): Times the job has been started.
+        max_attempts (int): Attempts before the job is given up.
+        run_at (datetime): Earliest time the job may run (UTC).
+        unique_key (str): Optional deduplication key, unique (e.g. one run per periodic slot).
+        locked_by (str): Worker running the job.
+        started_at (datetime): When the current or last attempt started (UTC).
+        finished_at (datetime): When the job succeeded or died (UTC).
+        last_error (str): Error of the last failed attempt.
+        created_at (datetime): When the job was enqueued (UTC).
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(nullable=False)
+    args: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    priority: Mapped[int] = mapped_column(nullable=False, default=0)
+    status: Mapped[str] = mapped_column(nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False, default=5)
+    run_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+    unique_key: Mapped[str] = mapped_column(unique=True, nullable=True)
+    locked_by: Mapped[str] = mapped_column(nullable=True)
+    started_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_at_priority", "status", "run_at", "priority"),
+    )
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 from extensions import db
-from sqlalchemy import ForeignKey, TIMESTAMP
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import ForeignKey, Index, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 from typing import List, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -11,6 +11,19 @@ if TYPE_CHECKING:
     from .product import Products
 
 
+def normalize_status(status):
+    """
+    Canonical spelling of an order status ('delivered ' -> 'Delivered'), used both
+    when a status is stored and when one is filtered on, so queries compare the
+    column as it is and can use its index.
+
+    :param status: (str) Status as entered.
+    :return: (str)
+    """
+
+    return status.strip().capitalize()
+
+
 class Order(db.Model):
     """
     Represents a customer order in the system.
@@ -18,25 +31,36 @@ class Order(db.Model):
     Attributes:
         id (int): Primary key of the order.
         date (datetime): Date and time the order was placed (UTC).
-        total (float): Total monetary value of the order.
-        status (str): Current status of the order (e.g., 'Processing', 'Shipped', 'Delivered').
+        total_cents (int): Total monetary value of the order, in cents (shipping included).
+        shipping_cents (int): Shipping charged, in cents.
+        status (str): Current status of the order (e.g., 'Processing', 'Shipped', 'Delivered'),
+                      always stored normalized (see normalize_status()).
         user_id (int): Foreign key referencing the user who placed the order.
         user (User): Relationship to the User object.
         items (List[OrderItem]): List of OrderItem objects associated with this order.
     """
 
     __tablename__ = "orders"
+    __table_args__ = (
+        # Status filters of the exports and reports, and the archiver's delivered-orders scan
+        Index("ix_orders_status_date", "status", "date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc), nullable=False)
-    total: Mapped[float] = mapped_column(nullable=False)
+    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
+    total_cents: Mapped[int] = mapped_column(nullable=False)
+    shipping_cents: Mapped[int] = mapped_column(default=0, server_default="0", nullable=False)
     status: Mapped[str] = mapped_column(default="Processing", nullable=False)
 
-    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     user: Mapped["User"] = relationship("User", back_populates = "orders")
 
     items: Mapped[List["OrderItem"]] = relationship("OrderItem", back_populates="order")
 
+    @validates("status")
+    def _normalize_status(self, key, status):
+        return normalize_status(status)
+
 
 class OrderItem(db.Model):
 
@@ -48,7 +72,7 @@ class OrderItem(db.Model):
         order_id (int): Foreign key referencing the parent order.
         product_id (int): Foreign key referencing the product purchased.
         quantity (int): Quantity of the product ordered.
-        price (float): Price of the product at the time of the order.
+        price_cents (int): Unit price of the product at the time of the order, in cents.
         order (Order): Relationship to the parent Order object.
         product (Products): Relationship to the purchased Product.
     """
@@ -56,10 +80,10 @@ class OrderItem(db.Model):
     __tablename__ = "order_items"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"))
+    order_id: Mapped[int] = mapped_column(ForeignKey("orders.id"), index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     quantity: Mapped[int] = mapped_column(nullable=False)
-    price: Mapped[float] = mapped_column(nullable=False)
+    price_cents: Mapped[int] = mapped_column(nullable=False)
 
     order: Mapped["Order"] = relationship("Order", back_populates="items")
 
@@ -82,6 +106,7 @@ class Review(db.Model):
 
     Constraints:
         A user can only submit one review per product (enforced via unique constraint on user_id + product_id).
+        Reviews are paged per product newest first through the (product_id, id) index.
     """
 
     __tablename__ = "reviews"
@@ -89,7 +114,7 @@ class Review(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     rating: Mapped[int] = mapped_column(nullable=False)
     comment: Mapped[str] = mapped_column(nullable=True)
-    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=datetime.now(timezone.utc))
+    date: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
@@ -99,4 +124,5 @@ class Review(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint('user_id', 'product_id', name='uix_user_product'),
+        Index("ix_reviews_product_id_id", "product_id", "id"),
     )
@@ -1,8 +1,7 @@
-from decimal import Decimal
 from extensions import db
-from sqlalchemy import Numeric
+from sqlalchemy import Index, true
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     # These imports are only used for type hints during static analysis.
@@ -17,19 +16,24 @@ class Products(db.Model):
     Attributes:
         id (int): Primary key of the product.
         name (str): Name of the product.
-        price (Decimal): Product price stored using fixed-point precision (2 decimal places).
+        price_cents (int): Product price in cents (integer minor units).
         description (str): Description of the product.
         img_url (str): Path or URL to the product's image.
         quantity (int): Available quantity in stock.
+        weight_grams (int, optional): Shipping weight; SHIPPING_DEFAULT_WEIGHT_GRAMS is used when unset.
+        active (bool): False once the product is archived (discontinued): it leaves the storefront
+                       but its row stays, so past orders and reviews still resolve it.
         reviews (List[Review]): List of reviews associated with this product.
     """
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(nullable=False)
-    price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
+    name: Mapped[str] = mapped_column(nullable=False, index=True)    # Indexed for name-keyed bulk imports
+    price_cents: Mapped[int] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=False)
     img_url: Mapped[str] = mapped_column(nullable=False)
     quantity: Mapped[int] = mapped_column(nullable=False)
+    weight_grams: Mapped[Optional[int]] = mapped_column(nullable=True)
+    active: Mapped[bool] = mapped_column(default=True, server_default=true(), nullable=False)
 
     reviews: Mapped[List["Review"]] = relationship("Review", back_populates="product")
 
@@ -43,3 +47,8 @@ class Products(db.Model):
         """
 
         return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
+# Partial index over the live assortment only: storefront reads filter on `Products.active` and
+# range-scan it by id, however many archived products the table holds
+Index("ix_products_active_id", Products.id, sqlite_where=Products.active == true(), postgresql_where=Products.active == true())
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+from extensions import db
+from sqlalchemy import ForeignKey, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class ProductCoPurchase(db.Model):
+    """
+    One non-zero cell of the sparse product co-occurrence matrix: how many
+    orders contained both products. Stored in both directions, and the
+    diagonal (product_id == other_id) holds the number of orders containing
+    the product, so scores can be recomputed for any product from its own rows.
+
+    Attributes:
+        product_id (int): Part of the primary key, the row product.
+        other_id (int): Part of the primary key, the column product.
+        orders (int): Orders containing both products.
+    """
+
+    __tablename__ = "product_copurchase"
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    other_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    orders: Mapped[int] = mapped_column(nullable=False, default=0)
+
+
+class ProductRecommendation(db.Model):
+    """
+    Precomputed "customers also bought" list: the top-K products most often
+    bought together with a product, read with one primary key range scan.
+
+    Attributes:
+        product_id (int): Part of the primary key, the product being viewed.
+        rank (int): Part of the primary key, 0 for the best match.
+        recommended_id (int): The recommended product.
+        score (float): Cosine similarity of the two products' order sets (0..1].
+    """
+
+    __tablename__ = "product_recommendations"
+
+    product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), primary_key=True)
+    rank: Mapped[int] = mapped_column(primary_key=True)
+    recommended_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
+    score: Mapped[float] = mapped_column(nullable=False)
+
+
+class RecommendationState(db.Model):
+    """
+    Single-row bookkeeping of the recommender: orders up to `last_order_id`
+    are already counted in product_copurchase.
+
+    Attributes:
+        id (int): Primary key, always 1.
+        last_order_id (int): Highest order id folded into the matrix.
+        refreshed_at (datetime): When the matrix was last updated (UTC).
+    """
+
+    __tablename__ = "recommendation_state"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    last_order_id: Mapped[int] = mapped_column(nullable=False, default=0)
+    refreshed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,10 +1,11 @@
 from extensions import db
 from flask_login import UserMixin
-from sqlalchemy import JSON
+from sqlalchemy import false
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from .address import Address
     from .order import Order, Review
 
 
@@ -20,10 +21,13 @@ class User(UserMixin, db.Model):
         email (str): Unique email address for login.
         cpf (str, optional): Brazilian CPF document number. Must be unique if present.
         rg (str, optional): Brazilian RG document number. Must be unique if present.
-        user_data (dict, optional): JSON field for storing additional info such as address, phone, etc.
+        profile_complete (bool): Whether CPF, RG and a full default address are filled in, kept up to date
+                                 when the profile is saved (see utils/addresses.py), so checkout only reads this flag.
         password (str): Hashed password for authentication.
         orders (List[Order]): List of orders placed by this user.
         reviews (List[Review]): List of product reviews submitted by this user.
+        addresses (List[Address]): The user's addresses, default first.
+        default_address (Address, optional): The address flagged as default, if any.
     """
 
     __tablename__ = "users"
@@ -33,8 +37,16 @@ class User(UserMixin, db.Model):
     email: Mapped[str] = mapped_column(unique=True, nullable=False)
     cpf: Mapped[str] = mapped_column(unique=True, nullable=True)
     rg: Mapped[str] = mapped_column(unique=True, nullable=True)
-    user_data: Mapped[dict] = mapped_column(JSON, nullable=True)
+    profile_complete: Mapped[bool] = mapped_column(default=False, server_default=false(), nullable=False)
     password: Mapped[str] = mapped_column(nullable=False)
 
     orders: Mapped[List["Order"]] = relationship("Order", back_populates = "user")
     reviews: Mapped[List["Review"]] = relationship("Review", back_populates="user")
+    addresses: Mapped[List["Address"]] = relationship(
+        "Address", back_populates="user", order_by="(Address.is_default.desc(), Address.id)"
+    )
+    # Joined into the query loading the user (e.g. Flask-Login's), so shipping quotes need no extra query
+    default_address: Mapped[Optional["Address"]] = relationship(
+        "Address", primaryjoin="and_(User.id == Address.user_id, Address.is_default == true())",
+        viewonly=True, uselist=False, lazy="joined"
+    )
@@ -0,0 +1,59 @@
+/*
+	Review feeds: a button with data-review-feed (feed URL), data-after (cursor)
+	and data-target (id of the review list) appends the next page of reviews
+	to the list on each click, and disappears after the last page.
+*/
+
+(function() {
+
+	function reviewItem(review) {
+		var item = document.createElement('li'),
+			rating = document.createElement('strong'),
+			author = document.createElement('small');
+
+		rating.textContent = review.rating + ' / 5';
+		author.textContent = 'By ' + review.author;
+
+		item.appendChild(rating);
+		item.appendChild(document.createTextNode(' - ' + (review.comment || 'No comment')));
+		item.appendChild(document.createElement('br'));
+		item.appendChild(author);
+
+		return item;
+	}
+
+	document.addEventListener('click', function(event) {
+		var button = event.target.closest('[data-review-feed]');
+
+		if (!button || button.disabled)
+			return;
+
+		var list = document.getElementById(button.dataset.target),
+			url = button.dataset.reviewFeed + '?after=' + encodeURIComponent(button.dataset.after);
+
+		button.disabled = true;
+
+		fetch(url, { headers: { 'Accept': 'application/json' } })
+			.then(function(response) {
+				if (!response.ok) throw new Error('Network response was not ok');
+				return response.json();
+			})
+			.then(function(data) {
+				data.reviews.forEach(function(review) {
+					list.appendChild(reviewItem(review));
+				});
+
+				if (data.next) {
+					button.dataset.after = data.next;
+					button.disabled = false;
+				}
+				else
+					button.remove();
+			})
+			.catch(function() {
+				button.textContent = 'Could not load reviews, try again';
+				button.disabled = false;
+			});
+	});
+
+})();
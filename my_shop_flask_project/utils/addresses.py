@@ -0,0 +1,44 @@
+# utils/addresses.py
+
+from extensions import db
+from models import Address
+
+# Address columns filled in by the profile form, all required for checkout
+ADDRESS_FIELDS = ("phone", "street", "number", "city", "state", "zip_code", "country")
+
+
+def profile_fields_complete(cpf, rg, address):
+    """
+    Whether a profile has everything checkout needs: CPF, RG and every address field.
+
+    :param cpf: (str | None) The user's CPF.
+    :param rg: (str | None) The user's RG.
+    :param address: (dict | None) Address values by field name.
+    :return: (bool)
+    """
+
+    return bool(cpf and rg and address and all(address.get(field) for field in ADDRESS_FIELDS))
+
+
+def save_default_address(user, values):
+    """
+    Updates the user's default address with `values`, creating it if the user
+    has none, and refreshes `user.profile_complete`. The caller commits.
+
+    :param user: (User) The user.
+    :param values: (dict) Value of every field in ADDRESS_FIELDS.
+    :return: (Address) The default address.
+    """
+
+    address = user.default_address
+
+    if address is None:
+        address = Address(user=user, is_default=True)
+        db.session.add(address)
+
+    for field in ADDRESS_FIELDS:
+        setattr(address, field, values[field])
+
+    user.profile_complete = profile_fields_complete(user.cpf, user.rg, values)
+
+    return address
@@ -0,0 +1,183 @@
+# utils/analytics.py
+
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from models import Address, CustomerSales, DailySales, ProductDailySales, Products, User
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from utils.archive import order_history, order_item_history
+
+
+def _increment(model, keys, increments, extra=None):
+    """
+    Adds `increments` to the rollup row identified by `keys`, creating it if needed.
+
+    Runs an atomic `UPDATE ... SET col = col + :delta` first; only when no row
+    exists yet does it INSERT. If a concurrent request inserted the same row in
+    between, the INSERT fails on the primary key and the UPDATE is retried.
+
+    :param model: (db.Model) Rollup model.
+    :param keys: (dict) Primary key values.
+    :param increments: (dict) Column name -> amount to add.
+    :param extra: (dict, optional) Columns to overwrite (e.g. last_order_at).
+    """
+
+    values = {name: getattr(model, name) + amount for name, amount in increments.items()}
+    values.update(extra or {})
+
+    stmt = update(model).where(*(getattr(model, name) == value for name, value in keys.items())).values(values)
+
+    if db.session.execute(stmt).rowcount:
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(model).values(**keys, **increments, **(extra or {})))
+
+    except IntegrityError:
+        db.session.execute(stmt)
+
+
+def record_order(order, items):
+    """
+    Folds a newly created order into the rollup tables.
+
+    Should run in the same transaction that creates the order so the
+    rollups never drift from the order history.
+
+    :param order: (Order) The new order (must have id, date, total_cents and user_id set).
+    :param items: (list[OrderItem]) Its items.
+    """
+
+    day = (order.date or datetime.now(timezone.utc)).date()
+    units_by_product = {}
+    revenue_by_product = {}
+
+    for item in items:
+        units_by_product[item.product_id] = units_by_product.get(item.product_id, 0) + item.quantity
+        revenue_by_product[item.product_id] = revenue_by_product.get(item.product_id, 0) + item.quantity * item.price_cents
+
+    _increment(DailySales, {"day": day},
+               {"orders": 1, "units": sum(units_by_product.values()), "revenue_cents": order.total_cents})
+
+    for product_id, units in units_by_product.items():
+        _increment(ProductDailySales, {"day": day, "product_id": product_id},
+                   {"units": units, "revenue_cents": revenue_by_product[product_id]})
+
+    _increment(CustomerSales, {"user_id": order.user_id},
+               {"orders": 1, "revenue_cents": order.total_cents}, extra={"last_order_at": order.date})
+
+
+def rebuild_rollups():
+    """
+    Recomputes every rollup table from the full order history (live and
+    archived orders) with INSERT ... SELECT aggregations, replacing their
+    current contents.
+    Used for the initial backfill and to repair drift.
+
+    :return: (dict) Number of rows written per rollup table.
+    """
+
+    orders = order_history()
+    items = order_item_history("order_id", "product_id", "quantity", "price_cents", "order_date")
+    day = func.date(orders.c.date)
+
+    for model in (DailySales, ProductDailySales, CustomerSales):
+        db.session.execute(delete(model))
+
+    units_per_order = (
+        select(items.c.order_id, func.sum(items.c.quantity).label("units"))
+        .group_by(items.c.order_id)
+        .subquery()
+    )
+
+    db.session.execute(insert(DailySales).from_select(
+        ["day", "orders", "units", "revenue_cents"],
+        select(day, func.count(orders.c.id), func.coalesce(func.sum(units_per_order.c.units), 0), func.sum(orders.c.total_cents))
+        .outerjoin(units_per_order, units_per_order.c.order_id == orders.c.id)
+        .group_by(day)
+    ))
+
+    item_day = func.date(items.c.order_date)
+
+    db.session.execute(insert(ProductDailySales).from_select(
+        ["day", "product_id", "units", "revenue_cents"],
+        select(item_day, items.c.product_id, func.sum(items.c.quantity), func.sum(items.c.quantity * items.c.price_cents))
+        .group_by(item_day, items.c.product_id)
+    ))
+
+    db.session.execute(insert(CustomerSales).from_select(
+        ["user_id", "orders", "revenue_cents", "last_order_at"],
+        select(orders.c.user_id, func.count(orders.c.id), func.sum(orders.c.total_cents), func.max(orders.c.date))
+        .group_by(orders.c.user_id)
+    ))
+
+    db.session.commit()
+
+    return {
+        model.__tablename__: db.session.execute(select(func.count()).select_from(model)).scalar()
+        for model in (DailySales, ProductDailySales, CustomerSales)
+    }
+
+
+def sales_dashboard(days=30, top=10):
+    """
+    Collects everything the analytics page shows, reading only rollup tables.
+
+    The amount of data touched depends on the window size (`days`) and on
+    `top`, never on how many orders exist in total.
+
+    :param days: (int) Size of the reporting window, ending today (UTC).
+    :param top: (int) Number of products, customers and regions in the rankings.
+    :return: (dict) Window totals, per-day series, top products, top customers and top regions.
+    """
+
+    since = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+
+    daily = db.session.execute(
+        select(DailySales).where(DailySales.day >= since).order_by(DailySales.day)
+    ).scalars().all()
+
+    revenue = func.sum(ProductDailySales.revenue_cents).label("revenue_cents")
+
+    top_products = db.session.execute(
+        select(ProductDailySales.product_id, Products.name, func.sum(ProductDailySales.units), revenue)
+        .outerjoin(Products, Products.id == ProductDailySales.product_id)
+        .where(ProductDailySales.day >= since)
+        .group_by(ProductDailySales.product_id, Products.name)
+        .order_by(revenue.desc())
+        .limit(top)
+    ).all()
+
+    top_customers = db.session.execute(
+        select(CustomerSales, User.name, User.email)
+        .join(User, User.id == CustomerSales.user_id)
+        .order_by(CustomerSales.revenue_cents.desc())
+        .limit(top)
+    ).all()
+
+    # Regions of the customers' default addresses, read from their partial covering index
+    customers = func.count(Address.id).label("customers")
+    top_regions = db.session.execute(
+        select(Address.country, Address.state, customers, func.coalesce(func.sum(CustomerSales.revenue_cents), 0))
+        .outerjoin(CustomerSales, CustomerSales.user_id == Address.user_id)
+        .where(Address.is_default)
+        .group_by(Address.country, Address.state)
+        .order_by(customers.desc())
+        .limit(top)
+    ).all()
+
+    total_orders = sum(row.orders for row in daily)
+    total_revenue = sum(row.revenue_cents for row in daily)
+
+    return {
+        "since": since,
+        "daily": daily,
+        "total_orders": total_orders,
+        "total_units": sum(row.units for row in daily),
+        "total_revenue_cents": total_revenue,
+        "average_order_value_cents": total_revenue // total_orders if total_orders else 0,
+        "top_products": top_products,
+        "top_customers": top_customers,
+        "top_regions": top_regions
+    }
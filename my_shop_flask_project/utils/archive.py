@@ -0,0 +1,153 @@
+# utils/archive.py
+
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from flask import current_app
+from models import ArchivedOrder, ArchivedOrderItem, Order, OrderItem
+from sqlalchemy import delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import selectinload
+
+# Live and archive tables: (order model, item model). Reads that need the full history query both
+ORDER_TABLES = ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
+
+# Columns shared by both tables of each pair, copied as they are by the archiver
+ORDER_COLUMNS = ("id", "date", "total_cents", "shipping_cents", "status", "user_id")
+ITEM_COLUMNS = ("id", "order_id", "product_id", "quantity", "price_cents")
+
+ARCHIVED_STATUS = "Delivered"
+
+
+def order_history(*columns):
+    """
+    Orders from both the live and the archive table, as one UNION ALL subquery.
+
+    :param columns: (str) Columns to read (default: all of ORDER_COLUMNS).
+    :return: (Subquery) Selectable with those columns under `.c`.
+    """
+
+    columns = columns or ORDER_COLUMNS
+
+    return union_all(*(
+        select(*(getattr(orders, name) for name in columns)) for orders, _ in ORDER_TABLES
+    )).subquery("order_history")
+
+
+def order_item_history(*columns):
+    """
+    Order items joined with their order, from both table pairs, as one UNION ALL subquery.
+
+    :param columns: (str) Item columns to read (default: all of ITEM_COLUMNS), plus any of
+                    ORDER_COLUMNS prefixed "order_", e.g. "order_date" or "order_user_id".
+    :return: (Subquery) Selectable with those columns under `.c`.
+    """
+
+    columns = columns or ITEM_COLUMNS
+
+    def column(orders, items, name):
+        if name.startswith("order_") and name[len("order_"):] in ORDER_COLUMNS:
+            return getattr(orders, name[len("order_"):]).label(name)
+
+        return getattr(items, name)
+
+    return union_all(*(
+        select(*(column(orders, items, name) for name in columns)).join(orders, orders.id == items.order_id)
+        for orders, items in ORDER_TABLES
+    )).subquery("order_item_history")
+
+
+def user_orders(user_id):
+    """
+    A user's orders, live and archived, newest first, with their items and
+    products loaded up front (two queries per table instead of one per order).
+
+    :param user_id: (int) User id.
+    :return: (list[Order | ArchivedOrder])
+    """
+
+    orders = []
+
+    for model, items in ORDER_TABLES:
+        orders.extend(db.session.scalars(
+            select(model).where(model.user_id == user_id)
+            .options(selectinload(model.items).selectinload(items.product))
+        ))
+
+    return sorted(orders, key=lambda order: (order.date, order.id), reverse=True)
+
+
+def find_order(order_id):
+    """
+    :param order_id: (int) Order id.
+    :return: (Order | ArchivedOrder | None) The live order, else the archived one.
+    """
+
+    return db.session.get(Order, order_id) or db.session.get(ArchivedOrder, order_id)
+
+
+def archive_orders(older_than_days=None, batch_size=None):
+    """
+    Moves delivered orders placed more than `older_than_days` ago, with
+    their items, from the live tables into the archive tables.
+
+    Works in batches of `batch_size` orders, each one its own transaction
+    (copy into the archive, delete from the live tables), so a large backlog never holds long locks and an interruption
+    loses nothing. The newest order is never moved, so SQLite, which reuses
+    the highest deleted id, can't hand out an archived id again.
+
+    :param older_than_days: (int, optional) Minimum age in days (default: ORDERS_ARCHIVE_AFTER_DAYS;
+                            nothing is archived when that is None).
+    :param batch_size: (int, optional) Orders per transaction (default: ORDERS_ARCHIVE_BATCH_SIZE).
+    :return: (dict) Orders and items moved, and transactions used.
+    """
+
+    config = current_app.config
+    older_than_days = config["ORDERS_ARCHIVE_AFTER_DAYS"] if older_than_days is None else older_than_days
+    batch_size = batch_size or config["ORDERS_ARCHIVE_BATCH_SIZE"]
+    moved = {"orders": 0, "items": 0, "batches": 0}
+
+    if older_than_days is None:
+        return moved
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    # Nor the order holding the newest item, for the same reason
+    keep = {
+        db.session.execute(select(func.max(Order.id))).scalar() or 0,
+        db.session.execute(select(OrderItem.order_id).order_by(OrderItem.id.desc()).limit(1)).scalar() or 0
+    }
+
+    candidates = (
+        select(Order.id)
+        .where(Order.status == ARCHIVED_STATUS, Order.date < cutoff,
+               Order.id.not_in(keep))
+        .order_by(Order.id)
+        .limit(batch_size)
+    )
+    last_id = 0
+
+    while True:
+        ids = list(db.session.scalars(candidates.where(Order.id > last_id)))
+
+        if not ids:
+            db.session.commit()
+            return moved
+
+        now = datetime.now(timezone.utc)
+
+        db.session.execute(insert(ArchivedOrder).from_select(
+            [*ORDER_COLUMNS, "archived_at"],
+            select(*(getattr(Order, name) for name in ORDER_COLUMNS), literal(now, ArchivedOrder.archived_at.type))
+            .where(Order.id.in_(ids))
+        ))
+        items = db.session.execute(insert(ArchivedOrderItem).from_select(
+            list(ITEM_COLUMNS),
+            select(*(getattr(OrderItem, name) for name in ITEM_COLUMNS)).where(OrderItem.order_id.in_(ids))
+        )).rowcount
+
+        db.session.execute(delete(OrderItem).where(OrderItem.order_id.in_(ids)))
+        db.session.execute(delete(Order).where(Order.id.in_(ids)))
+        db.session.commit()
+
+        moved["orders"] += len(ids)
+        moved["items"] += items
+        moved["batches"] += 1
+        last_id = ids[-1]
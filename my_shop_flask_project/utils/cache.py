@@ -0,0 +1,245 @@
+# utils/cache.py
+
+import functools
+import math
+import random
+import threading
+import time
+from flask import current_app
+
+
+class _Flight:
+    """
+    One computation in progress; callers asking for the same key wait on it.
+    """
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlightCache:
+    """
+    Thread-safe in-process cache for expensive read models (catalog
+    aggregates, review summaries) that protects the database from stampedes:
+
+    - Single flight: concurrent misses of one key run one computation; the
+      other callers wait for its result instead of running their own.
+    - Stale-while-revalidate: for `stale_ttl` seconds after an entry
+      expires it is still served, while one background thread recomputes it.
+    - Probabilistic early expiration (XFetch): shortly before expiring, each
+      hit recomputes with a probability that grows as expiry nears and with
+      how long the value took to compute, so a hot key is usually refreshed
+      by one request before it ever expires.
+
+    Like catalog_cache, each worker process has its own copy: invalidate()
+    only reaches the current process and the TTL bounds how stale the
+    others can be.
+
+    Attributes:
+        maxsize (int): Entries kept before the cache is emptied and refilled.
+        stats (dict): Counts of hits, stale hits, early refreshes, misses, coalesced waits and wait timeouts.
+    """
+
+    def __init__(self, maxsize=1000):
+        self.maxsize = maxsize
+        self.stats = dict.fromkeys(("hits", "stale", "early", "misses", "coalesced", "timeouts"), 0)
+        self._data = {}         # key -> (value, expires, stale_until, compute seconds)
+        self._flights = {}      # key -> _Flight
+        self._generation = 0    # Bumped by invalidate(): older computations are not stored
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute, ttl, stale_ttl=0, beta=1.0, wait=10, app=None):
+        """
+        The cached value of `key`, computing it at most once at a time.
+
+        :param key: (tuple) Cache key; its first item names the cached function.
+        :param compute: (callable) Returns the fresh value; must not depend on the request (runs in a
+                        background thread for stale-while-revalidate).
+        :param ttl: (float) Seconds a value is fresh.
+        :param stale_ttl: (float) Seconds an expired value is still served while being recomputed.
+        :param beta: (float) XFetch eagerness; 0 disables early expiration, above 1 refreshes earlier.
+        :param wait: (float) Seconds to wait on another caller's computation before computing anyway.
+        :param app: (Flask, optional) App whose context background refreshes run in.
+        :return: The value.
+        """
+
+        now = time.monotonic()
+        early = False
+
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None:
+                value, expires, stale_until, delta = entry
+
+                if now < expires:
+                    # XFetch: refresh early when now - delta * beta * ln(U) passes the expiry, U ~ (0, 1]
+                    if key in self._flights or beta <= 0 or now - delta * beta * math.log(1 - random.random()) < expires:
+                        self.stats["hits"] += 1
+                        return value
+
+                    self.stats["early"] += 1
+                    early = True
+
+                elif now < stale_until:
+                    self.stats["stale"] += 1
+
+                    if key not in self._flights:
+                        flight = self._flights[key] = _Flight()
+                        self._refresh_in_background(app, key, flight, compute, ttl, stale_ttl, self._generation)
+
+                    return value
+
+            flight = None if early else self._flights.get(key)
+
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                generation = self._generation
+
+                if not early:
+                    self.stats["misses"] += 1
+
+            else:
+                self.stats["coalesced"] += 1
+                generation = None
+
+        if generation is not None:
+            return self._run(key, flight, compute, ttl, stale_ttl, generation)
+
+        if not flight.done.wait(wait):
+            # The computation is stuck: don't queue every request behind it
+            with self._lock:
+                self.stats["timeouts"] += 1
+
+            return compute()
+
+        if flight.error is not None:
+            raise flight.error
+
+        return flight.value
+
+    def _run(self, key, flight, compute, ttl, stale_ttl, generation):
+        started = time.monotonic()
+
+        try:
+            flight.value = compute()
+            return flight.value
+
+        except BaseException as error:
+            flight.error = error
+            raise
+
+        finally:
+            finished = time.monotonic()
+
+            with self._lock:
+                # A value computed across an invalidation may predate the change it announced
+                if flight.error is None and generation == self._generation:
+                    if len(self._data) >= self.maxsize and key not in self._data:
+                        self._data.clear()
+
+                    self._data[key] = (flight.value, finished + ttl, finished + ttl + stale_ttl, finished - started)
+
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+            flight.done.set()
+
+    def _refresh_in_background(self, app, key, flight, compute, ttl, stale_ttl, generation):
+        app = app or current_app._get_current_object()
+
+        def refresh():
+            with app.app_context():
+                try:
+                    self._run(key, flight, compute, ttl, stale_ttl, generation)
+
+                except Exception:
+                    # The stale value keeps being served until the stale window closes
+                    app.logger.exception("Background refresh of cache key %r failed", key)
+
+        threading.Thread(target=refresh, name="cache-refresh", daemon=True).start()
+
+    def invalidate(self, *prefix):
+        """
+        Drops the entries whose key starts with `prefix` (everything when
+        called without arguments). Computations already running for them
+        finish for their callers but are not stored, and later callers start
+        a new one.
+
+        :param prefix: Leading key items, e.g. ("product_overview", 7).
+        """
+
+        size = len(prefix)
+
+        with self._lock:
+            self._generation += 1
+
+            for mapping in (self._data, self._flights):
+                for key in [key for key in mapping if key[:size] == prefix]:
+                    del mapping[key]
+
+
+_cache_lock = threading.Lock()
+
+
+def get_hot_cache(app=None):
+    """
+    The app's single-flight cache, created on first use (stored in `app.extensions["hot_cache"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "hot_cache" not in app.extensions:
+        with _cache_lock:
+            if "hot_cache" not in app.extensions:
+                app.extensions["hot_cache"] = SingleFlightCache(app.config["HOT_CACHE_MAXSIZE"])
+
+    return app.extensions["hot_cache"]
+
+
+def cached(name, ttl="HOT_CACHE_TTL_SECONDS"):
+    """
+    Decorator serving a function's results from the app's single-flight
+    cache, keyed by `name` and the (hashable, positional) arguments.
+
+        @cached("product_overview")
+        def product_overview(product_id): ...
+
+        product_overview.invalidate(7)  # after product 7 changes
+        product_overview.invalidate()   # after any product changes
+
+    The function runs outside the request (it may be recomputed in a
+    background thread), so it must not read current_user or the request,
+    and its result is shared between callers: return plain data and never
+    mutate it.
+
+    :param name: (str) Cache key prefix.
+    :param ttl: (str) Config key holding the seconds a result is fresh.
+    :return: (callable) The decorator.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args):
+            app = current_app._get_current_object()
+            config = app.config
+
+            if not config["HOT_CACHE_ENABLED"]:
+                return func(*args)
+
+            return get_hot_cache(app).get_or_compute(
+                (name, *args), lambda: func(*args), config[ttl],
+                stale_ttl=config["HOT_CACHE_STALE_SECONDS"],
+                beta=config["HOT_CACHE_EARLY_BETA"],
+                wait=config["HOT_CACHE_WAIT_SECONDS"],
+                app=app
+            )
+
+        wrapper.invalidate = lambda *args: get_hot_cache().invalidate(name, *args)
+        return wrapper
+
+    return decorator
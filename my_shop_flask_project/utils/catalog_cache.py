@@ -0,0 +1,97 @@
+# utils/catalog_cache.py
+
+import threading
+import time
+from flask import current_app
+from utils.inventory import lookup_catalog
+
+
+class TTLCache:
+    """
+    Small thread-safe in-process cache whose entries expire after a fixed time.
+
+    Each worker process has its own copy, so invalidation only reaches the
+    current process; the TTL bounds how stale the other workers can be.
+
+    Attributes:
+        maxsize (int): Entries kept before the cache is emptied and refilled.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, keys):
+        """
+        :param keys: (Iterable) Keys to look up.
+        :return: (tuple[dict, list]) Unexpired hits and the keys that missed.
+        """
+
+        now = time.monotonic()
+        hits = {}
+        misses = []
+
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+
+                if entry and entry[0] > now:
+                    hits[key] = entry[1]
+                else:
+                    misses.append(key)
+
+        return hits, misses
+
+    def set_many(self, items, ttl):
+        """
+        :param items: (dict) Values to store.
+        :param ttl: (float) Seconds until they expire.
+        """
+
+        expires = time.monotonic() + ttl
+
+        with self._lock:
+            if len(self._data) + len(items) > self.maxsize:
+                self._data.clear()
+
+            for key, value in items.items():
+                self._data[key] = (expires, value)
+
+    def invalidate(self, *keys):
+        """
+        Drops the given keys, or everything when called without keys.
+        """
+
+        with self._lock:
+            if not keys:
+                self._data.clear()
+
+            for key in keys:
+                self._data.pop(key, None)
+
+
+# (name, price_cents, available, weight_grams) per product id, for repeated cart views
+catalog_cache = TTLCache()
+
+
+def cached_catalog(product_ids):
+    """
+    lookup_catalog() served from `catalog_cache`: only products missing or
+    expired in the cache are fetched, in a single query. Entries live for
+    CART_CACHE_TTL_SECONDS and are invalidated when a product is edited,
+    archived, restored or imported.
+
+    :param product_ids: (Iterable[int]) Products to look up.
+    :return: (dict[int, tuple[str, int, int, int | None]]) (name, price_cents, available, weight_grams)
+             per existing product id.
+    """
+
+    found, missing = catalog_cache.get_many(product_ids)
+
+    if missing:
+        fetched = lookup_catalog(missing)
+        catalog_cache.set_many(fetched, current_app.config["CART_CACHE_TTL_SECONDS"])
+        found.update(fetched)
+
+    return found
@@ -0,0 +1,223 @@
+# utils/checkout.py
+
+import uuid
+from dataclasses import dataclass, field
+from extensions import db
+from models import CheckoutSession, Order, OrderItem
+from sqlalchemy import update
+from utils.analytics import record_order
+from utils.archive import find_order
+from utils.catalog_cache import cached_catalog
+from utils.inventory import commit_stock, lookup_catalog
+from utils.money import to_cents
+
+
+def cart_lines(cart):
+    """
+    Normalizes a session cart (or checkout snapshot) in a single pass.
+
+    All amounts are integer cents, so totals are exact and need no
+    Decimal/float conversions. Malformed lines are skipped.
+
+    :param cart: (dict) {product_id: {name, price_cents, quantity}}.
+    :return: (tuple[list[dict], int]) Lines with id, name, price_cents, quantity and
+             subtotal_cents, and the cart total in cents.
+    """
+
+    lines = []
+    total_cents = 0
+
+    for product_id, item in cart.items():
+        try:
+            quantity = int(item["quantity"])
+            # Carts saved before prices were kept in cents still carry a decimal "price"
+            price_cents = int(item["price_cents"]) if "price_cents" in item else to_cents(item["price"])
+        except (ValueError, TypeError, KeyError):
+            continue
+
+        if quantity < 1:
+            continue
+
+        subtotal_cents = price_cents * quantity
+        total_cents += subtotal_cents
+        lines.append({
+            "id": int(product_id),
+            "name": item.get("name", ""),
+            "price_cents": price_cents,
+            "quantity": quantity,
+            "subtotal_cents": subtotal_cents
+        })
+
+    return lines, total_cents
+
+
+def cart_quantities(cart):
+    """
+    Units per product id in the cart, skipping malformed lines.
+
+    :param cart: (dict) Session cart or checkout snapshot.
+    :return: (dict[int, int]) Quantity per product id.
+    """
+
+    return {line["id"]: line["quantity"] for line in cart_lines(cart)[0]}
+
+
+@dataclass
+class CartReview:
+    """
+    A cart checked against the live catalog.
+
+    Attributes:
+        cart (dict): The cart with current names and prices, vanished products dropped.
+        lines (list[dict]): cart_lines() output, each line also carrying `available`, `weight_grams`
+                            and, when the price moved since it was added, `previous_price_cents`.
+        total_cents (int): Total at current prices.
+        removed (list[str]): Names of lines whose product no longer exists.
+        price_changed (bool): At least one line changed price.
+        out_of_stock (bool): At least one line wants more units than are available.
+    """
+
+    cart: dict
+    lines: list = field(default_factory=list)
+    total_cents: int = 0
+    removed: list = field(default_factory=list)
+    price_changed: bool = False
+    out_of_stock: bool = False
+
+    @property
+    def needs_attention(self):
+        """True when the customer should look at the cart again before paying."""
+
+        return bool(self.removed) or self.price_changed or self.out_of_stock
+
+
+def revalidate_cart(cart, exclude_ref=None, use_cache=True):
+    """
+    Checks every cart line against the catalog with one `WHERE id IN (...)`
+    lookup (or the short-TTL catalog cache) and refreshes the stale
+    name/price snapshots taken when the items were added.
+
+    :param cart: (dict) Session cart.
+    :param exclude_ref: (str, optional) Checkout whose holds belong to this customer.
+    :param use_cache: (bool) Allow cached catalog data; checkout passes False.
+    :return: (CartReview) Refreshed cart and what changed.
+    """
+
+    lines, _ = cart_lines(cart)
+
+    # The cache ignores per-customer holds, so a customer mid-checkout reads live data
+    if use_cache and not exclude_ref:
+        catalog = cached_catalog(line["id"] for line in lines)
+    else:
+        catalog = lookup_catalog((line["id"] for line in lines), exclude_ref)
+
+    review = CartReview(cart={})
+
+    for line in lines:
+        current = catalog.get(line["id"])
+
+        if current is None:
+            review.removed.append(line["name"])
+            continue
+
+        name, price_cents, available, weight_grams = current
+
+        if price_cents != line["price_cents"]:
+            line["previous_price_cents"] = line["price_cents"]
+            review.price_changed = True
+
+        line.update(name=name, price_cents=price_cents, subtotal_cents=price_cents * line["quantity"],
+                    available=available, weight_grams=weight_grams)
+        review.out_of_stock = review.out_of_stock or line["quantity"] > available
+        review.total_cents += line["subtotal_cents"]
+        review.lines.append(line)
+        review.cart[str(line["id"])] = {"name": name, "price_cents": price_cents, "quantity": line["quantity"]}
+
+    return review
+
+
+def open_checkout(user_id, cart, checkout_ref=None, shipping_cents=0):
+    """
+    Records a checkout attempt with a snapshot of the cart and commits it.
+
+    :param user_id: (int) Customer checking out.
+    :param cart: (dict) Session cart to snapshot.
+    :param checkout_ref: (str, optional) Reference of the stock holds; a new one is generated if omitted.
+    :param shipping_cents: (int) Shipping charged on top of the cart.
+    :return: (CheckoutSession) The new checkout.
+    """
+
+    lines, total_cents = cart_lines(cart)
+    snapshot = {
+        str(line["id"]): {"name": line["name"], "price_cents": line["price_cents"], "quantity": line["quantity"]}
+        for line in lines
+    }
+
+    checkout = CheckoutSession(
+        checkout_ref=checkout_ref or uuid.uuid4().hex,
+        user_id=user_id,
+        cart=snapshot,
+        total_cents=total_cents + shipping_cents,
+        shipping_cents=shipping_cents
+    )
+    db.session.add(checkout)
+    db.session.commit()
+
+    return checkout
+
+
+def fulfill_checkout(checkout):
+    """
+    Turns a paid checkout into an order, exactly once.
+
+    The checkout is claimed with a conditional UPDATE (status 'open' ->
+    'completed') in the same transaction that creates the order, converts
+    the stock holds and updates the sales rollups. A concurrent or repeated
+    call (browser redirect racing the Stripe webhook, webhook retries) finds
+    nothing to claim and gets the existing order back instead.
+
+    :param checkout: (CheckoutSession) Checkout to fulfil.
+    :return: (tuple[Order | None, bool]) The order (None if the checkout expired
+             unpaid) and whether this call created it.
+    """
+
+    claimed = db.session.execute(
+        update(CheckoutSession)
+        .where(CheckoutSession.id == checkout.id, CheckoutSession.status == "open")
+        .values(status="completed")
+    ).rowcount
+
+    if not claimed:
+        db.session.rollback()
+        db.session.refresh(checkout)
+        # The order may have been archived since (see utils.archive)
+        return (find_order(checkout.order_id) if checkout.order_id else None), False
+
+    lines, _ = cart_lines(checkout.cart)
+
+    order = Order(user_id=checkout.user_id, total_cents=checkout.total_cents, shipping_cents=checkout.shipping_cents)
+    db.session.add(order)
+    db.session.flush()
+
+    order_items = []
+    for line in lines:
+        order_item = OrderItem(
+            order_id=order.id,
+            product_id=line["id"],
+            quantity=line["quantity"],
+            price_cents=line["price_cents"]
+        )
+        db.session.add(order_item)
+        order_items.append(order_item)
+
+    # Rollups, stock and the checkout link all commit together with the order
+    record_order(order, order_items)
+    commit_stock(checkout.checkout_ref, {line["id"]: line["quantity"] for line in lines})
+
+    db.session.execute(
+        update(CheckoutSession).where(CheckoutSession.id == checkout.id).values(order_id=order.id)
+    )
+    db.session.commit()
+    db.session.refresh(checkout)
+
+    return order, True
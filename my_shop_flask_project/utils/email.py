@@ -1,26 +1,26 @@
+from extensions import mail
 from flask_mail import Message
+from utils.money import format_money
 
 
-def send_order_confirmation_email(user, order):
+def build_order_confirmation_email(user, order):
     """
-    Sends an order confirmation email to the user after a successful purchase.
+    Builds the order confirmation email sent to the user after a successful purchase.
 
     :param user: (User) The user who placed the order.
     :param order: (Order) The order instance containing items and total.
+    :return: (Message) The email, ready to send.
 
     The email includes:
         - Order ID and date
         - Order status
         - List of items purchased with quantities and prices
-        - Total amount
+        - Shipping and total amount
     """
 
-    # Import mail instance from app (assuming it's initialized in your app factory)
-    from app import mail
-
     # Build a human-readable list of purchased items
     items_text = "\n".join([
-        f"- {item.quantity} x {item.product.name} (${item.price:.2f})"
+        f"- {item.quantity} x {item.product.name} ({format_money(item.price_cents)})"
         for item in order.items
     ])
 
@@ -40,7 +40,8 @@ def send_order_confirmation_email(user, order):
             Items:
             {items_text}
 
-            Total: ${order.total:.2f}
+            Shipping: {format_money(order.shipping_cents)}
+            Total: {format_money(order.total_cents)}
 
             We'll notify you when your order is shipped.
 
@@ -49,5 +50,17 @@ def send_order_confirmation_email(user, order):
         """
     )
 
+    return msg
+
+
+def send_order_confirmation_email(user, order):
+    """
+    Sends an order confirmation email to the user after a successful purchase.
+
+    :param user: (User) The user who placed the order.
+    :param order: (Order) The order instance containing items and total.
+    """
+
     # Send the email
-    mail.send(msg)
+    mail.send(build_order_confirmation_email(user, order))
+
@@ -2,7 +2,9 @@
 
 from random import sample
 from math import ceil
-from models.order import Order
+from extensions import db
+from sqlalchemy import exists, or_, select
+from utils.archive import ORDER_TABLES
 
 
 def anonymize_name(name):
@@ -42,20 +44,21 @@ def user_bought_product(user_id: int, product_id: int) -> bool:
     """
     Checks whether a given user has purchased a specific product.
 
+    Archived orders count too: one query of an EXISTS probe per order table
+    (live and archive), each answered from the users' orders index.
+
     :param user_id: (int) ID of the user.
     :param product_id: (int) ID of the product.
 
     :return: (bool) True if the user has ordered the product, False otherwise.
     """
 
-    orders = Order.query.filter_by(user_id=user_id).all()
-
-    for order in orders:
-        for item in order.items:
-            if item.product_id == product_id:
-                return True
+    probes = [
+        exists().where(items.order_id == orders.id, orders.user_id == user_id, items.product_id == product_id)
+        for orders, items in ORDER_TABLES
+    ]
 
-    return False
+    return bool(db.session.execute(select(or_(*probes))).scalar())
 
 
 def is_profile_complete(user):
@@ -64,28 +67,14 @@ def is_profile_complete(user):
 
     Requirements for a complete profile:
         - CPF and RG must be filled.
-        - 'user_data' JSON must contain:
-            - phone, street, number, city, state, zip_code, country
+        - The default address must have phone, street, number, city, state, zip_code and country.
+
+    These are checked when the profile is saved (utils.addresses.save_default_address),
+    so this only reads the stored `profile_complete` flag.
 
     :param user: (User) The current user object.
 
     :return: (bool) True if all required fields are present, False otherwise.
     """
 
-    required_fields = ["phone", "street", "number", "city", "state", "zip_code", "country"]
-
-    data = user.user_data or {}
-
-    missing_fields = [field for field in required_fields if not data.get(field)]
-
-    if not user.cpf:
-        missing_fields.append("cpf")
-
-    if not user.rg:
-        missing_fields.append("rg")
-
-    if missing_fields:
-        print(f"[DEBUG] Incomplete profile fields: {missing_fields}")
-        return False
-
-    return True
+    return bool(user.profile_complete)
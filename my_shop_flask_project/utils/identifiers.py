@@ -0,0 +1,253 @@
+# utils/identifiers.py
+
+import hashlib
+import math
+import re
+import threading
+import time
+from extensions import db
+from flask import current_app
+from models import User
+from sqlalchemy import func, select
+
+# Unique user identifiers tracked by the filters -> model column
+FIELDS = {"email": User.email, "cpf": User.cpf, "rg": User.rg}
+
+
+class BloomFilter:
+    """
+    Probabilistic set: `value in bloom` is never wrong when it says no, and
+    wrong with probability about `error_rate` when it says yes.
+
+    Uses `hashes` bit positions per value, derived by double hashing from
+    one BLAKE2b digest.
+
+    Attributes:
+        capacity (int): Values it can hold before the error rate degrades.
+        error_rate (float): Target false positive probability at capacity.
+        size (int): Bits in the filter.
+        hashes (int): Bit positions per value.
+        count (int): Values added.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, value):
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+def normalize_cpf(value):
+    """
+    :param value: (str) CPF with or without punctuation, e.g. "529.982.247-25".
+    :return: (str) Its 11 digits, e.g. "52998224725" (other input is returned stripped).
+    """
+
+    digits = re.sub(r"[.\-\s]", "", value or "")
+    return digits if digits.isdigit() else (value or "").strip()
+
+
+def format_cpf(digits):
+    """
+    :param digits: (str) 11 CPF digits.
+    :return: (str) The conventional "000.000.000-00" form.
+    """
+
+    return f"{digits[:3]}.{digits[3:6]}.{digits[6:9]}-{digits[9:]}"
+
+
+def is_valid_cpf(value):
+    """
+    Checks a CPF's two check digits (and rejects repeated-digit numbers
+    such as 111.111.111-11, which pass the arithmetic but are never issued).
+
+    :param value: (str) CPF with or without punctuation.
+    :return: (bool)
+    """
+
+    digits = normalize_cpf(value)
+
+    if len(digits) != 11 or not digits.isdigit() or digits == digits[0] * 11:
+        return False
+
+    numbers = [int(digit) for digit in digits]
+
+    for length in (9, 10):
+        check = sum(number * weight for number, weight in zip(numbers, range(length + 1, 1, -1))) * 10 % 11 % 10
+
+        if check != numbers[length]:
+            return False
+
+    return True
+
+
+def _key(field, value):
+    # Normalized so formatting variants of one identifier share a key: the filter
+    # may only ever answer "maybe" for a value the database would match
+    if field == "email":
+        return value.strip().lower()
+
+    if field == "cpf":
+        return normalize_cpf(value)
+
+    return value.strip().upper()
+
+
+class IdentifierFilters:
+    """
+    One Bloom filter per unique user identifier (email, CPF, RG), so sign-ups
+    and profile edits only query the users table when a value might already
+    be taken.
+
+    Filters are built from the users table on first use and updated by
+    remember_identifiers() after this process's writes. Users created by other
+    worker processes are picked up when the filters are rebuilt, every
+    `max_age` seconds or once they outgrow their capacity; until then the
+    unique constraints still reject duplicates on commit.
+
+    Attributes:
+        error_rate (float): Target false positive rate (each one costs one indexed query).
+        max_age (float): Seconds before the filters are rebuilt.
+    """
+
+    def __init__(self, error_rate=0.01, max_age=600):
+        self.error_rate = error_rate
+        self.max_age = max_age
+        self._filters = None
+        self._built_at = 0
+        self._lock = threading.Lock()
+
+    def _stale(self):
+        return (
+            self._filters is None
+            or time.monotonic() - self._built_at > self.max_age
+            or any(bloom.count > bloom.capacity for bloom in self._filters.values())
+        )
+
+    def build(self):
+        """
+        Loads every identifier from the users table into fresh filters sized
+        for twice the current number of users.
+        """
+
+        users = db.session.execute(select(func.count(User.id))).scalar()
+        filters = {field: BloomFilter(max(2 * users, 10000), self.error_rate) for field in FIELDS}
+
+        rows = db.session.execute(
+            select(*FIELDS.values()).execution_options(yield_per=10000)
+        )
+
+        for row in rows:
+            for field, value in zip(FIELDS, row):
+                if value:
+                    filters[field].add(_key(field, value))
+
+        self._filters = filters
+        self._built_at = time.monotonic()
+
+    def might_exist(self, field, value):
+        """
+        :param field: (str) "email", "cpf" or "rg".
+        :param value: (str) Identifier to look up.
+        :return: (bool) False when no user can have it; True when one might.
+        """
+
+        if self._stale():
+            with self._lock:
+                if self._stale():
+                    self.build()
+
+        return _key(field, value) in self._filters[field]
+
+    def add(self, field, value):
+        if self._filters is not None and value:
+            with self._lock:
+                self._filters[field].add(_key(field, value))
+
+
+_filters_lock = threading.Lock()
+
+
+def get_identifier_filters(app=None):
+    """
+    The app's identifier filters, created on first use (stored in `app.extensions["identifier_filters"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "identifier_filters" not in app.extensions:
+        with _filters_lock:
+            if "identifier_filters" not in app.extensions:
+                app.extensions["identifier_filters"] = IdentifierFilters(
+                    app.config["IDENTIFIER_FILTER_ERROR_RATE"],
+                    app.config["IDENTIFIER_FILTER_MAX_AGE_SECONDS"]
+                )
+
+    return app.extensions["identifier_filters"]
+
+
+def identifier_taken(field, value, exclude_user_id=None):
+    """
+    Whether another user already has this email, CPF or RG.
+
+    Definite misses in the filter return False without touching the
+    database; possible hits are confirmed with one indexed query.
+
+    :param field: (str) "email", "cpf" or "rg".
+    :param value: (str) Identifier to check.
+    :param exclude_user_id: (int, optional) Ignore this user (e.g. the one editing their profile).
+    :return: (bool)
+    """
+
+    if not value:
+        return False
+
+    if current_app.config["IDENTIFIER_FILTER_ENABLED"] and not get_identifier_filters().might_exist(field, value):
+        return False
+
+    column = FIELDS[field]
+    candidates = {value}
+
+    if field == "cpf" and is_valid_cpf(value):
+        # CPFs are stored as digits, except duplicates the normalize_user_cpfs migration left formatted
+        candidates |= {normalize_cpf(value), format_cpf(normalize_cpf(value))}
+
+    stmt = select(User.id).where(column.in_(candidates))
+
+    if exclude_user_id is not None:
+        stmt = stmt.where(User.id != exclude_user_id)
+
+    return db.session.execute(stmt.limit(1)).first() is not None
+
+
+def remember_identifiers(**values):
+    """
+    Adds the identifiers of a user just committed by this process to its
+    filters. Takes the values rather than the user: after the commit the
+    instance is expired and reading it back would cost a query.
+
+    :param values: (str) Identifiers by field, e.g. email="ann@example.com" (empty ones are skipped).
+    """
+
+    if current_app.config["IDENTIFIER_FILTER_ENABLED"]:
+        filters = get_identifier_filters()
+
+        for field, value in values.items():
+            filters.add(field, value)
@@ -0,0 +1,210 @@
+# utils/inventory.py
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from flask import current_app
+from models import Products, StockHold
+from sqlalchemy import TIMESTAMP, delete, func, insert, literal, select, update
+
+
+class InsufficientStock(Exception):
+    """
+    Raised when a reservation cannot be satisfied.
+
+    Attributes:
+        product_ids (list[int]): Products that do not have enough available stock.
+    """
+
+    def __init__(self, product_ids):
+        self.product_ids = product_ids
+        super().__init__(f"Insufficient stock for products {product_ids}")
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _held_quantity(product_id, now, exclude_ref=None):
+    """
+    Scalar subquery: units of `product_id` held by unexpired holds (optionally ignoring one checkout).
+    """
+
+    stmt = select(func.coalesce(func.sum(StockHold.quantity), 0)).where(
+        StockHold.product_id == product_id,
+        StockHold.expires_at > now
+    )
+
+    if exclude_ref:
+        stmt = stmt.where(StockHold.checkout_ref != exclude_ref)
+
+    return stmt.scalar_subquery()
+
+
+def lookup_catalog(product_ids, exclude_ref=None):
+    """
+    Current name, price, available-to-sell (on-hand quantity minus unexpired
+    holds) and weight of several active products in one `WHERE id IN (...)` query.
+    Archived products are left out, as if they no longer existed.
+
+    :param product_ids: (Iterable[int]) Products to look up.
+    :param exclude_ref: (str, optional) Ignore holds of this checkout (the caller's own).
+    :return: (dict[int, tuple[str, int, int, int | None]]) (name, price_cents, available, weight_grams)
+             per existing product id.
+    """
+
+    product_ids = list(product_ids)
+
+    if not product_ids:
+        return {}
+
+    held = (
+        select(StockHold.product_id, func.sum(StockHold.quantity).label("held"))
+        .where(StockHold.product_id.in_(product_ids), StockHold.expires_at > _now())
+        .group_by(StockHold.product_id)
+    )
+
+    if exclude_ref:
+        held = held.where(StockHold.checkout_ref != exclude_ref)
+
+    held = held.subquery()
+
+    rows = db.session.execute(
+        select(Products.id, Products.name, Products.price_cents, Products.quantity - func.coalesce(held.c.held, 0),
+               Products.weight_grams)
+        .outerjoin(held, held.c.product_id == Products.id)
+        .where(Products.id.in_(product_ids), Products.active)
+    )
+
+    return {
+        product_id: (name, price_cents, max(available, 0), weight_grams)
+        for product_id, name, price_cents, available, weight_grams in rows
+    }
+
+
+def available_quantities(product_ids, exclude_ref=None):
+    """
+    Available-to-sell for several active products in one query:
+    on-hand quantity minus unexpired holds.
+
+    :param product_ids: (Iterable[int]) Products to look up.
+    :param exclude_ref: (str, optional) Ignore holds of this checkout (the caller's own).
+    :return: (dict[int, int]) Available units per existing product id.
+    """
+
+    return {product_id: row[2] for product_id, row in lookup_catalog(product_ids, exclude_ref).items()}
+
+
+def available_to_sell(product_id, exclude_ref=None):
+    """
+    Available-to-sell for a single product (0 if it does not exist or is archived).
+    """
+
+    return available_quantities([product_id], exclude_ref).get(product_id, 0)
+
+
+def reserve(quantities, user_id, ttl=None):
+    """
+    Places holds for a whole checkout, all or nothing.
+
+    Product rows are locked in id order (SELECT ... FOR UPDATE on databases
+    that support it, so only the SKUs being bought are serialized) and every
+    hold is written with a conditional INSERT ... SELECT that only succeeds
+    while enough unheld stock remains. Either all lines are reserved and
+    committed, or nothing is.
+
+    :param quantities: (dict[int, int]) Units to reserve per product id.
+    :param user_id: (int) Customer placing the holds.
+    :param ttl: (int, optional) Hold lifetime in seconds (defaults to STOCK_HOLD_TTL_SECONDS).
+    :return: (tuple[str, datetime]) The checkout reference and the holds' expiry.
+    :raises InsufficientStock: If any product lacks available stock.
+    """
+
+    ttl = ttl or current_app.config["STOCK_HOLD_TTL_SECONDS"]
+    now = _now()
+    expires_at = now + timedelta(seconds=ttl)
+    checkout_ref = uuid.uuid4().hex
+    product_ids = sorted(quantities)
+
+    # Row-level locks on just these products; a no-op on SQLite, which serializes writers anyway
+    db.session.execute(select(Products.id).where(Products.id.in_(product_ids)).order_by(Products.id).with_for_update())
+
+    short = []
+
+    for product_id in product_ids:
+        quantity = quantities[product_id]
+        # NULL, so never enough, for an archived product
+        available = (
+            select(Products.quantity).where(Products.id == product_id, Products.active).scalar_subquery()
+            - _held_quantity(product_id, now)
+        )
+
+        result = db.session.execute(insert(StockHold).from_select(
+            ["product_id", "user_id", "checkout_ref", "quantity", "created_at", "expires_at"],
+            select(
+                literal(product_id), literal(user_id), literal(checkout_ref), literal(quantity),
+                literal(now, TIMESTAMP(timezone=True)), literal(expires_at, TIMESTAMP(timezone=True))
+            ).where(available >= quantity)
+        ))
+
+        if result.rowcount != 1:
+            short.append(product_id)
+
+    if short:
+        db.session.rollback()
+        raise InsufficientStock(short)
+
+    db.session.commit()
+
+    return checkout_ref, expires_at
+
+
+def commit_stock(checkout_ref, quantities):
+    """
+    Converts a checkout's holds into a sale: decrements on-hand stock by the
+    ordered quantities and deletes the holds. Runs in the caller's transaction.
+
+    Stock is decremented even if the holds already expired, because the
+    customer has paid by the time this runs.
+
+    :param checkout_ref: (str | None) Checkout whose holds to convert.
+    :param quantities: (dict[int, int]) Units sold per product id.
+    """
+
+    for product_id, quantity in quantities.items():
+        db.session.execute(
+            update(Products).where(Products.id == product_id).values(quantity=Products.quantity - quantity)
+        )
+
+    if checkout_ref:
+        db.session.execute(delete(StockHold).where(StockHold.checkout_ref == checkout_ref))
+
+
+def release_holds(checkout_ref):
+    """
+    Deletes all holds of a checkout (cancelled or restarted) and commits.
+
+    :param checkout_ref: (str | None) Checkout whose holds to release.
+    """
+
+    if not checkout_ref:
+        return
+
+    db.session.execute(delete(StockHold).where(StockHold.checkout_ref == checkout_ref))
+    db.session.commit()
+
+
+def sweep_expired_holds():
+    """
+    Deletes holds past their expiry. Expired holds already stop counting
+    against availability; sweeping just keeps the table small. Runs as a
+    periodic background job (utils/tasks.py) and from `flask inventory sweep`.
+
+    :return: (int) Number of holds removed.
+    """
+
+    result = db.session.execute(delete(StockHold).where(StockHold.expires_at <= _now()))
+    db.session.commit()
+
+    return result.rowcount
+
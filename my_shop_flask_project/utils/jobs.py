@@ -0,0 +1,473 @@
+# utils/jobs.py
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from flask import current_app
+from models import Job
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+
+# Task name -> Task, filled by the @task decorator (the app's tasks live in utils/tasks.py)
+TASKS = {}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Task:
+    """
+    A registered job function.
+
+    Attributes:
+        name (str): Unique task name stored in the queue.
+        func (callable): Called with the job's keyword arguments inside an app context.
+        priority (int): Default priority (higher runs first).
+        max_attempts (int): Attempts before the job is marked dead.
+        backoff (float): Seconds before the first retry, doubled on every further one.
+        every (int | str | None): Run periodically every this many seconds (or a config key holding them).
+    """
+
+    name: str
+    func: callable
+    priority: int = 0
+    max_attempts: int = 5
+    backoff: float = 30
+    every: object = None
+
+    def delay(self, **kwargs):
+        """
+        Enqueues the task to run as soon as a worker is free.
+
+        :return: (int | None) Job id.
+        """
+
+        return enqueue(self.name, kwargs)
+
+    def schedule(self, seconds, **kwargs):
+        """
+        Enqueues the task to run `seconds` from now.
+
+        :return: (int | None) Job id.
+        """
+
+        return enqueue(self.name, kwargs, run_at=_now() + timedelta(seconds=seconds))
+
+    def interval(self, config):
+        return config[self.every] if isinstance(self.every, str) else self.every
+
+
+def task(name, priority=0, max_attempts=5, backoff=30, every=None):
+    """
+    Registers the decorated function as a job task.
+
+        @task("orders.send_confirmation", priority=10)
+        def send_order_confirmation(order_id): ...
+
+        send_order_confirmation.delay(order_id=order.id)
+
+    :param name: (str) Unique task name.
+    :param priority: (int) Default priority (higher runs first).
+    :param max_attempts: (int) Attempts before giving up.
+    :param backoff: (float) Seconds before the first retry (exponential, with jitter).
+    :param every: (int | str, optional) Seconds between periodic runs, or the config key holding them.
+    :return: (function) Decorator returning the Task.
+    """
+
+    def decorator(func):
+        TASKS[name] = Task(name, func, priority, max_attempts, backoff, every)
+        return TASKS[name]
+
+    return decorator
+
+
+def enqueue(name, args=None, priority=None, run_at=None, unique_key=None):
+    """
+    Adds a job to the queue and commits.
+
+    :param name: (str) Registered task name.
+    :param args: (dict, optional) Keyword arguments (must be JSON serializable).
+    :param priority: (int, optional) Overrides the task's priority.
+    :param run_at: (datetime, optional) Earliest run time (default: now).
+    :param unique_key: (str, optional) Skip enqueueing if a job with this key exists.
+    :return: (int | None) Job id, or None if `unique_key` was already taken.
+    """
+
+    registered = TASKS[name]
+    job = Job(
+        name=name,
+        args=args or {},
+        priority=registered.priority if priority is None else priority,
+        max_attempts=registered.max_attempts,
+        run_at=run_at or _now(),
+        unique_key=unique_key
+    )
+
+    try:
+        db.session.add(job)
+        db.session.commit()
+
+    except IntegrityError:
+        db.session.rollback()
+        return None
+
+    return job.id
+
+
+class DatabaseQueue:
+    """
+    Job queue stored in the app's own database, so no broker is needed.
+
+    Jobs are claimed with a conditional UPDATE (one worker wins each job),
+    which works on any database; a shared backend (e.g. Redis, or
+    PostgreSQL with SKIP LOCKED) only has to provide these same methods.
+    """
+
+    def claim(self, worker_id, limit):
+        """
+        Marks up to `limit` due jobs as running for this worker.
+
+        :param worker_id: (str) Identifier of the claiming worker.
+        :param limit: (int) Maximum jobs to take.
+        :return: (list[tuple[int, str, dict]]) Id, task name and arguments of each claimed job.
+        """
+
+        now = _now()
+        candidates = db.session.execute(
+            select(Job.id, Job.name, Job.args)
+            .where(Job.status == "queued", Job.run_at <= now)
+            .order_by(Job.priority.desc(), Job.run_at, Job.id)
+            .limit(limit)
+        ).all()
+
+        claimed = []
+
+        for job_id, name, args in candidates:
+            won = db.session.execute(
+                update(Job)
+                .where(Job.id == job_id, Job.status == "queued")
+                .values(status="running", locked_by=worker_id, started_at=now, attempts=Job.attempts + 1)
+            ).rowcount
+
+            if won:
+                claimed.append((job_id, name, args))
+
+        db.session.commit()
+
+        return claimed
+
+    def succeed(self, job_id, worker_id):
+        """
+        Marks a job this worker ran as succeeded.
+
+        :return: (bool) False if the job was taken away from the worker (requeued as stale) meanwhile.
+        """
+
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+            .values(status="succeeded", finished_at=_now(), last_error=None)
+        )
+        db.session.commit()
+
+        return result.rowcount == 1
+
+    def fail(self, job_id, worker_id, error, backoff):
+        """
+        Requeues a failed job with exponential backoff and jitter, or marks it
+        dead once it has used all its attempts.
+
+        :return: (str | None) The job's new status, or None if the job was taken
+                 away from the worker (requeued as stale) meanwhile.
+        """
+
+        job = db.session.get(Job, job_id)
+        now = _now()
+
+        if job.attempts >= job.max_attempts:
+            values = {"status": "dead", "finished_at": now}
+        else:
+            values = {"status": "queued", "run_at": now + timedelta(seconds=backoff * 2 ** (job.attempts - 1) * random.uniform(0.5, 1.5))}
+
+        result = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "running", Job.locked_by == worker_id)
+            .values(last_error=error, **values)
+        )
+        db.session.commit()
+
+        return values["status"] if result.rowcount == 1 else None
+
+    def requeue_stale(self, timeout):
+        """
+        Puts back jobs whose worker died mid-run (running for longer than `timeout`
+        seconds), or marks them dead if that run was their last attempt.
+
+        :return: (int) Jobs requeued.
+        """
+
+        now = _now()
+        stale = (Job.status == "running") & (Job.started_at < now - timedelta(seconds=timeout))
+
+        db.session.execute(
+            update(Job)
+            .where(stale, Job.attempts >= Job.max_attempts)
+            .values(status="dead", locked_by=None, finished_at=now, last_error=f"Timed out after {timeout} seconds")
+        )
+        result = db.session.execute(
+            update(Job)
+            .where(stale, Job.attempts < Job.max_attempts)
+            .values(status="queued", locked_by=None)
+        )
+        db.session.commit()
+
+        return result.rowcount
+
+    def purge(self, older_than_hours):
+        """
+        Deletes succeeded jobs that finished more than `older_than_hours` ago.
+
+        :return: (int) Jobs deleted.
+        """
+
+        result = db.session.execute(
+            delete(Job).where(Job.status == "succeeded", Job.finished_at < _now() - timedelta(hours=older_than_hours))
+        )
+        db.session.commit()
+
+        return result.rowcount
+
+    def retry_dead(self, name=None):
+        """
+        Gives dead jobs (optionally of one task) a fresh set of attempts.
+
+        :return: (int) Jobs requeued.
+        """
+
+        stmt = update(Job).where(Job.status == "dead")
+
+        if name:
+            stmt = stmt.where(Job.name == name)
+
+        result = db.session.execute(stmt.values(status="queued", attempts=0, run_at=_now(), finished_at=None))
+        db.session.commit()
+
+        return result.rowcount
+
+    def stats(self, window_hours=1):
+        """
+        Queue metrics per task: jobs per status, how late the oldest due job
+        is, and run time percentiles of the jobs finished in the last `window_hours`.
+
+        :return: (dict[str, dict]) Metrics keyed by task name.
+        """
+
+        now = _now()
+        stats = {}
+
+        def entry(name):
+            return stats.setdefault(name, {"queued": 0, "running": 0, "succeeded": 0, "dead": 0,
+                                           "lag_seconds": 0.0, "runs": 0, "p50_ms": None, "p95_ms": None})
+
+        for name, status, count in db.session.execute(select(Job.name, Job.status, func.count()).group_by(Job.name, Job.status)):
+            entry(name)[status] = count
+
+        for name, oldest in db.session.execute(
+            select(Job.name, func.min(Job.run_at)).where(Job.status == "queued", Job.run_at <= now).group_by(Job.name)
+        ):
+            oldest = oldest if oldest.tzinfo else oldest.replace(tzinfo=timezone.utc)   # SQLite drops the zone
+            entry(name)["lag_seconds"] = round((now - oldest).total_seconds(), 1)
+
+        durations = {}
+
+        for name, started, finished in db.session.execute(
+            select(Job.name, Job.started_at, Job.finished_at)
+            .where(Job.status == "succeeded", Job.finished_at >= now - timedelta(hours=window_hours))
+        ):
+            durations.setdefault(name, []).append((finished - started).total_seconds() * 1000)
+
+        for name, values in durations.items():
+            values.sort()
+            entry(name).update(
+                runs=len(values),
+                p50_ms=round(values[len(values) // 2], 1),
+                p95_ms=round(values[min(int(len(values) * 0.95), len(values) - 1)], 1)
+            )
+
+        return stats
+
+
+_queue_lock = threading.Lock()
+
+
+def get_queue(app=None):
+    """
+    The app's job queue backend, created on first use (stored in `app.extensions["jobs"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "jobs" not in app.extensions:
+        with _queue_lock:
+            if "jobs" not in app.extensions:
+                app.extensions["jobs"] = DatabaseQueue()
+
+    return app.extensions["jobs"]
+
+
+class Worker:
+    """
+    Runs queued jobs on a pool of threads.
+
+    The polling loop claims as many due jobs as there are idle threads,
+    enqueues one run of every periodic task per interval (deduplicated by
+    unique key, so any number of workers can share the schedule), requeues
+    jobs of crashed workers and purges old succeeded jobs.
+
+    Attributes:
+        app (Flask): Application whose context jobs run in.
+        threads (int): Jobs run in parallel.
+        poll_interval (float): Seconds to wait when the queue is empty.
+        worker_id (str): Name recorded on claimed jobs.
+    """
+
+    MAINTENANCE_INTERVAL = 60
+
+    def __init__(self, app, threads=4, poll_interval=1.0):
+        import utils.tasks  # noqa: F401  (registers the app's tasks)
+
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+        self._running = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._slots = {}
+        self._maintained_at = 0
+
+    def stop(self):
+        """
+        Asks the loop to exit; jobs already running are finished first.
+        """
+
+        self._stop.set()
+        self._wake.set()
+
+    def start(self):
+        """
+        Runs the worker on a daemon thread (the in-process worker of the web app).
+
+        :return: (threading.Thread) The started thread.
+        """
+
+        thread = threading.Thread(target=self.run, name="job-worker", daemon=True)
+        thread.start()
+
+        return thread
+
+    def run(self, burst=False):
+        """
+        Processes jobs until stop() is called.
+
+        :param burst: (bool) Exit as soon as no due job is left.
+        """
+
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="job") as pool:
+            while not self._stop.is_set():
+                self._wake.clear()
+
+                try:
+                    with self.app.app_context():
+                        self._maintain()
+                        free = self.threads - self._running
+                        claimed = get_queue(self.app).claim(self.worker_id, free) if free > 0 else []
+
+                except Exception:
+                    self.app.logger.exception("Job worker poll failed")
+                    claimed = []
+
+                for job in claimed:
+                    with self._lock:
+                        self._running += 1
+
+                    pool.submit(self._execute, *job)
+
+                if burst and not claimed and not self._running:
+                    break
+
+                if not claimed:
+                    self._wake.wait(self.poll_interval)
+
+    def _maintain(self):
+        queue = get_queue(self.app)
+        config = self.app.config
+        now = time.time()
+
+        for registered in list(TASKS.values()):
+            if registered.every is None:
+                continue
+
+            interval = registered.interval(config)
+            slot = int(now // interval)
+
+            if self._slots.get(registered.name) != slot:
+                self._slots[registered.name] = slot
+                enqueue(registered.name, run_at=datetime.fromtimestamp(slot * interval, timezone.utc),
+                        unique_key=f"{registered.name}@{slot}")
+
+        if now - self._maintained_at >= self.MAINTENANCE_INTERVAL:
+            self._maintained_at = now
+            queue.requeue_stale(config["JOBS_TIMEOUT_SECONDS"])
+            queue.purge(config["JOBS_RETENTION_HOURS"])
+
+    def _execute(self, job_id, name, args):
+        with self.app.app_context():
+            queue = get_queue(self.app)
+            registered = TASKS.get(name)
+
+            try:
+                if registered is None:
+                    raise LookupError(f"Unknown task '{name}'")
+
+                registered.func(**args)
+
+            except Exception as e:
+                db.session.rollback()
+                status = queue.fail(job_id, self.worker_id, f"{type(e).__name__}: {e}", registered.backoff if registered else 0)
+
+                if status is None:
+                    self.app.logger.warning("Job %s (%s) failed after it was requeued as stale: %s", job_id, name, e)
+                else:
+                    self.app.logger.log(logging.ERROR if status == "dead" else logging.WARNING, "Job %s (%s) failed, now %s: %s", job_id, name, status, e)
+
+            else:
+                if not queue.succeed(job_id, self.worker_id):
+                    self.app.logger.warning("Job %s (%s) finished after it was requeued as stale", job_id, name)
+
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+                self._wake.set()
+
+
+def run_worker_process(threads, poll_interval, burst):
+    """
+    Entry point of the processes started by `flask worker --processes N`:
+    builds its own app and runs a worker in it.
+    """
+
+    from app import create_app
+
+    Worker(create_app(), threads, poll_interval).run(burst)
@@ -0,0 +1,57 @@
+# utils/money.py
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Every amount is stored and computed as an integer number of cents (minor units);
+# decimal strings only exist at the edges (forms, files, templates)
+CENTS = Decimal("0.01")
+
+
+def to_cents(value, exact=False):
+    """
+    Parses a money amount into integer cents.
+
+    :param value: (str | int | Decimal) Amount in major units, e.g. "12.5" or Decimal("12.50").
+    :param exact: (bool) Reject amounts with more than 2 decimal places instead of rounding them.
+    :return: (int) Amount in cents, rounded half-up to the cent.
+    :raises ValueError: If the value is not a number (or not exact, when required).
+    """
+
+    try:
+        amount = Decimal(str(value).strip())
+
+    except InvalidOperation:
+        raise ValueError(f"Invalid amount '{value}'.")
+
+    if not amount.is_finite() or (exact and amount != amount.quantize(CENTS)):
+        raise ValueError(f"Invalid amount '{value}'.")
+
+    return int(amount.quantize(CENTS, rounding=ROUND_HALF_UP) * 100)
+
+
+def format_cents(cents):
+    """
+    Renders cents as a plain decimal string with two places, e.g. 1234 -> "12.34".
+
+    :param cents: (int) Amount in cents.
+    :return: (str) Decimal representation.
+    """
+
+    cents = int(cents or 0)
+    sign = "-" if cents < 0 else ""
+
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def format_money(cents, symbol="$"):
+    """
+    Jinja `money` filter: renders cents with a currency symbol, e.g. 1234 -> "$12.34".
+
+    :param cents: (int) Amount in cents.
+    :param symbol: (str) Currency symbol.
+    :return: (str) Formatted amount.
+    """
+
+    text = format_cents(cents)
+
+    return f"-{symbol}{text[1:]}" if text.startswith("-") else f"{symbol}{text}"
@@ -0,0 +1,188 @@
+# utils/order_export.py
+
+from datetime import datetime, timedelta
+from extensions import db
+from models import Products, User
+from models.order import normalize_status
+from sqlalchemy import distinct, func, select, union_all
+from utils.archive import ORDER_TABLES
+from utils.money import format_cents
+from utils.streaming import encode_records
+
+# Columns of the order export: one row per order item, denormalized with order, user and product data
+ORDER_EXPORT_FIELDS = [
+    "order_id", "order_date", "status", "user_id", "user_name", "user_email",
+    "item_id", "product_id", "product_name", "quantity", "unit_price", "line_total", "order_total"
+]
+
+REPORT_FIELDS = ["day", "product_id", "product_name", "orders", "units", "revenue"]
+
+
+def parse_date_range(start=None, end=None):
+    """
+    Converts optional YYYY-MM-DD strings into a half-open datetime range.
+    The end date is inclusive for the caller, so one day is added to it.
+
+    :param start: (str, optional) First day to include.
+    :param end: (str, optional) Last day to include.
+    :return: (tuple[datetime | None, datetime | None]) Range start and exclusive end.
+    :raises ValueError: If a date is not in YYYY-MM-DD format.
+    """
+
+    start_dt = datetime.strptime(start, "%Y-%m-%d") if start else None
+    end_dt = datetime.strptime(end, "%Y-%m-%d") + timedelta(days=1) if end else None
+
+    return start_dt, end_dt
+
+
+def _order_filters(orders, start=None, end=None, status=None):
+    """
+    Builds the WHERE clauses shared by the export and the report, on the
+    live or the archive order table (`orders`).
+    """
+
+    filters = []
+
+    if start:
+        filters.append(orders.date >= start)
+
+    if end:
+        filters.append(orders.date < end)
+
+    if status:
+        filters.append(orders.status == normalize_status(status))
+
+    return filters
+
+
+def iter_order_lines(start=None, end=None, status=None, batch_size=1000):
+    """
+    Streams order items joined with their order, user and product, from the
+    live and the archive tables (ids are shared, so items keep their order).
+
+    Uses keyset pagination on the item id: every page is a bounded
+    `WHERE id > :last ORDER BY id LIMIT :batch` query per table pair, merged
+    and cut to one batch, read with `yield_per`, so neither the database nor
+    Python ever materializes the full result and late pages cost the same as
+    early ones.
+
+    :param start: (datetime, optional) Include orders placed at or after this moment.
+    :param end: (datetime, optional) Include orders placed before this moment.
+    :param status: (str, optional) Only orders with this status (case-insensitive).
+    :param batch_size: (int) Rows per keyset page.
+    :return: (Iterator[dict]) One dictionary per order item, keyed by ORDER_EXPORT_FIELDS.
+    """
+
+    def page(orders, items, last_id):
+        # One keyset page of one table pair, wrapped so it can keep its own ORDER BY/LIMIT inside the union
+        return select(
+            select(
+                items.id.label("item_id"), orders.id.label("order_id"), orders.date, orders.status, orders.total_cents,
+                User.id.label("user_id"), User.name.label("user_name"), User.email,
+                items.product_id, Products.name.label("product_name"), items.quantity, items.price_cents
+            )
+            .join(orders, items.order_id == orders.id)
+            .join(User, orders.user_id == User.id)
+            .outerjoin(Products, items.product_id == Products.id)
+            .where(items.id > last_id, *_order_filters(orders, start, end, status))
+            .order_by(items.id)
+            .limit(batch_size)
+            .subquery()
+        )
+
+    last_id = 0
+
+    while True:
+        rows = 0
+        merged = union_all(*(page(orders, items, last_id) for orders, items in ORDER_TABLES)).subquery()
+        stmt = (
+            select(merged).order_by(merged.c.item_id).limit(batch_size).execution_options(yield_per=batch_size)
+        )
+
+        for (item_id, order_id, date, order_status, order_total, user_id, user_name, user_email,
+             product_id, product_name, quantity, price) in db.session.execute(stmt):
+            rows += 1
+            last_id = item_id
+
+            yield {
+                "order_id": order_id,
+                "order_date": date.isoformat() if date else "",
+                "status": order_status,
+                "user_id": user_id,
+                "user_name": user_name,
+                "user_email": user_email,
+                "item_id": item_id,
+                "product_id": product_id,
+                "product_name": product_name or "",
+                "quantity": quantity,
+                "unit_price": format_cents(price),
+                "line_total": format_cents(price * quantity),
+                "order_total": format_cents(order_total)
+            }
+
+        if rows < batch_size:
+            break
+
+
+def export_orders(fmt, start=None, end=None, status=None, batch_size=1000):
+    """
+    Generator producing the filtered order lines as CSV or JSON Lines chunks.
+
+    :param fmt: (str) "csv" or "jsonl".
+    :return: (Iterator[str]) Encoded text chunks, one per keyset page.
+    """
+
+    return encode_records(iter_order_lines(start, end, status, batch_size), ORDER_EXPORT_FIELDS, fmt, batch_size)
+
+
+def daily_sales_report(start=None, end=None, status=None):
+    """
+    Aggregates revenue and units per day and product, live and archived
+    orders together, entirely in SQL.
+
+    :param start: (datetime, optional) Include orders placed at or after this moment.
+    :param end: (datetime, optional) Include orders placed before this moment.
+    :param status: (str, optional) Only orders with this status.
+    :return: (list[dict]) Rows keyed by REPORT_FIELDS plus `revenue_cents`, newest day first,
+             best sellers first within a day.
+    """
+
+    # Matching item lines of both table pairs, each filtered through its own order date index
+    lines = union_all(*(
+        select(
+            func.date(orders.date).label("day"), items.product_id, items.order_id, items.quantity,
+            (items.quantity * items.price_cents).label("amount_cents")
+        )
+        .join(orders, items.order_id == orders.id)
+        .where(*_order_filters(orders, start, end, status))
+        for orders, items in ORDER_TABLES
+    )).subquery()
+
+    revenue = func.sum(lines.c.amount_cents).label("revenue_cents")
+
+    stmt = (
+        select(
+            lines.c.day,
+            lines.c.product_id,
+            Products.name,
+            func.count(distinct(lines.c.order_id)),
+            func.sum(lines.c.quantity),
+            revenue
+        )
+        .outerjoin(Products, lines.c.product_id == Products.id)
+        .group_by(lines.c.day, lines.c.product_id, Products.name)
+        .order_by(lines.c.day.desc(), revenue.desc())
+    )
+
+    return [
+        {
+            "day": str(row_day),
+            "product_id": product_id,
+            "product_name": product_name or "",
+            "orders": orders,
+            "units": units,
+            "revenue": format_cents(row_revenue),
+            "revenue_cents": row_revenue or 0
+        }
+        for row_day, product_id, product_name, orders, units, row_revenue in db.session.execute(stmt)
+    ]
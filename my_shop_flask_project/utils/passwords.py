@@ -0,0 +1,140 @@
+# utils/passwords.py
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from flask import current_app
+from functools import lru_cache
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusy(Exception):
+    """
+    Raised when the hashing pool is saturated and the request should be
+    turned away instead of queueing behind other logins.
+    """
+
+
+class HashingPool:
+    """
+    Bounded pool running password hashes off the request threads.
+
+    hashlib releases the GIL while it hashes, so `workers` threads keep at
+    most that many cores busy with hashing no matter how many logins arrive
+    at once; the remaining cores keep serving pages. At most `max_pending`
+    hashes wait for a worker; beyond that, and after `timeout` seconds of
+    waiting, callers get HashingBusy straight away.
+
+    Attributes:
+        workers (int): Hashes computed in parallel.
+        max_pending (int): Hashes allowed to queue (running ones included).
+        timeout (float): Seconds a caller waits for its result.
+    """
+
+    def __init__(self, workers=2, max_pending=32, timeout=10):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    def run(self, func, *args):
+        """
+        Runs func(*args) on the pool and waits for the result.
+
+        :raises HashingBusy: If the queue is full or the result takes longer than `timeout`.
+        """
+
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy()
+
+        try:
+            future = self._executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(self.timeout)
+
+        except FutureTimeout:
+            future.cancel()
+            raise HashingBusy()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_pool_lock = threading.Lock()
+
+
+def get_pool(app=None):
+    """
+    The app's hashing pool, created on first use (stored in `app.extensions["password_hashing"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "password_hashing" not in app.extensions:
+        with _pool_lock:
+            if "password_hashing" not in app.extensions:
+                app.extensions["password_hashing"] = HashingPool(
+                    app.config["PASSWORD_HASH_WORKERS"],
+                    app.config["PASSWORD_HASH_MAX_PENDING"],
+                    app.config["PASSWORD_HASH_TIMEOUT_SECONDS"]
+                )
+
+    return app.extensions["password_hashing"]
+
+
+def hash_password(password):
+    """
+    Hashes a password with the configured policy (PASSWORD_HASH_METHOD and
+    PASSWORD_SALT_LENGTH), on the hashing pool.
+
+    :param password: (str) Plain-text password.
+    :return: (str) Werkzeug hash string.
+    :raises HashingBusy: If the pool is saturated.
+    """
+
+    config = current_app.config
+
+    return get_pool().run(generate_password_hash, password, config["PASSWORD_HASH_METHOD"], config["PASSWORD_SALT_LENGTH"])
+
+
+def verify_password(stored_hash, password):
+    """
+    Checks a password against its stored hash on the hashing pool.
+
+    :param stored_hash: (str) The user's stored hash.
+    :param password: (str) Plain-text password to check.
+    :return: (bool) Whether it matches.
+    :raises HashingBusy: If the pool is saturated.
+    """
+
+    return get_pool().run(check_password_hash, stored_hash, password)
+
+
+@lru_cache(maxsize=8)
+def _policy_prefix(method):
+    # Werkzeug fills in default parameters ("scrypt" -> "scrypt:32768:8:1"); hash once to learn them
+    return generate_password_hash("", method, 1).split("$", 1)[0]
+
+
+def needs_rehash(stored_hash):
+    """
+    Whether a hash was made with another algorithm, cost or salt length
+    than the current policy, and should be replaced on the next login.
+
+    :param stored_hash: (str) The user's stored hash.
+    :return: (bool)
+    """
+
+    config = current_app.config
+    parts = stored_hash.split("$")
+
+    if len(parts) != 3:
+        return True
+
+    return parts[0] != _policy_prefix(config["PASSWORD_HASH_METHOD"]) or len(parts[1]) != config["PASSWORD_SALT_LENGTH"]
@@ -0,0 +1,516 @@
+# utils/payments.py
+
+import asyncio
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from flask import current_app
+from types import SimpleNamespace
+
+# payment_status values of a Checkout Session whose payment went through
+PAID_STATUSES = ("paid", "no_payment_required")
+
+
+class PaymentError(Exception):
+    """
+    Base class of the errors raised by the gateway itself (Stripe's own errors pass through unchanged).
+    """
+
+
+class GatewayUnavailable(PaymentError):
+    """
+    Raised without calling Stripe while the circuit breaker is open.
+    """
+
+    def __init__(self):
+        super().__init__("Payments are temporarily unavailable. Please try again in a moment.")
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker.
+
+    After `threshold` consecutive failures the circuit opens and calls fail
+    fast for `reset_timeout` seconds. Then a single probe call is let through
+    (half-open): its success closes the circuit, its failure opens it again.
+
+    Attributes:
+        threshold (int): Consecutive failures that open the circuit.
+        reset_timeout (float): Seconds the circuit stays open before probing.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """
+        :return: (str) "closed", "open" or "half_open".
+        """
+
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+
+            return "half_open" if self._clock() - self._opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """
+        :return: (bool) Whether a call may go out now.
+        """
+
+        with self._lock:
+            if self._opened_at is None:
+                return True
+
+            if not self._probing and self._clock() - self._opened_at >= self.reset_timeout:
+                self._probing = True
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+
+            if self._failures >= self.threshold:
+                self._opened_at = self._clock()
+
+
+class GatewayMetrics:
+    """
+    Thread-safe per-operation call counters and latency percentiles of the
+    most recent calls, kept in process memory.
+
+    Attributes:
+        window (int): Latencies kept per operation.
+    """
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._operations = {}
+        self._lock = threading.Lock()
+
+    def _get(self, operation):
+        return self._operations.setdefault(operation, {
+            "calls": 0, "errors": 0, "retries": 0, "rejected": 0, "latencies": deque(maxlen=self.window)
+        })
+
+    def record(self, operation, latency, ok):
+        with self._lock:
+            stats = self._get(operation)
+            stats["calls"] += 1
+            stats["errors"] += 0 if ok else 1
+            stats["latencies"].append(latency)
+
+    def count(self, operation, counter):
+        with self._lock:
+            self._get(operation)[counter] += 1
+
+    def snapshot(self):
+        """
+        :return: (dict) Per operation: calls, errors, retries, rejected (circuit open)
+                 and p50/p95/max latency in milliseconds.
+        """
+
+        with self._lock:
+            operations = {name: dict(stats, latencies=sorted(stats["latencies"])) for name, stats in self._operations.items()}
+
+        for stats in operations.values():
+            latencies = stats.pop("latencies")
+
+            for label, fraction in (("p50_ms", 0.5), ("p95_ms", 0.95)):
+                stats[label] = round(latencies[min(int(len(latencies) * fraction), len(latencies) - 1)] * 1000, 2) if latencies else None
+
+            stats["max_ms"] = round(latencies[-1] * 1000, 2) if latencies else None
+
+        return operations
+
+
+def is_retryable(error):
+    """
+    Transient failures worth retrying, which also count against the circuit:
+    network errors and timeouts, rate limiting and Stripe 5xx responses.
+    Declined cards or invalid requests mean Stripe is healthy.
+
+    :param error: (Exception) Error raised by a call.
+    :return: (bool)
+    """
+
+    import stripe
+
+    if isinstance(error, (TimeoutError, stripe.APIConnectionError, stripe.RateLimitError)):
+        return True
+
+    return isinstance(error, stripe.StripeError) and (error.http_status or 0) >= 500
+
+
+class PaymentGateway:
+    """
+    Resilience policy shared by the gateways: circuit breaker, bounded retries
+    with full jitter and latency metrics around every call.
+
+    Only idempotent calls are retried: a POST is retried only when it carries
+    an idempotency key, so Stripe never performs it twice.
+
+    Attributes:
+        timeout (float): Default seconds a call may take.
+        max_retries (int): Extra attempts for idempotent calls.
+        backoff (float): Base of the exponential backoff in seconds (capped at 8x).
+        breaker (CircuitBreaker): Breaker shared by all calls.
+        metrics (GatewayMetrics): Metrics shared by all calls.
+    """
+
+    def __init__(self, timeout=10, max_retries=2, backoff=0.25, breaker=None, metrics=None):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics or GatewayMetrics()
+
+    def _delay(self, attempt):
+        return random.uniform(0, self.backoff * 2 ** min(attempt, 3))
+
+    def _attempts(self, operation, idempotent):
+        for attempt in range(self.max_retries + 1 if idempotent else 1):
+            if not self.breaker.allow():
+                self.metrics.count(operation, "rejected")
+                raise GatewayUnavailable()
+
+            if attempt:
+                self.metrics.count(operation, "retries")
+
+            yield attempt, attempt == self.max_retries or not idempotent
+
+    def _settle(self, operation, started, error):
+        """
+        Records one attempt; returns True when the error may be retried.
+        """
+
+        retryable = error is not None and is_retryable(error)
+        self.metrics.record(operation, time.perf_counter() - started, ok=error is None)
+
+        if retryable:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        return retryable
+
+    def call(self, operation, func, idempotent=False):
+        """
+        Runs func() under the policy.
+
+        :param operation: (str) Name used in the metrics.
+        :param func: (callable) The request to make.
+        :param idempotent: (bool) Whether it is safe to retry.
+        :return: Whatever func returns.
+        :raises GatewayUnavailable: If the circuit is open.
+        """
+
+        for attempt, last in self._attempts(operation, idempotent):
+            started = time.perf_counter()
+
+            try:
+                result = func()
+
+            except Exception as e:
+                if not self._settle(operation, started, e) or last:
+                    raise
+
+                time.sleep(self._delay(attempt))
+                continue
+
+            self._settle(operation, started, None)
+            return result
+
+    async def call_async(self, operation, func, idempotent=False, timeout=None):
+        """
+        Awaits func() under the policy; the coroutine version of call().
+
+        :param operation: (str) Name used in the metrics.
+        :param func: (callable) Returns the awaitable request to make.
+        :param idempotent: (bool) Whether it is safe to retry.
+        :param timeout: (float, optional) Seconds each attempt may take.
+        :return: Whatever the awaitable returns.
+        :raises GatewayUnavailable: If the circuit is open.
+        """
+
+        for attempt, last in self._attempts(operation, idempotent):
+            started = time.perf_counter()
+
+            try:
+                result = await asyncio.wait_for(func(), timeout or self.timeout)
+
+            except Exception as e:
+                if not self._settle(operation, started, e) or last:
+                    raise
+
+                await asyncio.sleep(self._delay(attempt))
+                continue
+
+            self._settle(operation, started, None)
+            return result
+
+    def create_checkout_session(self, params, idempotency_key=None, timeout=None):
+        """
+        Creates a Stripe Checkout session.
+
+        :param params: (dict) Session parameters (see cart.begin_checkout()).
+        :param idempotency_key: (str, optional) Makes the call safe to retry.
+        :param timeout: (float, optional) Seconds the call may take (defaults to the gateway's).
+        :return: The session; has at least `id` and `url`.
+        """
+
+        return self.call(
+            "checkout.create",
+            lambda: self._create_checkout_session(params, idempotency_key, timeout or self.timeout),
+            idempotent=idempotency_key is not None
+        )
+
+    async def create_checkout_session_async(self, params, idempotency_key=None, timeout=None):
+        """
+        Coroutine version of create_checkout_session(), for the ASGI mode.
+        """
+
+        return await self.call_async(
+            "checkout.create",
+            lambda: self._create_checkout_session_async(params, idempotency_key),
+            idempotent=idempotency_key is not None,
+            timeout=timeout
+        )
+
+    def retrieve_checkout_session(self, session_id, timeout=None):
+        """
+        Fetches a Stripe Checkout session, e.g. to check it was paid.
+
+        :param session_id: (str) Stripe session id (cs_...).
+        :param timeout: (float, optional) Seconds the call may take (defaults to the gateway's).
+        :return: The session; has at least `id`, `client_reference_id` and `payment_status`.
+        """
+
+        return self.call(
+            "checkout.retrieve",
+            lambda: self._retrieve_checkout_session(session_id, timeout or self.timeout),
+            idempotent=True
+        )
+
+
+class StripeGateway(PaymentGateway):
+    """
+    Gateway talking to the Stripe API.
+
+    All calls share one keep-alive connection pool: a requests Session with
+    `pool_size` connections per host for blocking calls, and one httpx client
+    for coroutine calls. The library's own retries are disabled so every
+    attempt goes through the breaker and metrics.
+    """
+
+    def __init__(self, api_key, api_base=None, connect_timeout=3, pool_size=10, **kwargs):
+        import requests
+        import stripe
+
+        super().__init__(**kwargs)
+
+        self._stripe = stripe
+        self.api_key = api_key
+        self.api_base = api_base
+        self.connect_timeout = connect_timeout
+
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        try:
+            self.async_http_client = stripe.HTTPXClient(timeout=self.timeout)
+        except ImportError:
+            self.async_http_client = None   # Coroutine calls need httpx
+
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def client(self, timeout=None):
+        """
+        StripeClient bound to the shared pools with the given read timeout
+        (one lightweight client per distinct timeout).
+
+        :param timeout: (float, optional) Read timeout in seconds.
+        :return: (stripe.StripeClient)
+        """
+
+        timeout = timeout or self.timeout
+
+        with self._clients_lock:
+            if timeout not in self._clients:
+                http_client = self._stripe.RequestsClient(
+                    timeout=(self.connect_timeout, timeout),
+                    session=self.session,
+                    async_fallback_client=self.async_http_client
+                )
+                self._clients[timeout] = self._stripe.StripeClient(
+                    self.api_key,
+                    base_addresses={"api": self.api_base} if self.api_base else {},
+                    max_network_retries=0,
+                    http_client=http_client
+                )
+
+            return self._clients[timeout]
+
+    def _create_checkout_session(self, params, idempotency_key, timeout):
+        options = {"idempotency_key": idempotency_key} if idempotency_key else None
+        return self.client(timeout).checkout.sessions.create(params, options)
+
+    def _create_checkout_session_async(self, params, idempotency_key):
+        options = {"idempotency_key": idempotency_key} if idempotency_key else None
+        return self.client().checkout.sessions.create_async(params, options)
+
+    def _retrieve_checkout_session(self, session_id, timeout):
+        return self.client(timeout).checkout.sessions.retrieve(session_id)
+
+
+class FakeGateway(PaymentGateway):
+    """
+    Offline gateway for tests, benchmarks and local development without
+    Stripe keys. Sessions are kept in memory, idempotency keys are honored
+    like Stripe does, and failures can be scripted with fail_next().
+
+    Attributes:
+        sessions (dict): Created sessions by id.
+        latency (float): Seconds every call takes.
+        payment_status (str): payment_status of new sessions ('paid': the customer pays right away).
+    """
+
+    def __init__(self, latency=0, payment_status="paid", **kwargs):
+        kwargs.setdefault("backoff", 0)
+        super().__init__(**kwargs)
+
+        self.latency = latency
+        self.payment_status = payment_status
+        self.sessions = {}
+        self._by_key = {}
+        self._failures = deque()
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def fail_next(self, error, times=1):
+        """
+        Makes the next `times` calls raise `error` (e.g. stripe.APIConnectionError("down")).
+        """
+
+        with self._lock:
+            self._failures.extend([error] * times)
+
+    def _respond(self, params, idempotency_key):
+        with self._lock:
+            if self._failures:
+                raise self._failures.popleft()
+
+            if idempotency_key in self._by_key:
+                return self._by_key[idempotency_key]
+
+            session_id = f"cs_fake_{next(self._counter)}"
+            checkout_session = SimpleNamespace(
+                id=session_id,
+                url=f"https://checkout.stripe.com/pay/{session_id}",
+                client_reference_id=params.get("client_reference_id"),
+                payment_status=self.payment_status,
+                params=params
+            )
+            self.sessions[session_id] = checkout_session
+
+            if idempotency_key:
+                self._by_key[idempotency_key] = checkout_session
+
+            return checkout_session
+
+    def _create_checkout_session(self, params, idempotency_key, timeout):
+        if self.latency:
+            time.sleep(self.latency)
+
+        return self._respond(params, idempotency_key)
+
+    async def _create_checkout_session_async(self, params, idempotency_key):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        return self._respond(params, idempotency_key)
+
+    def _retrieve_checkout_session(self, session_id, timeout):
+        import stripe
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            if self._failures:
+                raise self._failures.popleft()
+
+            if session_id not in self.sessions:
+                raise stripe.InvalidRequestError(f"No such checkout.session: '{session_id}'", "id")
+
+            return self.sessions[session_id]
+
+
+def create_gateway(config):
+    """
+    Builds the gateway selected by PAYMENT_GATEWAY ("stripe" or "fake").
+
+    :param config: (dict) App config.
+    :return: (PaymentGateway)
+    """
+
+    options = {
+        "timeout": config["PAYMENT_TIMEOUT_SECONDS"],
+        "max_retries": config["PAYMENT_MAX_RETRIES"],
+        "backoff": config["PAYMENT_RETRY_BACKOFF_SECONDS"],
+        "breaker": CircuitBreaker(config["PAYMENT_BREAKER_THRESHOLD"], config["PAYMENT_BREAKER_RESET_SECONDS"])
+    }
+
+    if config["PAYMENT_GATEWAY"] == "fake":
+        return FakeGateway(**options)
+
+    return StripeGateway(
+        config["STRIPE_SECRET_KEY"],
+        api_base=config.get("STRIPE_API_BASE"),
+        connect_timeout=config["PAYMENT_CONNECT_TIMEOUT_SECONDS"],
+        pool_size=config["PAYMENT_POOL_SIZE"],
+        **options
+    )
+
+
+_gateway_lock = threading.Lock()
+
+
+def get_gateway(app=None):
+    """
+    The app's gateway, created on first use and shared by all threads
+    (stored in `app.extensions["payments"]`).
+
+    :param app: (Flask, optional) Application (defaults to current_app).
+    :return: (PaymentGateway)
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "payments" not in app.extensions:
+        with _gateway_lock:
+            if "payments" not in app.extensions:
+                app.extensions["payments"] = create_gateway(app.config)
+
+    return app.extensions["payments"]
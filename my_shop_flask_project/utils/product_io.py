@@ -0,0 +1,286 @@
+# utils/product_io.py
+
+import csv
+import json
+from dataclasses import dataclass, field
+from extensions import db
+from models.product import Products
+from sqlalchemy import insert, or_, select, update
+from utils.catalog_cache import catalog_cache
+from utils.money import format_cents, to_cents
+from utils.storefront import invalidate_product
+from utils.streaming import encode_records
+
+# Columns exchanged by import/export, in file order
+PRODUCT_FIELDS = ["id", "name", "price", "description", "img_url", "quantity", "weight_grams"]
+
+# Fields a row must contain to create a new product
+REQUIRED_FOR_INSERT = ["name", "price", "description", "img_url", "quantity"]
+
+# Fields holding text; the others are numbers, given as JSON numbers or as text
+TEXT_FIELDS = ["name", "description", "img_url"]
+
+
+def iter_products(batch_size=1000):
+    """
+    Streams every product ordered by id over a server-side cursor.
+
+    `yield_per` fetches and buffers only `batch_size` rows at a time, so memory
+    stays constant regardless of catalog size.
+
+    :param batch_size: (int) Rows fetched from the cursor per round-trip.
+    :return: (Iterator[Products]) Products in id order.
+    """
+
+    stmt = select(Products).order_by(Products.id).execution_options(yield_per=batch_size)
+
+    for product in db.session.execute(stmt).scalars():
+        yield product
+        db.session.expunge(product)   # Keep the identity map from growing with the export
+
+
+def _product_row(product):
+    return {
+        "id": product.id,
+        "name": product.name,
+        "price": format_cents(product.price_cents),
+        "description": product.description,
+        "img_url": product.img_url,
+        "quantity": product.quantity,
+        "weight_grams": product.weight_grams
+    }
+
+
+def export_products(fmt, batch_size=1000):
+    """
+    Generator producing the whole catalog as CSV or JSON Lines text chunks,
+    one chunk per `batch_size` products. Suitable for a streaming Response.
+
+    :param fmt: (str) "csv" or "jsonl".
+    :param batch_size: (int) Products per yielded chunk.
+    :return: (Iterator[str]) Encoded file contents.
+    """
+
+    rows = (_product_row(product) for product in iter_products(batch_size))
+
+    return encode_records(rows, PRODUCT_FIELDS, fmt, batch_size)
+
+
+def read_rows(text_stream, fmt):
+    """
+    Lazily parses an import file into (row number, dict) pairs.
+    Lines that are not valid JSON are yielded with a None payload so they are reported.
+
+    :param text_stream: (TextIO) Open text stream of the file.
+    :param fmt: (str) "csv" or "jsonl".
+    :return: (Iterator[tuple[int, dict | None]]) 1-based data row number and raw values.
+    """
+
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text_stream), start=1):
+            yield number, row
+
+    else:
+        for number, line in enumerate(text_stream, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                row = None
+
+            yield number, row if isinstance(row, dict) else None
+
+
+def validate_row(raw):
+    """
+    Validates and normalizes one import row.
+
+    Empty values are treated as "not provided", so a file containing only
+    id/name, price and quantity updates just those columns. The file's
+    decimal `price` is converted to the `price_cents` column.
+
+    :param raw: (dict | None) Raw values from the file.
+    :return: (tuple[dict | None, str | None]) Cleaned values or an error message.
+    """
+
+    if raw is None:
+        return None, "Row is not a valid JSON object."
+
+    values = {}
+
+    for name in PRODUCT_FIELDS:
+        value = raw.get(name)
+
+        if value is None or (isinstance(value, str) and not value.strip()):
+            continue
+
+        # JSON Lines can hold lists, objects or booleans where a scalar is expected
+        if name in TEXT_FIELDS and not isinstance(value, str):
+            return None, f"Field '{name}' must be text."
+
+        if name not in TEXT_FIELDS and (isinstance(value, bool) or not isinstance(value, (str, int, float))):
+            return None, f"Field '{name}' must be a number."
+
+        values[name] = value.strip() if isinstance(value, str) else value
+
+    try:
+        if "id" in values:
+            values["id"] = int(values["id"])
+
+        if "price" in values:
+            try:
+                values["price_cents"] = to_cents(values.pop("price"), exact=True)
+            except (TypeError, ValueError, ArithmeticError):
+                values["price_cents"] = -1
+
+            if values["price_cents"] < 0:
+                return None, f"Invalid price '{raw.get('price')}': must be non-negative with at most 2 decimals."
+
+        if "quantity" in values:
+            values["quantity"] = int(values["quantity"])
+
+            if values["quantity"] < 0:
+                return None, "Quantity cannot be negative."
+
+        if "weight_grams" in values:
+            values["weight_grams"] = int(values["weight_grams"])
+
+            if values["weight_grams"] < 1:
+                return None, "Weight must be at least 1 gram."
+
+    except (TypeError, ValueError, OverflowError):
+        return None, "Invalid number in id, price, quantity or weight."
+
+    if "id" not in values and "name" not in values:
+        return None, "Row needs an id or a name to identify the product."
+
+    return values, None
+
+
+@dataclass
+class ImportReport:
+    """
+    Outcome of a bulk product import.
+
+    Attributes:
+        inserted (int): Products created.
+        updated (int): Existing products updated.
+        errors (list[tuple[int, str]]): Row number and reason for every rejected row.
+    """
+
+    inserted: int = 0
+    updated: int = 0
+    errors: list = field(default_factory=list)
+
+
+def _apply_chunk(chunk, report):
+    """
+    Upserts one chunk of validated rows: a single lookup query, one executemany
+    UPDATE by primary key and one executemany INSERT, then a commit.
+    """
+
+    ids = {values["id"] for _, values in chunk if "id" in values}
+    names = {values["name"] for _, values in chunk if "id" not in values}
+
+    existing_ids = set()
+    ids_by_name = {}
+
+    if ids or names:
+        rows = db.session.execute(
+            select(Products.id, Products.name).where(or_(Products.id.in_(ids), Products.name.in_(names)))
+        ).all()
+
+        for product_id, name in rows:
+            existing_ids.add(product_id)
+            ids_by_name.setdefault(name, []).append(product_id)
+
+    updates = {}
+    inserts = {}
+
+    for number, values in chunk:
+        if "id" in values:
+            if values["id"] not in existing_ids:
+                report.errors.append((number, f"Product id {values['id']} does not exist."))
+                continue
+
+            product_id = values["id"]
+
+        else:
+            matches = ids_by_name.get(values["name"], [])
+
+            if len(matches) > 1:
+                report.errors.append((number, f"Name '{values['name']}' matches several products; use the id."))
+                continue
+
+            if not matches:
+                missing = [name for name in REQUIRED_FOR_INSERT if name not in values and f"{name}_cents" not in values]
+
+                if missing:
+                    report.errors.append((number, f"New product is missing: {', '.join(missing)}."))
+                    continue
+
+                # A later row with the same new name overrides an earlier one in the same chunk
+                inserts[values["name"]] = values
+                continue
+
+            product_id = matches[0]
+
+        updates.setdefault(product_id, {"id": product_id}).update(values)
+
+    if updates:
+        db.session.execute(update(Products), list(updates.values()))
+
+    if inserts:
+        db.session.execute(insert(Products), list(inserts.values()))
+
+    db.session.commit()
+
+    # Carts must not keep showing the old prices of updated products
+    if updates:
+        catalog_cache.invalidate(*updates)
+
+    # The storefront lists every product: new ones must show up too
+    if updates or inserts:
+        invalidate_product()
+
+    report.updated += len(updates)
+    report.inserted += len(inserts)
+
+
+def import_products(rows, chunk_size=1000):
+    """
+    Validated bulk upsert of products keyed by id, or by name when no id is given.
+
+    Rows are consumed lazily and written `chunk_size` at a time, each chunk in
+    its own transaction. Invalid rows are skipped and listed in the report.
+
+    :param rows: (Iterable[tuple[int, dict | None]]) Output of read_rows().
+    :param chunk_size: (int) Rows per transaction.
+    :return: (ImportReport) Counts and per-row errors.
+    """
+
+    report = ImportReport()
+    chunk = []
+
+    for number, raw in rows:
+        values, error = validate_row(raw)
+
+        if error:
+            report.errors.append((number, error))
+            continue
+
+        chunk.append((number, values))
+
+        if len(chunk) >= chunk_size:
+            _apply_chunk(chunk, report)
+            chunk = []
+
+    if chunk:
+        _apply_chunk(chunk, report)
+
+    # Validation errors are found before chunk-level ones; report them in file order
+    report.errors.sort()
+
+    return report
@@ -0,0 +1,289 @@
+# utils/rate_limit.py
+
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from flask import current_app, jsonify, request, session
+from functools import wraps
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """
+    A token bucket's shape: up to `capacity` requests at once, refilled
+    evenly at `capacity / period` tokens per second.
+
+    Attributes:
+        capacity (int): Bucket size, i.e. the allowed burst.
+        period (int): Seconds to refill an empty bucket.
+    """
+
+    capacity: int
+    period: int
+
+    @classmethod
+    def parse(cls, text):
+        """
+        :param text: (str) E.g. "10/minute", "5/hour" or "3/second".
+        :return: (Rate)
+        """
+
+        count, _, unit = text.partition("/")
+        return cls(int(count), PERIODS[unit.strip().rstrip("s")])
+
+    @property
+    def refill_rate(self):
+        return self.capacity / self.period
+
+
+def take(tokens, updated, now, rate, cost=1):
+    """
+    Refills a bucket up to `now` and tries to take `cost` tokens from it.
+
+    :return: (tuple[float, float]) Tokens left, and seconds to wait before
+             retrying (0 when the request is allowed).
+    """
+
+    tokens = min(rate.capacity, tokens + (now - updated) * rate.refill_rate)
+
+    if tokens >= cost:
+        return tokens - cost, 0.0
+
+    return tokens, (cost - tokens) / rate.refill_rate
+
+
+class MemoryBackend:
+    """
+    Buckets in this process's memory. Fastest, but every worker process
+    counts separately, so the effective limit is multiplied by the number
+    of workers.
+
+    Attributes:
+        maxsize (int): Buckets kept before idle (full) ones are dropped.
+    """
+
+    def __init__(self, maxsize=100000):
+        self.maxsize = maxsize
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, cost=1):
+        """
+        :param key: (str) Bucket identifier.
+        :param rate: (Rate) Bucket shape.
+        :param cost: (int) Tokens the request takes.
+        :return: (float) 0 if allowed, else seconds until it would be.
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated, _ = self._buckets.get(key, (rate.capacity, now, now))
+            tokens, retry_after = take(tokens, updated, now, rate, cost)
+
+            if key not in self._buckets and len(self._buckets) >= self.maxsize:
+                self._prune(now)
+
+            # Third value: when the bucket is full again and can be forgotten
+            self._buckets[key] = (tokens, now, now + (rate.capacity - tokens) / rate.refill_rate)
+
+        return retry_after
+
+    def _prune(self, now):
+        self._buckets = {key: bucket for key, bucket in self._buckets.items() if bucket[2] > now}
+
+        if len(self._buckets) >= self.maxsize:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """
+    Buckets in a small SQLite file shared by every worker process on the
+    host, so limits hold across a multi-worker deployment. Each check is
+    one short `BEGIN IMMEDIATE` transaction on a per-thread connection.
+
+    Attributes:
+        path (str): Database file.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+        )
+        conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _connection(self):
+        if not hasattr(self._local, "conn"):
+            self._local.conn = self._connect()
+            self._local.calls = 0
+
+        return self._local.conn
+
+    def consume(self, key, rate, cost=1):
+        """
+        Same contract as MemoryBackend.consume().
+        """
+
+        conn = self._connection()
+        now = time.time()   # Wall clock: shared between processes
+
+        conn.execute("BEGIN IMMEDIATE")
+
+        try:
+            row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, retry_after = take(*(row or (rate.capacity, now)), now, rate, cost)
+
+            conn.execute(
+                "INSERT INTO rate_limit_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, full_at = excluded.full_at",
+                (key, tokens, now, now + (rate.capacity - tokens) / rate.refill_rate)
+            )
+
+            self._local.calls += 1
+
+            if self._local.calls % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+
+            conn.execute("COMMIT")
+
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return retry_after
+
+
+def create_backend(app):
+    """
+    Builds the backend selected by RATELIMIT_BACKEND ("memory" or "sqlite").
+
+    :param app: (Flask) Application.
+    :return: (MemoryBackend | SQLiteBackend)
+    """
+
+    if app.config["RATELIMIT_BACKEND"] == "sqlite":
+        path = app.config.get("RATELIMIT_SQLITE_PATH") or os.path.join(app.instance_path, "ratelimit.db")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return SQLiteBackend(path)
+
+    return MemoryBackend()
+
+
+_backend_lock = threading.Lock()
+
+
+def get_backend(app=None):
+    """
+    The app's rate limit backend, created on first use (stored in `app.extensions["rate_limit"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "rate_limit" not in app.extensions:
+        with _backend_lock:
+            if "rate_limit" not in app.extensions:
+                app.extensions["rate_limit"] = create_backend(app)
+
+    return app.extensions["rate_limit"]
+
+
+def _client_ip():
+    # Behind a reverse proxy, wrap the app in werkzeug's ProxyFix so this is the real client
+    return request.remote_addr or "unknown"
+
+
+def _identity(per):
+    """
+    Who a request is counted against. Reads only the request and the
+    session cookie, so no database work happens before the check.
+    """
+
+    if per == "ip":
+        return _client_ip()
+
+    if per == "user":
+        # Flask-Login's session key; anonymous visitors are counted per IP
+        user_id = session.get("_user_id")
+        return f"user:{user_id}" if user_id else f"ip:{_client_ip()}"
+
+    if per == "account":
+        # The account being logged into, from this IP: repeated guesses at one account are slowed
+        # down, but nobody can lock its owner out by failing logins from elsewhere
+        email = (request.form.get("email") or "").strip().lower()
+        return f"{email}@{_client_ip()}" if email else None
+
+    raise ValueError(f"Unknown rate limit scope '{per}'")
+
+
+def too_many_requests(retry_after):
+    """
+    The 429 response: JSON for AJAX calls, plain text otherwise.
+    """
+
+    message = "Too many requests. Please slow down and try again shortly."
+
+    if request.accept_mimetypes.best == "application/json" or request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        response = jsonify(error=message)
+    else:
+        response = current_app.response_class(message, mimetype="text/plain")
+
+    response.status_code = 429
+    response.headers["Retry-After"] = str(max(1, int(retry_after + 0.999)))
+
+    return response
+
+
+def rate_limit(limit, per="ip", methods=None):
+    """
+    Route decorator applying a token bucket limit before the view runs.
+
+    Stack it to combine limits, e.g. per IP and per account on login:
+
+        @rate_limit("20/minute", per="ip", methods=["POST"])
+        @rate_limit("5/minute", per="account", methods=["POST"])
+
+    Rejected requests get a 429 with Retry-After without touching the
+    database or hashing a password. Disabled when RATELIMIT_ENABLED is off.
+
+    :param limit: (str) Rate such as "10/minute".
+    :param per: (str) "ip", "user" (logged-in user, else IP) or "account" (posted email, per IP).
+    :param methods: (list[str], optional) Only limit these HTTP methods (default: all).
+    :return: (function) The decorator.
+    """
+
+    rate = Rate.parse(limit)
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if current_app.config.get("RATELIMIT_ENABLED") and (methods is None or request.method in methods):
+                identity = _identity(per)
+
+                if identity is not None:
+                    retry_after = get_backend().consume(f"{request.endpoint}:{per}:{limit}:{identity}", rate)
+
+                    if retry_after:
+                        return too_many_requests(retry_after)
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+    return decorator
@@ -0,0 +1,317 @@
+# utils/recommendations.py
+
+import itertools
+from datetime import datetime, timezone
+from extensions import db
+from flask import current_app
+from models import ProductCoPurchase, ProductRecommendation, Products, RecommendationState
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from utils.archive import order_history, order_item_history
+
+# Products per IN (...) list, and rows per executemany batch
+CHUNK_SIZE = 500
+BATCH_SIZE = 5000
+
+
+def cooccurrence(order_ids, product_ids):
+    """
+    Sparse product co-occurrence matrix C = XᵀX, where X is the binary
+    order x product matrix, computed with NumPy without materializing X.
+
+    Items are grouped by order; every item is paired with every item of its
+    order (itself included, which fills the diagonal with per-product order
+    counts), and identical pairs are counted with one np.unique.
+
+    :param order_ids: (numpy.ndarray) Order id of each distinct (order, product) item.
+    :param product_ids: (numpy.ndarray) Product id of each item.
+    :return: (tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]) COO triplets:
+             row product ids, column product ids and order counts.
+    """
+
+    import numpy as np
+
+    if not len(product_ids):
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    by_order = np.lexsort((product_ids, order_ids))
+    orders = order_ids[by_order]
+    products = product_ids[by_order].astype(np.int64)
+
+    starts = np.flatnonzero(np.r_[True, orders[1:] != orders[:-1]])
+    sizes = np.diff(np.r_[starts, len(orders)])
+
+    # Each item is repeated once per item of its order...
+    pair_counts = np.repeat(sizes, sizes)
+    left = np.repeat(products, pair_counts)
+
+    # ...and paired with the items of its order in turn
+    offsets = np.arange(pair_counts.sum()) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+    right = products[np.repeat(np.repeat(starts, sizes), pair_counts) + offsets]
+
+    width = int(products.max()) + 1
+    keys, counts = np.unique(left * width + right, return_counts=True)
+
+    return keys // width, keys % width, counts
+
+
+def top_neighbours(rows, cols, counts, k, min_support=1):
+    """
+    Scores every product pair by the cosine similarity of the products'
+    order sets, C[i, j] / sqrt(C[i, i] * C[j, j]), and keeps each row's
+    `k` best, ranked.
+
+    :param rows: (numpy.ndarray) Row product ids; must include the diagonal of every product involved.
+    :param cols: (numpy.ndarray) Column product ids.
+    :param counts: (numpy.ndarray) Orders containing both products.
+    :param k: (int) Neighbours kept per product.
+    :param min_support: (int) Ignore pairs bought together in fewer orders than this.
+    :return: (tuple[numpy.ndarray, ...]) Product ids, ranks, recommended ids and scores.
+    """
+
+    import numpy as np
+
+    diagonal = rows == cols
+    orders_with = dict(zip(rows[diagonal].tolist(), counts[diagonal].tolist()))
+
+    keep = ~diagonal & (counts >= min_support)
+    rows, cols, counts = rows[keep], cols[keep], counts[keep]
+
+    norms = np.sqrt(np.array([orders_with[p] for p in rows.tolist()], dtype=float)
+                    * np.array([orders_with[p] for p in cols.tolist()], dtype=float))
+    scores = counts / norms if len(counts) else np.zeros(0)
+
+    # Within each row: best score first, ties broken by product id
+    order = np.lexsort((cols, -scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+
+    starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]]) if len(rows) else np.zeros(0, dtype=np.int64)
+    ranks = np.arange(len(rows)) - np.repeat(starts, np.diff(np.r_[starts, len(rows)]))
+    keep = ranks < k
+
+    return rows[keep], ranks[keep], cols[keep], scores[keep]
+
+
+def _order_items(after_order_id=0):
+    """
+    Distinct (order, product) pairs of the orders after `after_order_id`,
+    archived orders included, as NumPy arrays.
+    """
+
+    import numpy as np
+
+    items = order_item_history("order_id", "product_id")
+    rows = db.session.execute(
+        select(items.c.order_id, items.c.product_id)
+        .where(items.c.order_id > after_order_id)
+        .distinct()
+    ).tuples()
+
+    pairs = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64).reshape(-1, 2)
+
+    return pairs[:, 0], pairs[:, 1]
+
+
+def _chunks(values, size=CHUNK_SIZE):
+    values = list(values)
+
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _insert(model, rows):
+    # Plain executemany on the table: no ORM bookkeeping for hundreds of thousands of cells
+    for batch in _chunks(rows, BATCH_SIZE):
+        db.session.connection().execute(insert(model.__table__), batch)
+
+
+def _write_recommendations(product_ids, neighbours):
+    """
+    Replaces the stored lists of `product_ids` with `neighbours` (from top_neighbours()).
+    """
+
+    for chunk in _chunks(product_ids):
+        db.session.execute(delete(ProductRecommendation).where(ProductRecommendation.product_id.in_(chunk)))
+
+    rows = [
+        {"product_id": product_id, "rank": rank, "recommended_id": recommended_id, "score": round(score, 6)}
+        for product_id, rank, recommended_id, score in zip(*(array.tolist() for array in neighbours))
+    ]
+
+    _insert(ProductRecommendation, rows)
+
+    return len(rows)
+
+
+def _state():
+    state = db.session.get(RecommendationState, 1)
+
+    if state is None:
+        state = RecommendationState(id=1, last_order_id=0)
+        db.session.add(state)
+        db.session.flush()
+
+    return state
+
+
+def rebuild_recommendations():
+    """
+    Recomputes the co-purchase matrix and every product's recommendations
+    from the full order history (archived orders included), replacing their current contents.
+    Used for the initial backfill and after bulk changes to orders.
+
+    :return: (dict) Rows written per table.
+    """
+
+    config = current_app.config
+    orders = order_history("id")
+    last_order_id = db.session.execute(select(func.coalesce(func.max(orders.c.id), 0))).scalar()
+
+    rows, cols, counts = cooccurrence(*_order_items())
+
+    db.session.execute(delete(ProductRecommendation))
+    db.session.execute(delete(ProductCoPurchase))
+
+    cells = [{"product_id": p, "other_id": o, "orders": n} for p, o, n in zip(rows.tolist(), cols.tolist(), counts.tolist())]
+
+    _insert(ProductCoPurchase, cells)
+
+    # Nothing to replace: the table was emptied above
+    neighbours = top_neighbours(rows, cols, counts, config["RECOMMENDATIONS_TOP_K"], config["RECOMMENDATIONS_MIN_SUPPORT"])
+    written = _write_recommendations((), neighbours)
+
+    state = _state()
+    state.last_order_id = last_order_id
+    state.refreshed_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+    return {ProductCoPurchase.__tablename__: len(cells), ProductRecommendation.__tablename__: written}
+
+
+def refresh_recommendations():
+    """
+    Folds the orders placed since the last refresh into the co-purchase
+    matrix and recomputes only the recommendations that can have changed:
+    those of the products in the new orders and of the products ever bought
+    with them (their scores depend on the new order counts).
+
+    Concurrent refreshes are safe: the first one to move the watermark wins
+    and the others return without changes.
+
+    :return: (dict) New orders folded in and products whose recommendations were recomputed.
+    """
+
+    import numpy as np
+
+    config = current_app.config
+    state = _state()
+    previous = state.last_order_id
+    order_ids, product_ids = _order_items(previous)
+
+    if not len(order_ids):
+        db.session.commit()
+        return {"orders": 0, "products": 0}
+
+    last_order_id = int(order_ids.max())
+    claimed = db.session.execute(
+        update(RecommendationState)
+        .where(RecommendationState.id == 1, RecommendationState.last_order_id == previous)
+        .values(last_order_id=last_order_id, refreshed_at=datetime.now(timezone.utc))
+    ).rowcount
+
+    if not claimed:
+        db.session.rollback()
+        return {"orders": 0, "products": 0}
+
+    rows, cols, counts = cooccurrence(order_ids, product_ids)
+    affected = sorted(set(rows.tolist()))
+
+    existing = set()
+
+    for chunk in _chunks(affected):
+        existing.update(db.session.execute(
+            select(ProductCoPurchase.product_id, ProductCoPurchase.other_id).where(ProductCoPurchase.product_id.in_(chunk))
+        ).tuples())
+
+    increments, cells = [], []
+
+    for p, o, n in zip(rows.tolist(), cols.tolist(), counts.tolist()):
+        if (p, o) in existing:
+            increments.append({"p": p, "o": o, "delta": n})
+        else:
+            cells.append({"product_id": p, "other_id": o, "orders": n})
+
+    increment = (
+        update(ProductCoPurchase)
+        .where(ProductCoPurchase.product_id == bindparam("p"), ProductCoPurchase.other_id == bindparam("o"))
+        .values(orders=ProductCoPurchase.orders + bindparam("delta"))
+    )
+
+    for batch in _chunks(increments, BATCH_SIZE):
+        db.session.connection().execute(increment, batch)
+
+    _insert(ProductCoPurchase, cells)
+
+    # Every product bought with an affected product (the matrix is symmetric, so these are the affected rows' columns)
+    recompute = set()
+
+    for chunk in _chunks(affected):
+        recompute.update(db.session.scalars(
+            select(ProductCoPurchase.other_id).where(ProductCoPurchase.product_id.in_(chunk))
+        ))
+
+    matrix = []
+
+    for chunk in _chunks(sorted(recompute)):
+        matrix.extend(db.session.execute(
+            select(ProductCoPurchase.product_id, ProductCoPurchase.other_id, ProductCoPurchase.orders)
+            .where(ProductCoPurchase.product_id.in_(chunk))
+        ).tuples())
+
+    # Columns' diagonals are needed for the norms; the recomputed rows' own are already loaded
+    columns = {other_id for _, other_id, _ in matrix} - recompute
+
+    for chunk in _chunks(sorted(columns)):
+        matrix.extend(db.session.execute(
+            select(ProductCoPurchase.product_id, ProductCoPurchase.other_id, ProductCoPurchase.orders)
+            .where(ProductCoPurchase.product_id.in_(chunk), ProductCoPurchase.other_id == ProductCoPurchase.product_id)
+        ).tuples())
+
+    rows, cols, counts = (np.array(column, dtype=np.int64) for column in zip(*matrix))
+    neighbours = top_neighbours(rows, cols, counts, config["RECOMMENDATIONS_TOP_K"], config["RECOMMENDATIONS_MIN_SUPPORT"])
+    _write_recommendations(recompute, neighbours)
+    db.session.commit()
+
+    return {"orders": len(set(order_ids.tolist())), "products": len(recompute)}
+
+
+def recommended_products(product_ids, limit=4):
+    """
+    "Customers also bought" for one product (product page) or several
+    (cart page, where the lists are merged by summed score), read from the
+    precomputed lists with one primary key range scan per product.
+
+    :param product_ids: (list[int]) Products being viewed or in the cart.
+    :param limit: (int) Products to return.
+    :return: (list[Products]) Active, in-stock recommended products, best first, excluding `product_ids`.
+    """
+
+    if not product_ids:
+        return []
+
+    rows = db.session.execute(
+        select(ProductRecommendation.recommended_id, ProductRecommendation.score, Products)
+        .join(Products, Products.id == ProductRecommendation.recommended_id)
+        .where(ProductRecommendation.product_id.in_(product_ids), Products.active, Products.quantity > 0)
+    ).all()
+
+    scores, products = {}, {}
+
+    for recommended_id, score, product in rows:
+        if recommended_id not in product_ids:
+            scores[recommended_id] = scores.get(recommended_id, 0) + score
+            products[recommended_id] = product
+
+    best = sorted(scores, key=lambda recommended_id: (-scores[recommended_id], recommended_id))[:limit]
+
+    return [products[recommended_id] for recommended_id in best]
@@ -0,0 +1,120 @@
+# utils/reviews.py
+
+from extensions import db
+from models import User
+from models.order import Review
+from sqlalchemy import func, select
+
+# Products per IN (...) list, well under SQLite's bound parameter limit
+CHUNK_SIZE = 500
+
+
+def reviewer_name(name, user_id):
+    """
+    Public name shown on a review: the reviewer's initial, e.g. "C***".
+
+    :param name: (str | None) The reviewer's full name (None if the user is gone).
+    :param user_id: (int) The reviewer's id, shown when the name is unknown.
+    :return: (str) Display name.
+    """
+
+    return name[:1].upper() + "***" if name else f"User #{user_id}"
+
+
+def _review_columns():
+    # One joined row per review: the reviewer's name comes with it, nothing is lazy-loaded
+    return (Review.id, Review.product_id, Review.rating, Review.comment, Review.date, Review.user_id,
+            User.name.label("user_name"))
+
+
+def _as_dict(row):
+    return {
+        "id": row.id,
+        "rating": row.rating,
+        "comment": row.comment,
+        "date": row.date.isoformat() if row.date else None,
+        "author": reviewer_name(row.user_name, row.user_id)
+    }
+
+
+def review_page(product_id, after=None, limit=20):
+    """
+    One page of a product's reviews, newest first, keyed by review id so
+    every page is an index range scan on (product_id, id) however deep it is.
+
+    :param product_id: (int) Product whose reviews to read.
+    :param after: (int, optional) Cursor: return reviews older than this review id.
+    :param limit: (int) Page size.
+    :return: (tuple[list[dict], int | None]) Reviews (id, rating, comment, date, author)
+             and the cursor of the next page, or None on the last page.
+    """
+
+    stmt = (
+        select(*_review_columns())
+        .outerjoin(User, User.id == Review.user_id)
+        .where(Review.product_id == product_id)
+        .order_by(Review.id.desc())
+        .limit(limit + 1)   # One extra row tells whether another page exists
+    )
+
+    if after is not None:
+        stmt = stmt.where(Review.id < after)
+
+    rows = db.session.execute(stmt).all()
+    reviews = [_as_dict(row) for row in rows[:limit]]
+
+    return reviews, (reviews[-1]["id"] if len(rows) > limit else None)
+
+
+def latest_reviews(product_ids, per_product=5):
+    """
+    The newest reviews of many products at once, ranked per product with
+    ROW_NUMBER() in the database instead of loading every review.
+
+    :param product_ids: (list[int]) Products to read.
+    :param per_product: (int) Reviews to keep per product.
+    :return: (dict[int, list[dict]]) Reviews per product id, newest first (missing if none).
+    """
+
+    latest = {}
+
+    for start in range(0, len(product_ids), CHUNK_SIZE):
+        ranked = (
+            select(*_review_columns(),
+                   func.row_number().over(partition_by=Review.product_id, order_by=Review.id.desc()).label("position"))
+            .outerjoin(User, User.id == Review.user_id)
+            .where(Review.product_id.in_(product_ids[start:start + CHUNK_SIZE]))
+            .subquery()
+        )
+
+        rows = db.session.execute(
+            select(ranked).where(ranked.c.position <= per_product).order_by(ranked.c.product_id, ranked.c.position)
+        )
+
+        for row in rows:
+            latest.setdefault(row.product_id, []).append(_as_dict(row))
+
+    return latest
+
+
+def rating_summaries(product_ids):
+    """
+    Average rating and review count of many products in one grouped query per chunk.
+
+    :param product_ids: (list[int]) Products to read.
+    :return: (dict[int, tuple[float, int]]) (average rounded to 2 places, count) per product id.
+    """
+
+    summaries = {}
+
+    for start in range(0, len(product_ids), CHUNK_SIZE):
+        rows = db.session.execute(
+            select(Review.product_id, func.avg(Review.rating), func.count())
+            .where(Review.product_id.in_(product_ids[start:start + CHUNK_SIZE]))
+            .group_by(Review.product_id)
+        )
+
+        for product_id, avg, count in rows:
+            summaries[product_id] = (round(avg or 0, 2), count)
+
+    return summaries
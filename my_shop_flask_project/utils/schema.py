@@ -0,0 +1,366 @@
+# utils/schema.py
+
+import json
+from extensions import db
+from models import Address
+from sqlalchemy import insert, inspect, text
+from utils.addresses import ADDRESS_FIELDS, profile_fields_complete
+from utils.identifiers import normalize_cpf
+
+# Upgrade steps in the order they must run; each one checks the live schema
+# and only changes what is still missing, so `flask schema upgrade` is safe to rerun
+MIGRATIONS = []
+
+
+def migration(func):
+    """
+    Registers the decorated function as the next schema upgrade step.
+    The function returns a short description of what it changed, or None.
+    """
+
+    MIGRATIONS.append(func)
+
+    return func
+
+
+def _columns(table):
+    """
+    Column names of `table`, or None if the table does not exist.
+    """
+
+    inspector = inspect(db.engine)
+
+    if not inspector.has_table(table):
+        return None
+
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+# (table, old decimal/float column, new integer cents column)
+MONEY_COLUMNS = [
+    ("products", "price", "price_cents"),
+    ("orders", "total", "total_cents"),
+    ("order_items", "price", "price_cents"),
+    ("checkout_sessions", "total", "total_cents")
+]
+
+# Rollups are derived data: they are dropped and rebuilt instead of converted
+ROLLUP_TABLES = ["sales_daily", "sales_product_daily", "sales_customer"]
+
+
+@migration
+def money_to_cents():
+    """
+    Stores money as integer cents: copies each amount into a new *_cents
+    column (rounded to the cent) and drops the old column.
+    """
+
+    changed = []
+
+    with db.engine.begin() as conn:
+        for table, old, new in MONEY_COLUMNS:
+            columns = _columns(table)
+
+            if columns is None or old not in columns or new in columns:
+                continue
+
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {new} INTEGER NOT NULL DEFAULT 0"))
+            conn.execute(text(f"UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS INTEGER)"))
+            conn.execute(text(f"ALTER TABLE {table} DROP COLUMN {old}"))
+            changed.append(f"{table}.{old} -> {new}")
+
+        for table in ROLLUP_TABLES:
+            columns = _columns(table)
+
+            if columns is not None and "revenue" in columns:
+                conn.execute(text(f"DROP TABLE {table}"))
+                changed.append(f"dropped {table} for rebuild")
+
+    return ", ".join(changed) or None
+
+
+@migration
+def review_feed_index():
+    """
+    Adds the (product_id, id) index the paginated review feed reads through
+    (create_all() only creates indexes together with new tables).
+    """
+
+    if _columns("reviews") is None:
+        return None
+
+    if "ix_reviews_product_id_id" in {index["name"] for index in inspect(db.engine).get_indexes("reviews")}:
+        return None
+
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_reviews_product_id_id ON reviews (product_id, id)"))
+
+    return "created ix_reviews_product_id_id"
+
+
+@migration
+def product_active_flag():
+    """
+    Adds the products.active flag behind soft deletion (existing products
+    stay active) and the partial index of active products.
+    """
+
+    columns = _columns("products")
+
+    if columns is None:
+        return None
+
+    changed = []
+
+    with db.engine.begin() as conn:
+        if "active" not in columns:
+            conn.execute(text("ALTER TABLE products ADD COLUMN active BOOLEAN NOT NULL DEFAULT 1"))
+            changed.append("added products.active")
+
+        if "ix_products_active_id" not in {index["name"] for index in inspect(conn).get_indexes("products")}:
+            conn.execute(text("CREATE INDEX ix_products_active_id ON products (id) WHERE active = 1"))
+            changed.append("created ix_products_active_id")
+
+    return ", ".join(changed) or None
+
+
+@migration
+def user_addresses():
+    """
+    Moves each user's users.user_data JSON (phone and address) into the
+    addresses table as their default address, stores whether their profile
+    is complete in users.profile_complete, and drops the JSON column.
+    """
+
+    columns = _columns("users")
+
+    if columns is None or "user_data" not in columns:
+        return None
+
+    with db.engine.begin() as conn:
+        Address.__table__.create(conn, checkfirst=True)
+
+        if "profile_complete" not in columns:
+            conn.execute(text("ALTER TABLE users ADD COLUMN profile_complete BOOLEAN NOT NULL DEFAULT 0"))
+
+        addresses = []
+        complete = []
+
+        for user_id, cpf, rg, data in conn.execute(text("SELECT id, cpf, rg, user_data FROM users WHERE user_data IS NOT NULL")):
+            data = json.loads(data) if isinstance(data, str) else data
+
+            if not isinstance(data, dict) or not any(data.get(field) for field in ADDRESS_FIELDS):
+                continue
+
+            # Partial addresses are kept too: the profile form pre-fills them
+            addresses.append({"user_id": user_id, "is_default": True,
+                              **{field: str(data.get(field) or "") for field in ADDRESS_FIELDS}})
+
+            if profile_fields_complete(cpf, rg, data):
+                complete.append({"id": user_id})
+
+        if addresses:
+            conn.execute(insert(Address), addresses)
+
+        if complete:
+            conn.execute(text("UPDATE users SET profile_complete = 1 WHERE id = :id"), complete)
+
+        conn.execute(text("ALTER TABLE users DROP COLUMN user_data"))
+
+    return f"moved {len(addresses)} addresses out of users.user_data ({len(complete)} complete profiles)"
+
+
+# (table, column, SQL type and default) added for shipping quotes
+SHIPPING_COLUMNS = [
+    ("products", "weight_grams", "INTEGER"),
+    ("orders", "shipping_cents", "INTEGER NOT NULL DEFAULT 0"),
+    ("orders_archive", "shipping_cents", "INTEGER NOT NULL DEFAULT 0"),
+    ("checkout_sessions", "shipping_cents", "INTEGER NOT NULL DEFAULT 0")
+]
+
+
+@migration
+def shipping_columns():
+    """
+    Adds product weights (unset, so the default weight applies) and the
+    shipping charged on checkouts and orders (0 for existing ones).
+    """
+
+    changed = []
+
+    with db.engine.begin() as conn:
+        for table, column, definition in SHIPPING_COLUMNS:
+            columns = _columns(table)
+
+            if columns is None or column in columns:
+                continue
+
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+            changed.append(f"added {table}.{column}")
+
+    return ", ".join(changed) or None
+
+
+@migration
+def stripe_event_claimed_at():
+    """
+    Records when webhook events were claimed, so events left processing by a
+    dead worker can be claimed again. Events processing now count as claimed
+    when they were received.
+    """
+
+    columns = _columns("stripe_events")
+
+    if columns is None or "claimed_at" in columns:
+        return None
+
+    with db.engine.begin() as conn:
+        conn.execute(text("ALTER TABLE stripe_events ADD COLUMN claimed_at TIMESTAMP"))
+        conn.execute(text("UPDATE stripe_events SET claimed_at = received_at WHERE status = 'processing'"))
+
+    return "added stripe_events.claimed_at"
+
+
+# Order tables whose status is stored normalized (see models.order.normalize_status)
+ORDER_STATUS_TABLES = ["orders", "orders_archive"]
+
+
+@migration
+def order_status_normalized():
+    """
+    Rewrites order statuses in their canonical spelling ('delivered' ->
+    'Delivered'), so status filters compare the column directly, and adds
+    the (status, date) index they read through.
+    """
+
+    changed = []
+
+    with db.engine.begin() as conn:
+        for table in ORDER_STATUS_TABLES:
+            if _columns(table) is None:
+                continue
+
+            canonical = "upper(substr(trim(status), 1, 1)) || lower(substr(trim(status), 2))"
+            updated = conn.execute(text(f"UPDATE {table} SET status = {canonical} WHERE status != {canonical}")).rowcount
+
+            if updated:
+                changed.append(f"normalized {updated} {table} statuses")
+
+        if _columns("orders") is not None:
+            if "ix_orders_status_date" not in {index["name"] for index in inspect(conn).get_indexes("orders")}:
+                conn.execute(text("CREATE INDEX ix_orders_status_date ON orders (status, date)"))
+                changed.append("created ix_orders_status_date")
+
+    return ", ".join(changed) or None
+
+
+# (index, table, columns) of the order history reads: export keyset iteration by date,
+# per-customer order lists and the "has this user bought it" check
+ORDER_INDEXES = [
+    ("ix_orders_date", "orders", "date"),
+    ("ix_orders_user_id", "orders", "user_id"),
+    ("ix_order_items_order_id", "order_items", "order_id")
+]
+
+
+@migration
+def order_indexes():
+    """
+    Adds the single-column indexes of the order tables that create_all()
+    only creates together with new tables.
+    """
+
+    changed = []
+
+    with db.engine.begin() as conn:
+        for name, table, columns in ORDER_INDEXES:
+            if _columns(table) is None:
+                continue
+
+            if name not in {index["name"] for index in inspect(conn).get_indexes(table)}:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+                changed.append(f"created {name}")
+
+    return ", ".join(changed) or None
+
+
+@migration
+def product_name_index():
+    """
+    Adds the products.name index the bulk import matches rows by
+    (create_all() only creates indexes together with new tables).
+    """
+
+    if _columns("products") is None:
+        return None
+
+    if "ix_products_name" in {index["name"] for index in inspect(db.engine).get_indexes("products")}:
+        return None
+
+    with db.engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_products_name ON products (name)"))
+
+    return "created ix_products_name"
+
+
+@migration
+def normalize_user_cpfs():
+    """
+    Stores every CPF as its 11 digits, the form profile edits save, so the
+    unique constraint catches one CPF entered with and without punctuation.
+    A CPF whose digits another user already has is left as it is (reported).
+    """
+
+    if _columns("users") is None:
+        return None
+
+    normalized, conflicts = 0, []
+
+    with db.engine.begin() as conn:
+        stored = conn.execute(text("SELECT id, cpf FROM users WHERE cpf IS NOT NULL ORDER BY id")).all()
+        taken = {cpf for _, cpf in stored}
+
+        for user_id, cpf in stored:
+            digits = normalize_cpf(cpf)
+
+            if digits == cpf:
+                continue
+
+            if digits in taken:
+                conflicts.append(user_id)
+                continue
+
+            conn.execute(text("UPDATE users SET cpf = :cpf WHERE id = :id"), {"cpf": digits, "id": user_id})
+            taken.add(digits)
+            normalized += 1
+
+    if not normalized and not conflicts:
+        return None
+
+    description = f"normalized {normalized} CPFs"
+
+    if conflicts:
+        description += f", left {len(conflicts)} duplicates for review (users {', '.join(map(str, conflicts))})"
+
+    return description
+
+
+def upgrade():
+    """
+    Brings an existing database up to the current models: runs every pending
+    migration step, then creates tables that do not exist yet.
+
+    :return: (list[tuple[str, str]]) Name and description of each step that changed something.
+    """
+
+    applied = []
+
+    for step in MIGRATIONS:
+        description = step()
+
+        if description:
+            applied.append((step.__name__, description))
+
+    db.create_all()
+
+    return applied
@@ -0,0 +1,201 @@
+# utils/shipping.py
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from flask import current_app
+
+# Zip codes (CEP) have 8 digits; any punctuation is ignored
+ZIP_DIGITS = 8
+
+
+def normalize_zip(zip_code):
+    """
+    :param zip_code: (str | None) Zip code as entered, e.g. "01310-100".
+    :return: (int | None) Its digits as a number, or None if it does not have ZIP_DIGITS digits.
+    """
+
+    digits = re.sub(r"\D", "", zip_code or "")
+
+    return int(digits) if len(digits) == ZIP_DIGITS else None
+
+
+@dataclass(frozen=True)
+class ShippingQuote:
+    """
+    Shipping cost of a cart to one zip code.
+
+    Attributes:
+        zone (str): Shipping zone of the zip code.
+        weight_grams (int): Total weight the rate was looked up for.
+        cost_cents (int): Amount charged, 0 when shipping is free.
+        free (bool): Whether the free-shipping threshold was reached.
+    """
+
+    zone: str
+    weight_grams: int
+    cost_cents: int
+    free: bool
+
+
+class ShippingTable:
+    """
+    Zones and rates precomputed into sorted arrays, so a quote is two binary
+    searches in memory: one over the zone ranges' start zip codes, one over
+    the weight brackets. Nothing is read from the database or the network.
+
+    Attributes:
+        free_threshold_cents (int | None): Carts worth at least this much ship free.
+        default_zone (str | None): Zone of zip codes outside every range (None: no delivery there).
+    """
+
+    def __init__(self, zones, brackets, rates, free_threshold_cents=None, default_zone=None):
+        """
+        :param zones: (list[tuple[str, str, str]]) Inclusive (first zip, last zip, zone) ranges; must not overlap.
+        :param brackets: (list[int]) Increasing upper weight bound of each bracket, in grams.
+        :param rates: (dict[str, list[int]]) Per zone, the price of each bracket in cents, then the price
+                      of each started kilogram above the last bracket.
+        :param free_threshold_cents: (int, optional) Carts worth at least this much ship free.
+        :param default_zone: (str, optional) Zone of zip codes outside every range.
+        :raises ValueError: If the tables are inconsistent.
+        """
+
+        ranges = []
+
+        for first, last, zone in zones:
+            start, end = normalize_zip(first), normalize_zip(last)
+
+            if start is None or end is None or start > end:
+                raise ValueError(f"Invalid zip code range {first}-{last} for zone {zone!r}.")
+
+            ranges.append((start, end, zone))
+
+        ranges.sort()
+
+        for (_, previous_end, previous_zone), (start, _, zone) in zip(ranges, ranges[1:]):
+            if start <= previous_end:
+                raise ValueError(f"Zones {previous_zone!r} and {zone!r} overlap.")
+
+        if any(low >= high for low, high in zip(brackets, brackets[1:])):
+            raise ValueError("Weight brackets must be increasing.")
+
+        for zone in {zone for _, _, zone in ranges} | ({default_zone} - {None}):
+            if len(rates.get(zone, ())) != len(brackets) + 1:
+                raise ValueError(f"Zone {zone!r} needs one rate per weight bracket plus the extra kilogram rate.")
+
+        self._starts = [start for start, _, _ in ranges]
+        self._ends = [end for _, end, _ in ranges]
+        self._zones = [zone for _, _, zone in ranges]
+        self._brackets = list(brackets)
+        self._rates = {zone: tuple(prices) for zone, prices in rates.items()}
+        self.free_threshold_cents = free_threshold_cents
+        self.default_zone = default_zone
+
+    def zone_for(self, zip_code):
+        """
+        :param zip_code: (str) Zip code as entered.
+        :return: (str | None) Its zone, or the default zone (None when there is no delivery).
+        """
+
+        number = normalize_zip(zip_code)
+
+        if number is not None:
+            # Last range starting at or before the zip code, if the zip code is not past its end
+            index = bisect_right(self._starts, number) - 1
+
+            if index >= 0 and number <= self._ends[index]:
+                return self._zones[index]
+
+        return self.default_zone
+
+    def rate(self, zone, weight_grams):
+        """
+        :param zone: (str) Shipping zone.
+        :param weight_grams: (int) Parcel weight.
+        :return: (int) Price in cents of the smallest bracket holding the weight, or of the
+                 last bracket plus every started kilogram above it.
+        """
+
+        prices = self._rates[zone]
+        index = bisect_left(self._brackets, weight_grams)
+
+        if index < len(self._brackets):
+            return prices[index]
+
+        extra_kg = -(-(weight_grams - self._brackets[-1]) // 1000)
+
+        return prices[-2] + extra_kg * prices[-1]
+
+    def quote(self, zip_code, weight_grams, subtotal_cents):
+        """
+        :param zip_code: (str) Destination zip code.
+        :param weight_grams: (int) Total weight of the cart.
+        :param subtotal_cents: (int) Merchandise total, checked against the free-shipping threshold.
+        :return: (ShippingQuote | None) The quote, or None if there is no delivery to the zip code.
+        """
+
+        zone = self.zone_for(zip_code)
+
+        if zone is None:
+            return None
+
+        free = self.free_threshold_cents is not None and subtotal_cents >= self.free_threshold_cents
+
+        return ShippingQuote(zone, weight_grams, 0 if free else self.rate(zone, weight_grams), free)
+
+
+_table_lock = threading.Lock()
+
+
+def get_shipping_table(app=None):
+    """
+    The app's shipping table, built from the SHIPPING_* settings on first use
+    (stored in `app.extensions["shipping_table"]`).
+    """
+
+    app = app or current_app._get_current_object()
+
+    if "shipping_table" not in app.extensions:
+        with _table_lock:
+            if "shipping_table" not in app.extensions:
+                config = app.config
+                app.extensions["shipping_table"] = ShippingTable(
+                    config["SHIPPING_ZONES"],
+                    config["SHIPPING_WEIGHT_BRACKETS_GRAMS"],
+                    config["SHIPPING_RATES_CENTS"],
+                    config["SHIPPING_FREE_THRESHOLD_CENTS"],
+                    config["SHIPPING_DEFAULT_ZONE"]
+                )
+
+    return app.extensions["shipping_table"]
+
+
+def cart_weight(lines):
+    """
+    :param lines: (list[dict]) Cart lines with quantity and weight_grams (None when unknown).
+    :return: (int) Total weight in grams, products without a weight counting SHIPPING_DEFAULT_WEIGHT_GRAMS.
+    """
+
+    default = current_app.config["SHIPPING_DEFAULT_WEIGHT_GRAMS"]
+
+    return sum((line.get("weight_grams") or default) * line["quantity"] for line in lines)
+
+
+def quote_cart(user, lines, subtotal_cents):
+    """
+    Quotes shipping of cart lines to the user's default address, in memory
+    (the address is loaded together with the user).
+
+    :param user: (User) Customer.
+    :param lines: (list[dict]) Revalidated cart lines (see utils.checkout.revalidate_cart).
+    :param subtotal_cents: (int) Merchandise total.
+    :return: (ShippingQuote | None) None if the user has no address or there is no delivery to it.
+    """
+
+    address = user.default_address
+
+    if address is None:
+        return None
+
+    return get_shipping_table().quote(address.zip_code, cart_weight(lines), subtotal_cents)
@@ -0,0 +1,120 @@
+# utils/storefront.py
+
+from extensions import db
+from flask import current_app
+from models.order import Review
+from models.product import Products
+from sqlalchemy import func, select
+from utils.cache import cached
+from utils.reviews import latest_reviews, rating_summaries, review_page
+
+# Product fields the storefront templates show
+PRODUCT_COLUMNS = (Products.id, Products.name, Products.description, Products.price_cents, Products.img_url)
+
+
+@cached("top_rated_products")
+def top_rated_products(limit=3):
+    """
+    The best rated active products for the home page, with their average
+    rating, in one grouped query.
+
+    :param limit: (int) Products to return.
+    :return: (list[dict]) id, name, description, price_cents, img_url and avg_rating (0 if unrated), best first.
+    """
+
+    average = func.avg(Review.rating)
+    rows = db.session.execute(
+        select(*PRODUCT_COLUMNS, average.label("avg_rating"))
+        .outerjoin(Review, Review.product_id == Products.id)   # Include products with no reviews...
+        .where(Products.active)
+        .group_by(Products.id)
+        .order_by(average.desc().nullslast())                  # ...after the rated ones
+        .limit(limit)
+    )
+
+    return [{**row._asdict(), "avg_rating": row.avg_rating or 0} for row in rows]
+
+
+@cached("catalog_chunk")
+def catalog_chunk(after_id=0, size=48):
+    """
+    One chunk of the catalog page, everything in it being the same for
+    every visitor: the next `size` active products after `after_id` (by id, so
+    each chunk is a range scan of the active products' partial index), each
+    with its newest reviews and rating summary.
+
+    :param after_id: (int) Id of the last product of the previous chunk (0 for the first).
+    :param size: (int) Products per chunk.
+    :return: (list[dict]) id, name, description, price_cents, img_url, latest_reviews,
+             avg_rating and review_count per product, by id.
+    """
+
+    products = [row._asdict() for row in db.session.execute(
+        select(*PRODUCT_COLUMNS).where(Products.active, Products.id > after_id).order_by(Products.id).limit(size)
+    )]
+    product_ids = [product["id"] for product in products]
+    reviews = latest_reviews(product_ids, current_app.config["REVIEWS_PREVIEW_COUNT"])
+    summaries = rating_summaries(product_ids)
+
+    for product in products:
+        product["latest_reviews"] = reviews.get(product["id"], [])
+        product["avg_rating"], product["review_count"] = summaries.get(product["id"], (0, 0))
+
+    return products
+
+
+def catalog_chunks(size=48):
+    """
+    The whole catalog, chunk by chunk: each chunk is read (or served from
+    the cache) only when the previous one has been rendered, so a streamed
+    page never holds more than one chunk of it.
+
+    :param size: (int) Products per chunk.
+    :return: (Iterator[list[dict]]) Chunks from catalog_chunk().
+    """
+
+    after_id = 0
+
+    while True:
+        chunk = catalog_chunk(after_id, size)
+
+        if chunk:
+            yield chunk
+
+        if len(chunk) < size:
+            return
+
+        after_id = chunk[-1]["id"]
+
+
+@cached("product_overview")
+def product_overview(product_id):
+    """
+    A product's first page of reviews and rating summary, for its reviews page.
+
+    :param product_id: (int) Product id.
+    :return: (dict) reviews, next_cursor, avg_rating and review_count.
+    """
+
+    reviews, next_cursor = review_page(product_id, limit=current_app.config["REVIEWS_PAGE_SIZE"])
+    avg_rating, review_count = rating_summaries([product_id]).get(product_id, (0, 0))
+
+    return {"reviews": reviews, "next_cursor": next_cursor, "avg_rating": avg_rating, "review_count": review_count}
+
+
+def invalidate_product(product_id=None):
+    """
+    Drops the cached storefront data a product change can affect: the
+    catalog, the home page ranking and the product's own page.
+    Call after committing a product edit, archival, restore or import, or a new review.
+
+    :param product_id: (int, optional) The changed product (default: every product's page).
+    """
+
+    catalog_chunk.invalidate()
+    top_rated_products.invalidate()
+
+    if product_id is None:
+        product_overview.invalidate()
+    else:
+        product_overview.invalidate(product_id)
@@ -0,0 +1,133 @@
+# utils/streaming.py
+
+import csv
+import io
+import json
+from flask import Response, current_app, get_flashed_messages, stream_template
+from flask_wtf.csrf import generate_csrf
+
+# Supported export formats and their MIME types
+FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson"
+}
+
+
+def encode_records(records, fieldnames, fmt, chunk_size=1000):
+    """
+    Encodes an iterator of dictionaries as CSV or JSON Lines, yielding one text
+    chunk per `chunk_size` records so callers can stream it without building
+    the whole file in memory.
+
+    :param records: (Iterable[dict]) Rows to encode.
+    :param fieldnames: (list[str]) Column order (CSV header); other keys are left out of CSV rows.
+    :param fmt: (str) "csv" or "jsonl".
+    :param chunk_size: (int) Records per yielded chunk.
+    :return: (Iterator[str]) Encoded text chunks.
+    """
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore") if fmt == "csv" else None
+
+    if writer:
+        writer.writeheader()
+
+    count = 0
+
+    for record in records:
+        if writer:
+            writer.writerow(record)
+        else:
+            buffer.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+
+        count += 1
+
+        if count % chunk_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def deferred(func, *args):
+    """
+    Iterable over `func(*args)` that only calls it when first iterated, so
+    a streamed page reads that data after sending what comes before it.
+
+    :param func: (callable) Returns an iterable, e.g. a query helper.
+    :param args: Its arguments.
+    :return: (Iterator)
+    """
+
+    yield from func(*args)
+
+
+def flush():
+    """
+    Template global `{{ flush() }}`: marks a point where a page rendered by
+    stream_page() sends everything rendered so far, e.g. the head and
+    navigation before any slow content. Renders nothing (and flushes nothing)
+    in pages rendered by render_template().
+    """
+
+    return ""
+
+
+class _Flush:
+    """
+    The `flush()` of one streamed page, shadowing the global: records the request.
+    """
+
+    def __init__(self):
+        self.requested = False
+
+    def __call__(self):
+        self.requested = True
+        return ""
+
+
+def stream_page(template_name, **context):
+    """
+    Renders a template as a streamed response, so the browser receives the
+    start of the page while the rest is still being rendered.
+
+    Jinja produces output in many small pieces; they are sent in chunks of
+    about STREAM_BUFFER_BYTES, and at every `{{ flush() }}` in the template.
+
+    The session cookie is saved before the body is rendered, so whatever the
+    page changes in the session (the CSRF token, consumed flash messages) is
+    done here, up front.
+
+    :param template_name: (str) Template to render.
+    :param context: Template variables; iterables in it (e.g. generators of chunks) are consumed
+                    while rendering, inside the request context.
+    :return: (Response) Streamed HTML response.
+    """
+
+    # Both are cached for the request, so the template's csrf_token() and
+    # get_flashed_messages() return these values instead of touching the session
+    generate_csrf()
+    get_flashed_messages()
+
+    size = current_app.config["STREAM_BUFFER_BYTES"]
+    flush_point = _Flush()
+    pieces = stream_template(template_name, flush=flush_point, **context)
+
+    def generate():
+        buffer, length = [], 0
+
+        for piece in pieces:
+            buffer.append(piece)
+            length += len(piece)
+
+            if length >= size or flush_point.requested:
+                yield "".join(buffer)
+                buffer, length = [], 0
+                flush_point.requested = False
+
+        if buffer:
+            yield "".join(buffer)
+
+    return Response(generate(), mimetype="text/html")
@@ -0,0 +1,315 @@
+# utils/synthetic_data.py
+
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from flask import current_app
+from models import Address, User, Products, Order, OrderItem
+from models.order import Review
+from random import Random
+from sqlalchemy import and_, func, insert, select
+from werkzeug.security import generate_password_hash
+
+FIRST_NAMES = ["Ana", "Bruno", "Carla", "Diego", "Eduarda", "Felipe", "Gabriela", "Heitor", "Isabela", "João",
+               "Larissa", "Marcos", "Natália", "Otávio", "Patrícia", "Rafael", "Sofia", "Thiago", "Vitória", "William"]
+LAST_NAMES = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+              "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa"]
+STATES = {"SP": "São Paulo", "RJ": "Rio de Janeiro", "MG": "Belo Horizonte", "RS": "Porto Alegre",
+          "PR": "Curitiba", "BA": "Salvador", "PE": "Recife", "CE": "Fortaleza", "DF": "Brasília", "AM": "Manaus"}
+STREETS = ["Rua das Flores", "Avenida Paulista", "Rua XV de Novembro", "Avenida Brasil", "Rua da Consolação",
+           "Rua Augusta", "Avenida Atlântica", "Rua Sete de Setembro"]
+ADJECTIVES = ["Classic", "Premium", "Compact", "Eco", "Deluxe", "Smart", "Vintage", "Ultra", "Essential", "Pro"]
+NOUNS = ["Backpack", "Headphones", "Mug", "Lamp", "Notebook", "Sneakers", "Watch", "Jacket", "Speaker", "Bottle"]
+STATUSES = ["Processing", "Shipped", "Delivered"]
+STATUS_WEIGHTS = [1, 2, 7]
+
+
+def cpf_check_digits(base):
+    """
+    Computes the two CPF check digits for a 9-digit base.
+
+    :param base: (str) The first 9 digits of the CPF.
+    :return: (str) The two check digits.
+    """
+
+    digits = [int(d) for d in base]
+
+    for weight_start in (10, 11):
+        total = sum(d * w for d, w in zip(digits, range(weight_start, 1, -1)))
+        remainder = total * 10 % 11
+        digits.append(0 if remainder == 10 else remainder)
+
+    return f"{digits[-2]}{digits[-1]}"
+
+
+def generate_cpf(number):
+    """
+    Builds a checksum-valid CPF from a sequence number, as the 11 digits the
+    users table stores (see utils.identifiers.normalize_cpf).
+    Different numbers (below 10^9) always produce different CPFs.
+
+    :param number: (int) Sequence number, usually the user id.
+    :return: (str) CPF digits.
+    """
+
+    base = f"{number % 10 ** 9:09d}"
+
+    return base + cpf_check_digits(base)
+
+
+def generate_rg(number):
+    """
+    Builds an RG in the São Paulo format 00.000.000-D from a sequence number,
+    with the modulo-11 check digit ("X" for 10).
+
+    :param number: (int) Sequence number, usually the user id.
+    :return: (str) Formatted RG.
+    """
+
+    base = f"{number % 10 ** 8:08d}"
+    remainder = sum(int(d) * w for d, w in zip(base, range(2, 10))) % 11
+    check = "X" if remainder == 10 else str(remainder)
+
+    return f"{base[:2]}.{base[2:5]}.{base[5:]}-{check}"
+
+
+class SyntheticDataLoader:
+    """
+    Generates realistic synthetic rows and bulk-loads them with executemany inserts.
+
+    Rows are produced lazily and written `chunk_size` at a time, each chunk in
+    its own transaction, so memory stays flat and millions of rows can be
+    loaded in minutes. Primary keys are assigned up front (continuing after the
+    current maximum) so orders and their items can be inserted in bulk without
+    a round-trip per order.
+
+    Must be used inside an application context.
+    """
+
+    def __init__(self, seed=None, chunk_size=5000, password="password123",
+                 password_method=None, email_domain="example.com", log=None):
+        """
+        :param seed: (int, optional) Random seed; the same seed on the same database yields the same rows.
+        :param chunk_size: (int) Rows per executemany batch and per commit.
+        :param password: (str) Plain-text password shared by every generated user.
+        :param password_method: (str, optional) Werkzeug hashing method used for that password
+                                (defaults to the PASSWORD_HASH_METHOD policy).
+        :param email_domain: (str) Domain for generated emails (user<id>@<domain>).
+        :param log: (callable, optional) Called with a progress message after each chunk.
+        """
+
+        self.rng = Random(seed)
+        self.chunk_size = chunk_size
+        self.password = password
+        self.password_method = password_method or current_app.config["PASSWORD_HASH_METHOD"]
+        self.email_domain = email_domain
+        self.log = log or (lambda message: None)
+
+    def _next_id(self, model):
+        return (db.session.execute(select(func.max(model.id))).scalar() or 0) + 1
+
+    def _load(self, model, rows, label):
+        """
+        Writes rows from an iterator in chunks, committing after every chunk.
+
+        :return: (int) Number of rows inserted.
+        """
+
+        total = 0
+        chunk = []
+
+        for row in rows:
+            chunk.append(row)
+
+            if len(chunk) >= self.chunk_size:
+                total += self._flush(model, chunk, label, total)
+                chunk = []
+
+        if chunk:
+            total += self._flush(model, chunk, label, total)
+
+        return total
+
+    def _flush(self, model, chunk, label, done):
+        db.session.execute(insert(model), chunk)
+        db.session.commit()
+        self.log(f"{label}: {done + len(chunk)} rows loaded")
+
+        return len(chunk)
+
+    def load_products(self, count):
+        """
+        Inserts `count` products with random names, prices, stock levels and weights.
+
+        :param count: (int) Number of products to create.
+        :return: (int) Number of products inserted.
+        """
+
+        start = self._next_id(Products)
+        rng = self.rng
+
+        def rows():
+            for product_id in range(start, start + count):
+                yield {
+                    "id": product_id,
+                    "name": f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {product_id}",
+                    "price_cents": rng.randint(199, 99999),
+                    "description": f"Synthetic catalog item #{product_id}.",
+                    "img_url": f"product_img/pic0{rng.randint(1, 5)}.jpg",
+                    "quantity": rng.randint(0, 500),
+                    "weight_grams": rng.randint(100, 5000)
+                }
+
+        return self._load(Products, rows(), "products")
+
+    def load_users(self, count):
+        """
+        Inserts `count` users with unique emails, checksum-valid CPFs, RGs and a
+        complete default address, so they can check out immediately.
+
+        :param count: (int) Number of users to create.
+        :return: (int) Number of users inserted.
+        """
+
+        start = self._next_id(User)
+        rng = self.rng
+        # Addresses are loaded after their users, from their own generator so both stream in chunks
+        address_rng = Random(rng.random())
+
+        # Hashing once and sharing the hash keeps loading fast regardless of the method's cost
+        password_hash = generate_password_hash(self.password, method=self.password_method)
+
+        def rows():
+            for user_id in range(start, start + count):
+                yield {
+                    "id": user_id,
+                    "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    "email": f"user{user_id}@{self.email_domain}",
+                    "cpf": generate_cpf(user_id),
+                    "rg": generate_rg(user_id),
+                    "profile_complete": True,
+                    "password": password_hash
+                }
+
+        def addresses():
+            for user_id in range(start, start + count):
+                state = address_rng.choice(list(STATES))
+                yield {
+                    "user_id": user_id,
+                    "phone": f"({address_rng.randint(11, 99)}) 9{address_rng.randint(1000, 9999)}-{address_rng.randint(1000, 9999)}",
+                    "street": address_rng.choice(STREETS),
+                    "number": str(address_rng.randint(1, 3000)),
+                    "city": STATES[state],
+                    "state": state,
+                    "zip_code": f"{address_rng.randint(1000, 99999):05d}-{address_rng.randint(0, 999):03d}",
+                    "country": "Brazil",
+                    "is_default": True
+                }
+
+        inserted = self._load(User, rows(), "users")
+        self._load(Address, addresses(), "addresses")
+
+        return inserted
+
+    def load_orders(self, count, max_items=4, days=365):
+        """
+        Inserts `count` orders for existing users, each with 1 to `max_items`
+        distinct existing products priced at their current catalog price.
+
+        :param count: (int) Number of orders to create.
+        :param max_items: (int) Maximum number of items per order.
+        :param days: (int) Orders are spread uniformly over this many past days.
+        :return: (tuple[int, int]) Number of orders and order items inserted.
+        """
+
+        user_ids = db.session.execute(select(User.id)).scalars().all()
+        prices = dict(db.session.execute(select(Products.id, Products.price_cents)).all())
+        product_ids = list(prices)
+
+        if not user_ids or not product_ids:
+            raise ValueError("Load users and products before generating orders.")
+
+        start = self._next_id(Order)
+        now = datetime.now(timezone.utc)
+        rng = self.rng
+        orders_done = items_done = 0
+
+        # Orders and their items are generated together and flushed in the same transaction
+        for chunk_start in range(start, start + count, self.chunk_size):
+            order_rows = []
+            item_rows = []
+
+            for order_id in range(chunk_start, min(chunk_start + self.chunk_size, start + count)):
+                total = 0
+
+                for product_id in rng.sample(product_ids, min(len(product_ids), rng.randint(1, max_items))):
+                    quantity = rng.randint(1, 3)
+                    total += prices[product_id] * quantity
+                    item_rows.append({
+                        "order_id": order_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "price_cents": prices[product_id]
+                    })
+
+                order_rows.append({
+                    "id": order_id,
+                    "user_id": rng.choice(user_ids),
+                    "date": now - timedelta(seconds=rng.randint(0, days * 86400)),
+                    "total_cents": total,
+                    "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0]
+                })
+
+            db.session.execute(insert(Order), order_rows)
+            db.session.execute(insert(OrderItem), item_rows)
+            db.session.commit()
+
+            orders_done += len(order_rows)
+            items_done += len(item_rows)
+            self.log(f"orders: {orders_done} orders / {items_done} items loaded")
+
+        return orders_done, items_done
+
+    def load_reviews(self, count):
+        """
+        Inserts up to `count` reviews, each for a product the reviewer actually
+        bought and has not reviewed yet, so the `uix_user_product` constraint
+        always holds.
+
+        Candidate pairs are shuffled by the database with a hash expression
+        salted from the loader's seed, so the selection is reproducible and the
+        full purchase history never has to be held in memory.
+
+        :param count: (int) Maximum number of reviews to create.
+        :return: (int) Number of reviews inserted (fewer if not enough unreviewed purchases exist).
+        """
+
+        rng = self.rng
+        now = datetime.now(timezone.utc)
+        salt_user, salt_product = rng.randint(1, 2 ** 20), rng.randint(1, 2 ** 20)
+
+        candidates = (
+            select(Order.user_id, OrderItem.product_id)
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .outerjoin(Review, and_(Review.user_id == Order.user_id, Review.product_id == OrderItem.product_id))
+            .where(Review.id.is_(None))
+            .distinct()
+            .order_by((Order.user_id * salt_user + OrderItem.product_id * salt_product) % 1000003)
+            .limit(count)
+        )
+
+        # Materialized before inserting: the candidate query reads the table being written to
+        pairs = db.session.execute(candidates).all()
+
+        def rows():
+            for user_id, product_id in pairs:
+                rating = rng.choices([1, 2, 3, 4, 5], [1, 1, 2, 4, 5])[0]
+                yield {
+                    "user_id": user_id,
+                    "product_id": product_id,
+                    "rating": rating,
+                    "comment": rng.choice(["Great product!", "Works as expected.", "Fast delivery.",
+                                           "Not what I expected.", "Would buy again.", None]),
+                    "date": now - timedelta(seconds=rng.randint(0, 90 * 86400))
+                }
+
+        return self._load(Review, rows(), "reviews")
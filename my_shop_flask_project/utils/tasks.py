@@ -0,0 +1,50 @@
+# utils/tasks.py
+
+from extensions import db
+from models import Order
+from utils.archive import archive_orders
+from utils.email import send_order_confirmation_email
+from utils.inventory import sweep_expired_holds
+from utils.jobs import task
+from utils.recommendations import refresh_recommendations
+
+
+@task("orders.send_confirmation", priority=10, max_attempts=8, backoff=60)
+def send_order_confirmation(order_id):
+    """
+    Emails the order confirmation; retried with backoff while the mail server is unreachable.
+
+    :param order_id: (int) Order to confirm.
+    """
+
+    order = db.session.get(Order, order_id)
+
+    if order is not None:
+        send_order_confirmation_email(order.user, order)
+
+
+@task("inventory.sweep_holds", every="STOCK_SWEEP_INTERVAL_SECONDS", max_attempts=1)
+def sweep_holds():
+    """
+    Deletes expired stock holds (see utils.inventory.sweep_expired_holds).
+    """
+
+    sweep_expired_holds()
+
+
+@task("recommendations.refresh", every="RECOMMENDATIONS_REFRESH_SECONDS", max_attempts=1)
+def refresh_product_recommendations():
+    """
+    Folds new orders into the co-purchase matrix (see utils.recommendations.refresh_recommendations).
+    """
+
+    refresh_recommendations()
+
+
+@task("orders.archive", every="ORDERS_ARCHIVE_INTERVAL_SECONDS", max_attempts=1)
+def archive_old_orders():
+    """
+    Moves old delivered orders to the archive tables (see utils.archive.archive_orders).
+    """
+
+    archive_orders()
@@ -34,23 +34,27 @@ def admin_required(f):
 
 def validate_cpf_unique(form, field):
     """
-    WTForms validator to ensure that the provided CPF is unique.
+    WTForms validator to ensure that the provided CPF is valid and unique.
 
-    Raises a ValidationError if the CPF is already registered in the system.
+    The check digits are verified first, so malformed input never reaches
+    the database; uniqueness goes through the identifier filter and only
+    queries the users table on a possible match.
 
     :param form: (FlaskForm) The form being validated.
     :param field: (Field) The field containing the CPF value.
 
-    :raises ValidationError: If the CPF is already used by another user.:
+    :raises ValidationError: If the CPF is invalid or already used by another user.
     """
 
-    from models.user import User
+    from utils.identifiers import identifier_taken, is_valid_cpf
 
-    user = User.query.filter_by(cpf=field.data).first()
+    if not is_valid_cpf(field.data):
+        raise ValidationError("Invalid CPF.")
 
-    if user:
+    if identifier_taken("cpf", field.data):
         raise ValidationError("CPF already registered.")
 
+
 def validate_rg_unique(form, field):
     """
     WTForms validator to ensure that the provided RG is unique.
@@ -66,9 +70,7 @@ def validate_rg_unique(form, field):
     :raises ValidationError: If the RG is already used by another user.
     """
 
-    from models.user import User
-
-    user = User.query.filter_by(rg=field.data).first()
+    from utils.identifiers import identifier_taken
 
-    if user:
+    if identifier_taken("rg", field.data):
         raise ValidationError("RG already registered.")
@@ -0,0 +1,327 @@
+# utils/webhooks.py
+
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from extensions import db
+from flask import current_app
+from models import CheckoutSession, StripeEvent
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from utils.checkout import fulfill_checkout
+from utils.inventory import release_holds
+from utils.payments import PAID_STATUSES
+from utils.tasks import send_order_confirmation
+
+# Event type -> handler(stripe_object) returning 'processed' or 'ignored'
+# (an exception marks the event 'failed', with the message in last_error)
+HANDLERS = {}
+
+
+class PaidCheckoutExpired(Exception):
+    """
+    Stripe reports a payment for a checkout that already expired: no order
+    was created and the stock was released, so the payment needs attention.
+    """
+
+
+def handles(*event_types):
+    """
+    Registers the decorated function as the handler of the given Stripe event types.
+    """
+
+    def decorator(func):
+        for event_type in event_types:
+            HANDLERS[event_type] = func
+
+        return func
+
+    return decorator
+
+
+def _find_checkout(session_object):
+    """
+    Looks up the CheckoutSession of a Stripe Checkout Session object.
+    """
+
+    checkout_ref = session_object.get("client_reference_id")
+
+    if not checkout_ref:
+        return None
+
+    return db.session.execute(
+        select(CheckoutSession).where(CheckoutSession.checkout_ref == checkout_ref)
+    ).scalar_one_or_none()
+
+
+@handles("checkout.session.completed", "checkout.session.async_payment_succeeded")
+def handle_checkout_completed(session_object):
+    """
+    Creates the order of a paid checkout (idempotent with `/cart/success`).
+    """
+
+    # Delayed payment methods complete unpaid and send async_payment_succeeded later
+    if session_object.get("payment_status") not in PAID_STATUSES:
+        return "ignored"
+
+    checkout = _find_checkout(session_object)
+
+    if checkout is None:
+        return "ignored"
+
+    if not checkout.stripe_session_id:
+        checkout.stripe_session_id = session_object.get("id")
+        db.session.commit()
+
+    order, created = fulfill_checkout(checkout)
+
+    if order is None:
+        raise PaidCheckoutExpired(
+            f"Checkout {checkout.checkout_ref} (Stripe session {session_object.get('id')}, payment intent "
+            f"{session_object.get('payment_intent')}) was paid after it expired; refund it or create the order manually."
+        )
+
+    # Sent by the job worker, so a mail outage can't fail (and make Stripe retry) the event
+    if created:
+        send_order_confirmation.delay(order_id=order.id)
+
+    return "processed"
+
+
+@handles("checkout.session.expired")
+def handle_checkout_expired(session_object):
+    """
+    Releases the stock held for a checkout that was never paid.
+    """
+
+    checkout = _find_checkout(session_object)
+
+    if checkout is None:
+        return "ignored"
+
+    expired = db.session.execute(
+        update(CheckoutSession)
+        .where(CheckoutSession.id == checkout.id, CheckoutSession.status == "open")
+        .values(status="expired")
+    ).rowcount
+
+    db.session.commit()
+
+    if expired:
+        release_holds(checkout.checkout_ref)
+
+    return "processed"
+
+
+def store_event(event_id, event_type, payload):
+    """
+    Persists a verified event in the inbox unless it was already received.
+
+    :param event_id: (str) Stripe event id.
+    :param event_type: (str) Stripe event type.
+    :param payload: (str) Raw JSON body.
+    :return: (int | None) Inbox row id, or None for a duplicate delivery.
+    """
+
+    row = StripeEvent(event_id=event_id, type=event_type, payload=payload)
+
+    try:
+        db.session.add(row)
+        db.session.commit()
+
+    except IntegrityError:
+        # Unique event_id: Stripe redelivered an event we already have
+        db.session.rollback()
+        return None
+
+    return row.id
+
+
+def _claimable(now):
+    """
+    Condition on StripeEvent rows a worker may claim: pending or failed ones,
+    and those left processing for longer than STRIPE_WEBHOOK_PROCESSING_TIMEOUT_SECONDS
+    by a worker that died.
+    """
+
+    stale = now - timedelta(seconds=current_app.config["STRIPE_WEBHOOK_PROCESSING_TIMEOUT_SECONDS"])
+
+    return StripeEvent.status.in_(("pending", "failed")) | (
+        (StripeEvent.status == "processing") & (StripeEvent.claimed_at < stale)
+    )
+
+
+def process_event(row_id):
+    """
+    Processes one inbox event.
+
+    The row is claimed with a conditional UPDATE so each event is handled by
+    one worker at a time; handlers are idempotent, so a retried event never
+    creates a second order.
+
+    :param row_id: (int) StripeEvent primary key.
+    :return: (str | None) Final status, or None if another worker holds the event.
+    """
+
+    claimed_at = datetime.now(timezone.utc)
+    claimed = db.session.execute(
+        update(StripeEvent)
+        .where(StripeEvent.id == row_id, _claimable(claimed_at))
+        .values(status="processing", attempts=StripeEvent.attempts + 1, claimed_at=claimed_at)
+    ).rowcount
+    db.session.commit()
+
+    if not claimed:
+        return None
+
+    row = db.session.get(StripeEvent, row_id)
+    handler = HANDLERS.get(row.type)
+
+    try:
+        status = handler(json.loads(row.payload)["data"]["object"]) if handler else "ignored"
+        error = None
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.exception("Stripe event %s failed", row.event_id)
+        status, error = "failed", str(e)
+
+    # Unless the event was taken over after this attempt timed out
+    db.session.execute(
+        update(StripeEvent)
+        .where(StripeEvent.id == row_id, StripeEvent.claimed_at == claimed_at)
+        .values(status=status, last_error=error, processed_at=datetime.now(timezone.utc))
+    )
+    db.session.commit()
+
+    return status
+
+
+def process_pending(limit=100):
+    """
+    Processes inbox events that are pending, failed with attempts left
+    (STRIPE_WEBHOOK_MAX_ATTEMPTS) or stuck processing past the timeout. Used by
+    `flask webhooks process` to drain the inbox after downtime or when the
+    in-process pool is disabled.
+
+    :param limit: (int) Maximum number of events to process.
+    :return: (dict[str, int]) Number of events per resulting status.
+    """
+
+    max_attempts = current_app.config["STRIPE_WEBHOOK_MAX_ATTEMPTS"]
+
+    row_ids = db.session.execute(
+        select(StripeEvent.id)
+        .where(
+            _claimable(datetime.now(timezone.utc)),
+            (StripeEvent.status != "failed") | (StripeEvent.attempts < max_attempts)
+        )
+        .order_by(StripeEvent.id)
+        .limit(limit)
+    ).scalars().all()
+
+    counts = {}
+
+    for row_id in row_ids:
+        status = process_event(row_id)
+
+        if status:
+            counts[status] = counts.get(status, 0) + 1
+
+    return counts
+
+
+class WebhookWorkerPool:
+    """
+    Processes inbox events on background threads so the webhook endpoint
+    can acknowledge Stripe as soon as the event is stored.
+
+    Attributes:
+        app (Flask): Application whose context the workers run in.
+        executor (ThreadPoolExecutor): Worker threads.
+    """
+
+    def __init__(self, app, workers):
+        self.app = app
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stripe-webhook")
+
+    def submit(self, row_id):
+        """
+        Queues an inbox event for processing.
+
+        :param row_id: (int) StripeEvent primary key.
+        """
+
+        self.executor.submit(self._run, row_id)
+
+    def _run(self, row_id):
+        with self.app.app_context():
+            try:
+                process_event(row_id)
+
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("Stripe webhook worker crashed on event row %s", row_id)
+
+
+def dispatch(app, row_id):
+    """
+    Hands a stored event to the app's worker pool, creating the pool on first
+    use. With STRIPE_WEBHOOK_WORKERS = 0 events stay pending for
+    `flask webhooks process`.
+
+    :param app: (Flask) The application (not the proxy).
+    :param row_id: (int) StripeEvent primary key.
+    """
+
+    workers = app.config["STRIPE_WEBHOOK_WORKERS"]
+
+    if not workers:
+        return
+
+    pool = app.extensions.get("stripe_webhooks")
+
+    if pool is None:
+        pool = app.extensions.setdefault("stripe_webhooks", WebhookWorkerPool(app, workers))
+
+    pool.submit(row_id)
+
+
+def build_event(event_type, session_object, event_id=None):
+    """
+    Builds a Stripe-shaped event payload for local testing.
+
+    :param event_type: (str) e.g. 'checkout.session.completed'.
+    :param session_object: (dict) The Checkout Session object.
+    :param event_id: (str, optional) Event id; random if omitted.
+    :return: (str) JSON payload.
+    """
+
+    return json.dumps({
+        "id": event_id or f"evt_local_{uuid.uuid4().hex}",
+        "object": "event",
+        "type": event_type,
+        "created": int(time.time()),
+        "data": {"object": session_object}
+    })
+
+
+def sign_payload(payload, secret, timestamp=None):
+    """
+    Computes a Stripe-Signature header for a payload, the way Stripe signs
+    webhook deliveries, so fixtures pass real signature verification.
+
+    :param payload: (str) Raw JSON body.
+    :param secret: (str) Webhook signing secret (whsec_...).
+    :param timestamp: (int, optional) Signing time; now if omitted.
+    :return: (str) Header value "t=...,v1=...".
+    """
+
+    timestamp = timestamp or int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{payload}".encode(), hashlib.sha256).hexdigest()
+
+    return f"t={timestamp},v1={signature}"